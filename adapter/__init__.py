@@ -1,3 +1,7 @@
 from .ports import Repository  # re-export for convenience
 from .jira_repo import JiraRepository
 from .sim_repo import SimRepository
+from .identity_map import IdentityMapRepository
+from .tracing_repo import TracingRepository
+from .search_cache import SearchCache
+from .metadata import MetadataCache
@@ -0,0 +1,67 @@
+"""HTTP statistics of the Jira session, collected by a requests response hook.
+
+The jira client retries throttled (429) and unavailable (503) responses after
+a delay; every attempt goes through the hook, so retries are seen as a
+throttled response followed by another request from the same thread. The
+wait is the gap between the two.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Tuple
+
+
+THROTTLE_STATUSES = (429, 503)
+
+
+def _size(body: Any) -> int:
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    try:
+        return len(body)
+    except TypeError:  # generator/file bodies
+        return 0
+
+
+class HttpStats:
+    def __init__(self) -> None:
+        self.requests: Counter = Counter()  # (method, status code) -> responses
+        self.bytes_sent: Counter = Counter()  # method -> request body bytes
+        self.bytes_received: Counter = Counter()  # method -> response body bytes
+        self.throttled: Counter = Counter()  # status code -> throttled responses
+        self.retry_wait = 0.0  # seconds between throttled responses and their retries
+        self._lock = threading.Lock()
+        self._throttled_at: Dict[int, float] = {}
+
+    def install(self, session: Any) -> None:
+        """Register the response hook on a requests session (e.g. JIRA._session)."""
+        session.hooks.setdefault("response", []).append(self.on_response)
+
+    def on_response(self, response: Any, *args, stream: bool = False, **kwargs) -> Any:
+        now = time.monotonic()
+        request = response.request
+        method = request.method or "GET"
+        length = response.headers.get("Content-Length")
+        if length is not None:
+            received = int(length)
+        else:
+            # Not streamed: requests reads the body right after the hooks anyway
+            received = 0 if stream else len(response.content or b"")
+        key: Tuple[str, str] = (method, str(response.status_code))
+        tid = threading.get_ident()
+        with self._lock:
+            self.requests[key] += 1
+            self.bytes_sent[method] += _size(request.body)
+            self.bytes_received[method] += received
+            throttled_at = self._throttled_at.pop(tid, None)
+            if throttled_at is not None:
+                sent_at = now - response.elapsed.total_seconds()
+                self.retry_wait += max(0.0, sent_at - throttled_at)
+            if response.status_code in THROTTLE_STATUSES:
+                self.throttled[str(response.status_code)] += 1
+                self._throttled_at[tid] = now
+        return response
@@ -0,0 +1,134 @@
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from .ports import Repository, find_children_batch
+
+
+logger = logging.getLogger(__name__)
+
+
+class IdentityMapRepository(Repository):
+    """Run-scoped Repository decorator caching issues and field values by key.
+
+    - `get_issue` returns the same payload for a key for the lifetime of the
+      decorator (one fetch per key, also under concurrent builds).
+    - `get_fields` is answered from a cached issue when there is one, otherwise
+      from per-field values cached by earlier reads.
+    - `update_fields` / `add_labels` drop the entries of the written keys.
+    Searches are delegated untouched. Meant for one CLI run, not for long-lived
+    processes (no expiry: changes made outside the run are not seen).
+    """
+
+    def __init__(self, wrapped: Repository) -> None:
+        self._wrapped = wrapped
+        self._issues: Dict[str, Any] = {}
+        self._fields: Dict[Tuple[str, str], Any] = {}
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    # ---------------
+    # Stats
+    # ---------------
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def summary(self) -> str:
+        return (f"identity map: {self.hits} hits / {self.hits + self.misses} lookups "
+                f"({self.hit_rate:.0%}), {len(self._issues)} issues cached")
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._issues.pop(key, None)
+            for k in [k for k in self._fields if k[0] == key]:
+                del self._fields[k]
+
+    # ---------------
+    # Reads / search
+    # ---------------
+    def get_issue(self, key: str) -> Any:
+        with self._lock:
+            if key in self._issues:
+                self.hits += 1
+                return self._issues[key]
+            key_lock = self._inflight.setdefault(key, threading.Lock())
+        # Concurrent callers for the same key wait for the first fetch
+        with key_lock:
+            with self._lock:
+                if key in self._issues:
+                    self.hits += 1
+                    return self._issues[key]
+            try:
+                issue = self._wrapped.get_issue(key)
+                with self._lock:
+                    self.misses += 1
+                    self._issues[key] = issue
+            finally:
+                # Also after a failed fetch: later lookups fetch again
+                with self._lock:
+                    if self._inflight.get(key) is key_lock:
+                        del self._inflight[key]
+            return issue
+
+    def find_lvl2_new_features(self, sprint: str, squad: str) -> List[str]:
+        return self._wrapped.find_lvl2_new_features(sprint, squad)
+
+    def find_pci_children_by_parent_link(self, parent_key: str, squad: Optional[str] = None) -> List[str]:
+        return self._wrapped.find_pci_children_by_parent_link(parent_key, squad)
+
+    def find_children_by_epic_link(self, epic_key: str, squad: Optional[str]) -> List[str]:
+        return self._wrapped.find_children_by_epic_link(epic_key, squad)
+
+    def find_pci_children_by_parent_links(self, parent_keys: List[str], squad: Optional[str] = None) -> Dict[str, List[str]]:
+        return find_children_batch(self._wrapped, "find_pci_children_by_parent_links",
+                                   "find_pci_children_by_parent_link", parent_keys, squad)
+
+    def find_children_by_epic_links(self, epic_keys: List[str], squad: Optional[str]) -> Dict[str, List[str]]:
+        return find_children_batch(self._wrapped, "find_children_by_epic_links",
+                                   "find_children_by_epic_link", epic_keys, squad)
+
+    def find_pci_keys_with_label_and_squad(self, label: str, squad: str) -> List[str]:
+        return self._wrapped.find_pci_keys_with_label_and_squad(label, squad)
+
+    def find_pci_with_labels(self, labels: List[str], squad: str) -> List[dict[str, Any]]:
+        return self._wrapped.find_pci_with_labels(labels, squad)
+
+    def find_updated_since(self, minutes: int, squad: str) -> List[dict[str, Any]]:
+        return self._wrapped.find_updated_since(minutes, squad)
+
+    # ---------------
+    # Generic field access
+    # ---------------
+    def get_fields(self, key: str, fields: List[str]) -> dict[str, Any]:
+        with self._lock:
+            issue = self._issues.get(key)
+            if issue is not None:
+                self.hits += 1
+                return {f: getattr(issue.fields, f, None) for f in fields}
+            missing = [f for f in fields if (key, f) not in self._fields]
+            if not missing:
+                self.hits += 1
+                return {f: self._fields[(key, f)] for f in fields}
+        values = self._wrapped.get_fields(key, missing)
+        with self._lock:
+            self.misses += 1
+            for f in missing:
+                self._fields[(key, f)] = values.get(f)
+            return {f: self._fields.get((key, f)) for f in fields}
+
+    def update_fields(self, key: str, fields: dict[str, Any]) -> None:
+        try:
+            self._wrapped.update_fields(key, fields)
+        finally:
+            self.invalidate(key)
+
+    def add_labels(self, keys: List[str], label: str) -> List[str]:
+        try:
+            return self._wrapped.add_labels(keys, label)
+        finally:
+            for key in keys:
+                self.invalidate(key)
@@ -1,8 +1,23 @@
+from __future__ import annotations
+
+import copy
+import json
 import logging
-from typing import List, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from lsd.fields import FIELD_REGISTRY, resolve_field_ids
+from lsd.squads import SquadSpec, get_squad
+from lsd.status import CLOSED_STATUSES, jql_not_closed
+from lsd.tracing import span
+from .http_stats import HttpStats
+from .jql import JqlPlanner, Search, quote as _q
+from .metadata import JiraMetadata, MetadataCache
+from .search_cache import SearchCache
 
-from jira import JIRA
-from lsd.status import jql_not_closed
+if TYPE_CHECKING:  # jira (and requests) are imported on first connection only
+    from jira import JIRA
 
 
 logger = logging.getLogger(__name__)
@@ -14,15 +29,64 @@ JQL_NOT_CLOSED = jql_not_closed()
 JQL_LVL2_FOR_PCI_ROOT = 'project = LVL2 AND type = "New Feature"'
 JQL_PCI_ROOT = 'project = PCI AND type in ("Epic", "Story", "Task")'
 
-# Squad-specific filters (current scope targets Network)
-JQL_NETWORK_PRODUCT_ONLY = '"OVH Product" in ("Public cloud Network - Floating IP (Neutron)", "Public cloud Network - Load Balancer (Octavia)", "Public cloud Network - Public & Private Network (Neutron)", "Public cloud Network - Public Gateway (Neutron)")'
-JQL_NETWORK_CONTRIB_ONLY = '"Contributor(s) Squad(s) (Manual)" = "PU.pCI/Network"'
-JQL_LVL2_NETWORK_ONLY = f'(({JQL_NETWORK_PRODUCT_ONLY}) OR ({JQL_NETWORK_CONTRIB_ONLY}))'
+# Fields read by lsd.mappers.to_domain for PCI issues (projected searches);
+# story points come from the field registry, whose id may be remapped
+PCI_DOMAIN_FIELDS = "project,issuetype,summary,status,priority,labels,components"
+
+
+def pci_domain_fields() -> str:
+    return f"{PCI_DOMAIN_FIELDS},{FIELD_REGISTRY['story_points'].jira_id}"
+
+
+# Bulk mutations
+BULK_EDIT_MAX_ISSUES = 1000  # Jira Cloud bulk edit limit per request
+PUT_CHUNK_SIZE = 50
+PUT_MAX_WORKERS = 8
+
+# Search-result cache TTLs (seconds) of the slowly changing searches
+TTL_LVL2_ROOTS = 15 * 60
+TTL_LABEL_SEARCH = 5 * 60
+
+
+# Squad-specific filters, built from the lsd.squads registry
+def jql_lvl2_squad(spec: SquadSpec) -> str:
+    """LVL2 Feature filter for the squad ("" when the spec has none)."""
+    terms = []
+    if spec.lvl2_products:
+        terms.append(f'"OVH Product" in ({", ".join(_q(p) for p in spec.lvl2_products)})')
+    if spec.lvl2_contributor:
+        terms.append(f'"Contributor(s) Squad(s) (Manual)" = {_q(spec.lvl2_contributor)}')
+    return f'({" OR ".join(f"({t})" for t in terms)})' if terms else ''
+
+
+def jql_pci_feature_child(spec: SquadSpec) -> str:
+    """PCI issues belonging to the squad under an LVL2 Feature."""
+    terms = [f'Component = {_q(spec.component)}'] + [f'labels = {_q(label)}' for label in spec.pci_labels]
+    return f'({" OR ".join(terms)})'
+
 
+# Link fields used to merge per-parent searches (JQL name -> Jira field name)
+LINK_FIELD_NAMES = {'"Parent Link"': "Parent Link", '"Epic Link"': "Epic Link"}
 
-def _run_search(jira: JIRA, jql: str) -> List[Any]:
-    logger.debug("JQL: %s", jql)
-    return jira.search_issues(jql, fields="key", maxResults=False)
+
+def _parent_link_search(parent_key: str, squad: Optional[str]) -> Search:
+    # Match current logic used in LVL2feature.get_childs; squad=None spans all squads
+    where = ['Project = PCI', 'type in (Epic, Story, Task)']
+    spec = get_squad(squad) if squad else None
+    if spec is not None:
+        where.append(jql_pci_feature_child(spec))
+    where.append(JQL_NOT_CLOSED)
+    return Search(tuple(where), 'priority DESC', link='"Parent Link"', value=parent_key)
+
+
+def _epic_link_search(epic_key: str, squad: Optional[str]) -> Search:
+    # Match current logic used in PCIEpic.get_childs (filters to the squad component)
+    where = ['type in (Epic, Story, Task)']
+    spec = get_squad(squad) if squad else None
+    if spec is not None:
+        where.append(f'Component = {_q(spec.component)}')
+    where.append(JQL_NOT_CLOSED)
+    return Search(tuple(where), 'status', link='"Epic Link"', value=epic_key)
 
 
 class JiraRepository:
@@ -31,8 +95,88 @@ class JiraRepository:
     Encapsulates all JIRA operations (search/read/update) to keep domain pure.
     """
 
-    def __init__(self, client: JIRA) -> None:
-        self._jira = client
+    def __init__(self, client: Optional[JIRA] = None, factory: Optional[Callable[[], JIRA]] = None,
+                 search_cache: Optional[SearchCache] = None,
+                 metadata_cache: Optional[MetadataCache] = None, resolve_fields: bool = False) -> None:
+        if client is None and factory is None:
+            raise ValueError("JiraRepository needs a client or a client factory")
+        self._client = None
+        self._factory = factory
+        self._client_lock = threading.Lock()
+        # Run statistics (metrics): HTTP traffic of the client, issues written
+        self.http = HttpStats()
+        self.writes = 0
+        if client is not None:
+            self._set_client(client)
+        self._metadata_cache = metadata_cache or MetadataCache(cache_dir=None)
+        self._metadata: Optional[JiraMetadata] = None
+        self._metadata_lock = threading.Lock()
+        self._metadata_failed = False
+        self._link_ids: Optional[dict[str, str]] = None
+        # FIELD_REGISTRY ids are resolved from the metadata before the first Jira call
+        self._fields_pending = resolve_fields
+        self._fields_lock = threading.Lock()
+        self.planner = JqlPlanner(self._search, self._link_field_ids, cache=search_cache)
+
+    @classmethod
+    def connect(cls, server: str, token: Optional[str], get_server_info: bool = True,
+                search_cache: Optional[SearchCache] = None,
+                metadata_cache: Optional[MetadataCache] = None,
+                resolve_fields: bool = False) -> "JiraRepository":
+        """Repository whose JIRA client is built on first use.
+
+        `get_server_info=False` skips the server-info handshake; the client then
+        does not know the deployment type, so Cloud-only endpoints (bulk edit)
+        are not used. `resolve_fields` points FIELD_REGISTRY at the field ids of
+        this Jira (fields.resolve_field_ids) before the first read or search.
+        """
+        def factory() -> JIRA:
+            from jira import JIRA
+
+            logger.debug("connect to %s (server info: %s)", server, get_server_info)
+            return JIRA(server=server, token_auth=token, get_server_info=get_server_info)
+
+        return cls(factory=factory, search_cache=search_cache, metadata_cache=metadata_cache,
+                   resolve_fields=resolve_fields)
+
+    def without_search_cache(self) -> "JiraRepository":
+        """Repository sharing this one's client, statistics and metadata whose
+        searches always run against Jira (--watch polls must see new roots)."""
+        repo = copy.copy(self)
+        repo._client = self._jira
+        repo._client_lock = threading.Lock()
+        repo.planner = JqlPlanner(repo._search, repo._link_field_ids)
+        return repo
+
+    @property
+    def _jira(self) -> JIRA:
+        client = self._connected()
+        if self._fields_pending:
+            self._resolve_fields()
+        return client
+
+    def _connected(self) -> JIRA:
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._set_client(self._factory())  # type: ignore[misc]
+        return self._client  # type: ignore[return-value]
+
+    def _resolve_fields(self) -> None:
+        # Once, before any issue is mapped, read or written: the other threads
+        # wait here for the remapped ids
+        with self._fields_lock:
+            if self._fields_pending:
+                meta = self.metadata()
+                if meta is not None:
+                    resolve_field_ids(meta.field_ids)
+                self._fields_pending = False
+
+    def _set_client(self, client: JIRA) -> None:
+        session = getattr(client, "_session", None)
+        if session is not None and hasattr(session, "hooks"):
+            self.http.install(session)
+        self._client = client
 
     # -----------------
     # Reads
@@ -40,45 +184,186 @@ class JiraRepository:
     def get_issue(self, key: str) -> Any:
         return self._jira.issue(key)
 
+    def _search(self, jql: str, fields: str) -> List[Any]:
+        with span("jql", "jira", jql=jql) as s:
+            issues = self._jira.search_issues(jql, fields=fields, maxResults=False)
+            s.set(count=len(issues))
+            return issues
+
+    def metadata(self) -> Optional[JiraMetadata]:
+        """Jira metadata (see adapter.metadata), loaded once; None if unavailable."""
+        if self._metadata is None and not self._metadata_failed:
+            with self._metadata_lock:
+                if self._metadata is None and not self._metadata_failed:
+                    try:
+                        meta = self._metadata_cache.load(self._connected)
+                    except Exception as e:
+                        logger.warning("Jira metadata unavailable (%s): updates are not validated locally", e)
+                        self._metadata_failed = True
+                        return None
+                    unknown = meta.unknown_statuses(CLOSED_STATUSES)
+                    if unknown:
+                        logger.warning("closed statuses unknown to Jira: %s", ", ".join(unknown))
+                    self._metadata = meta
+        return self._metadata
+
+    def _link_field_ids(self) -> dict[str, str]:
+        """Field ids of the link fields, resolved once; {} disables merging."""
+        if self._link_ids is None:
+            meta = self.metadata()
+            by_name = meta.field_ids if meta is not None else {}
+            self._link_ids = {jql: by_name[name][0] for jql, name in LINK_FIELD_NAMES.items() if name in by_name}
+        return self._link_ids
+
+    def link_field_ids(self) -> List[str]:
+        """Field ids of Parent Link / Epic Link (custom fields on Server/DC);
+        webhook and polled payloads carry the links under these ids."""
+        return list(self._link_field_ids().values())
+
+    def _validate_update(self, key: str, fields: dict[str, Any]) -> None:
+        # Invalid payloads are rejected before any request (no-op without metadata)
+        meta = self.metadata()
+        if meta is None:
+            return
+        project = key.split("-")[0]
+        if "components" in fields:
+            try:
+                self._metadata_cache.components(self._jira, meta, project)
+            except Exception as e:
+                logger.debug("components of %s unavailable: %s", project, e)
+        meta.validate_update(project, fields)
+
     def find_lvl2_new_features(self, sprint: str, squad: str) -> List[str]:
-        terms = [JQL_LVL2_FOR_PCI_ROOT, f"sprint = {sprint}", JQL_NOT_CLOSED]
-        if squad == 'Network':
-            terms.append(JQL_LVL2_NETWORK_ONLY)
-        jql = ' AND '.join(terms) + ' ORDER BY priority DESC'
-        issues = _run_search(self._jira, jql)
+        where = [JQL_LVL2_FOR_PCI_ROOT, f"sprint = {sprint}", JQL_NOT_CLOSED]
+        spec = get_squad(squad)
+        if spec is not None and jql_lvl2_squad(spec):
+            where.append(jql_lvl2_squad(spec))
+        issues = self.planner.run(Search(tuple(where), 'priority DESC', ttl=TTL_LVL2_ROOTS))
         return [i.key for i in issues]
 
-    def find_pci_children_by_parent_link(self, parent_key: str) -> List[str]:
-        # Match current logic used in LVL2feature.get_childs
-        jql = (
-            f'Project = PCI AND "Parent Link" = {parent_key} AND '
-            f'type in (Epic, Story, Task) AND '
-            f'(Component = "Network" OR labels = "Openstack_Networking") AND '
-            f'{JQL_NOT_CLOSED} ORDER BY priority DESC'
-        )
-        issues = _run_search(self._jira, jql)
-        return [i.key for i in issues]
+    def find_pci_children_by_parent_link(self, parent_key: str, squad: Optional[str] = None) -> List[str]:
+        return [i.key for i in self.planner.run(_parent_link_search(parent_key, squad))]
 
-    def find_children_by_epic_link(self, epic_key: str, squad: str) -> List[str]:
-        # Match current logic used in PCIEpic.get_childs (filters to Network component)
-        component_filter = 'Component = "Network"' if squad == 'Network' else ''
-        filters = [f'"Epic Link" = {epic_key}', 'type in (Epic, Story, Task)']
-        if component_filter:
-            filters.append(component_filter)
-        filters.append(JQL_NOT_CLOSED)
-        jql = ' AND '.join(filters) + ' ORDER BY status'
-        issues = _run_search(self._jira, jql)
-        return [i.key for i in issues]
+    def find_pci_children_by_parent_links(self, parent_keys: List[str], squad: Optional[str] = None) -> Dict[str, List[str]]:
+        results = self.planner.run_many([_parent_link_search(k, squad) for k in parent_keys])
+        return {k: [i.key for i in issues] for k, issues in zip(parent_keys, results)}
+
+    def find_children_by_epic_link(self, epic_key: str, squad: Optional[str]) -> List[str]:
+        return [i.key for i in self.planner.run(_epic_link_search(epic_key, squad))]
+
+    def find_children_by_epic_links(self, epic_keys: List[str], squad: Optional[str]) -> Dict[str, List[str]]:
+        results = self.planner.run_many([_epic_link_search(k, squad) for k in epic_keys])
+        return {k: [i.key for i in issues] for k, issues in zip(epic_keys, results)}
 
     def find_pci_keys_with_label_and_squad(self, label: str, squad: str) -> List[str]:
-        filters = [JQL_PCI_ROOT, f'Component = {squad}', f'labels = "{label}"', JQL_NOT_CLOSED]
-        jql = ' AND '.join(filters) + ' ORDER BY priority DESC'
-        issues = _run_search(self._jira, jql)
+        where = [JQL_PCI_ROOT, f'Component = {squad}', f'labels = "{label}"', JQL_NOT_CLOSED]
+        issues = self.planner.run(Search(tuple(where), 'priority DESC', ttl=TTL_LABEL_SEARCH))
         return [i.key for i in issues]
 
+    def find_pci_with_labels(self, labels: List[str], squad: str) -> List[dict[str, Any]]:
+        spec = get_squad(squad)
+        where = [JQL_PCI_ROOT, f'Component = {_q(spec.component if spec else squad)}',
+                 f'labels in ({", ".join(_q(label) for label in labels)})', JQL_NOT_CLOSED]
+        jql = f'{" AND ".join(where)} ORDER BY key'
+        logger.debug("JQL: %s", jql)
+        with span("jql", "jira", jql=jql) as s:
+            issues = self._jira.search_issues(jql, fields=pci_domain_fields(), maxResults=False)
+            s.set(count=len(issues))
+        return [i.raw for i in issues]
+
+    def find_updated_since(self, minutes: int, squad: str) -> List[dict[str, Any]]:
+        # Relative offset ("-5m") avoids depending on the server/user timezone.
+        # Closed statuses are kept so that transitions to Done are seen.
+        lvl2 = [JQL_LVL2_FOR_PCI_ROOT]
+        spec = get_squad(squad)
+        if spec is not None and jql_lvl2_squad(spec):
+            lvl2.append(jql_lvl2_squad(spec))
+        pci = [JQL_PCI_ROOT, f'Component = {_q(spec.component) if spec else squad}']
+        jql = (
+            f'(({" AND ".join(lvl2)}) OR ({" AND ".join(pci)})) '
+            f'AND updated >= -{int(minutes)}m ORDER BY updated ASC'
+        )
+        logger.debug("JQL: %s", jql)
+        with span("jql", "jira", jql=jql) as s:
+            issues = self._jira.search_issues(jql, expand="changelog", maxResults=False)
+            s.set(count=len(issues))
+        return [i.raw for i in issues]
+
     # -----------------
-    # Mutations are handled via update_fields
+    # Mutations are handled via update_fields, plus bulk helpers below
     # -----------------
+    def add_labels(self, keys: List[str], label: str) -> List[str]:
+        """Add `label` to every issue in `keys` with as few requests as possible.
+
+        Uses the Jira Cloud bulk edit endpoint when available; otherwise (Server/DC)
+        sends chunked, parallel PUTs with the `add` verb. Both are idempotent on the
+        server side so no per-issue read is performed: callers filter already
+        labeled issues from their own snapshot.
+        Returns the keys that were labeled: with per-issue updates, failures are
+        logged per key and the remaining issues are still sent.
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return []
+        # Once per project (key prefix): metadata checks are per project
+        by_project: Dict[str, str] = {}
+        for key in keys:
+            by_project.setdefault(key.split("-")[0], key)
+        for key in by_project.values():
+            self._validate_update(key, {"labels": [label]})
+        logger.info("bulk add label %s to %d issues", label, len(keys))
+        self._invalidate_searches()
+        if getattr(self._jira, "_is_cloud", False):
+            try:
+                for i in range(0, len(keys), BULK_EDIT_MAX_ISSUES):
+                    self._bulk_add_label(keys[i:i + BULK_EDIT_MAX_ISSUES], label)
+                self.writes += len(keys)
+                return keys
+            except Exception as e:
+                # Keys already submitted are fine to resend: `add` is idempotent
+                logger.warning("bulk edit unavailable (%s), fallback to per-issue updates", e)
+        labeled: List[str] = []
+        for i in range(0, len(keys), PUT_CHUNK_SIZE):
+            chunk = keys[i:i + PUT_CHUNK_SIZE]
+            with ThreadPoolExecutor(max_workers=min(PUT_MAX_WORKERS, len(chunk))) as pool:
+                futures = [(k, pool.submit(self._put_add_label, k, label)) for k in chunk]
+            for k, future in futures:
+                e = future.exception()
+                if e is None:
+                    labeled.append(k)
+                else:
+                    logger.error("Failed to add label %s to %s: %s", label, k, e)
+        self.writes += len(labeled)
+        return labeled
+
+    def _bulk_add_label(self, keys: List[str], label: str) -> None:
+        url = self._jira._get_url("bulk/issues/fields").replace("/api/2/", "/api/3/")
+        payload = {
+            "selectedIssueIdsOrKeys": keys,
+            "selectedActions": ["labels"],
+            "editedFieldsInput": {
+                "labelsFields": [
+                    {
+                        "fieldId": "labels",
+                        "bulkEditMultiSelectFieldOption": "ADD",
+                        "labels": [{"name": label}],
+                    }
+                ]
+            },
+            "sendBulkNotification": False,
+        }
+        logger.debug("bulk edit labels for %s", ", ".join(keys))
+        self._jira._session.post(url, data=json.dumps(payload))
+
+    def _put_add_label(self, key: str, label: str) -> None:
+        url = self._jira._get_url(f"issue/{key}")
+        logger.debug("add label %s to %s", label, key)
+        self._jira._session.put(url, data=json.dumps({"update": {"labels": [{"add": label}]}}))
+
+    def _invalidate_searches(self) -> None:
+        # Cached search results may include/exclude the written issues
+        if self.planner.cache is not None:
+            self.planner.cache.invalidate()
 
     # -----------------
     # Generic field access
@@ -103,6 +388,7 @@ class JiraRepository:
         #   Jira state and sends the minimal diff.
         if not fields:
             return
+        self._validate_update(key, fields)
         # Read current for idempotence
         cur = self.get_fields(key, list(fields.keys()))
         payload: dict[str, Any] = {}
@@ -137,3 +423,5 @@ class JiraRepository:
             logger.info("update fields for %s: %s", key, ", ".join(payload.keys()))
             issue = self._jira.issue(key)
             issue.update(fields=payload)
+            self._invalidate_searches()
+            self.writes += 1
@@ -0,0 +1,221 @@
+"""Structured JQL searches and a planner merging them into fewer requests.
+
+A `Search` is a set of AND-ed predicates plus, optionally, one "link"
+predicate whose value varies between otherwise identical searches (e.g. the
+parent key in `"Epic Link" = PCI-1`). Searches of the same shape are merged
+into `link in (...)` batches whose encoded JQL stays under a URL length bound;
+results are mapped back to each original search through the link field value
+returned with every issue. Identical searches are run once, including when
+issued concurrently by several threads. Searches carrying a `ttl` are served
+from an optional SearchCache (adapter.search_cache).
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import urllib.parse
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from .search_cache import SearchCache
+
+
+logger = logging.getLogger(__name__)
+
+# Searches are sent as GET query strings: keep the encoded JQL well under
+# common proxy/server URL limits (8 KiB).
+MAX_JQL_LENGTH = 6000
+MAX_IN_VALUES = 100
+
+
+def quote(value: str) -> str:
+    """JQL string literal."""
+    return '"' + value.replace('"', '\\"') + '"'
+
+
+@dataclass(frozen=True)
+class Search:
+    """One JQL search: AND-ed `where` predicates, optional varying `link = value`."""
+
+    where: Tuple[str, ...]
+    order_by: str = ""
+    link: Optional[str] = None  # JQL name of the varying field, e.g. '"Epic Link"'
+    value: Optional[str] = None
+    ttl: Optional[float] = field(default=None, compare=False)  # seconds results may be cached
+
+    @property
+    def shape(self) -> Tuple[Tuple[str, ...], str, Optional[str]]:
+        return self.where, self.order_by, self.link
+
+    def jql(self, values: Optional[Sequence[str]] = None) -> str:
+        terms = []
+        if self.link is not None:
+            values = list(values) if values is not None else [self.value or ""]
+            if len(values) == 1:
+                terms.append(f"{self.link} = {values[0]}")
+            else:
+                terms.append(f"{self.link} in ({', '.join(values)})")
+        terms.extend(self.where)
+        jql = " AND ".join(terms)
+        return f"{jql} ORDER BY {self.order_by}" if self.order_by else jql
+
+
+def _encoded_length(jql: str) -> int:
+    return len(urllib.parse.quote(jql, safe=""))
+
+
+def chunk_values(search: Search, values: Sequence[str], max_length: int = MAX_JQL_LENGTH,
+                 max_values: int = MAX_IN_VALUES) -> List[List[str]]:
+    """Split `values` into IN-batches whose JQL stays within `max_length`."""
+    chunks: List[List[str]] = []
+    cur: List[str] = []
+    for value in values:
+        if cur and (len(cur) >= max_values or _encoded_length(search.jql(cur + [value])) > max_length):
+            chunks.append(cur)
+            cur = []
+        cur.append(value)
+    if cur:
+        chunks.append(cur)
+    return chunks
+
+
+def link_value(raw: Any) -> Optional[str]:
+    """Issue key held by a link field as returned by the REST API.
+
+    Epic Link is a plain key; Parent Link (Advanced Roadmaps) is an object
+    carrying the key directly or under `data`.
+    """
+    if raw is None:
+        return None
+    if isinstance(raw, str):
+        return raw
+    if isinstance(raw, dict):
+        return raw.get("key") or (raw.get("data") or {}).get("key")
+    return getattr(raw, "key", None) or link_value(getattr(raw, "data", None))
+
+
+class JqlPlanner:
+    """Run searches with merging, chunking and in-flight de-duplication.
+
+    - `execute(jql, fields)` runs one search and returns issue objects
+      (`.key`, `.raw["fields"]`), e.g. a JIRA.search_issues wrapper.
+    - `link_fields` maps a link JQL name ('"Epic Link"') to the field id whose
+      value identifies the search an issue belongs to; shapes without an id
+      are never merged.
+    - `cache` serves and stores the results of searches with a `ttl`.
+    """
+
+    def __init__(self, execute: Callable[[str, str], List[Any]],
+                 link_fields: Optional[Callable[[], Dict[str, str]]] = None,
+                 max_length: int = MAX_JQL_LENGTH, cache: Optional[SearchCache] = None) -> None:
+        self._execute = execute
+        self._link_fields = link_fields or (lambda: {})
+        self._max_length = max_length
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self.requests = 0
+        self.searches = 0
+
+    def run(self, search: Search) -> List[Any]:
+        return self.run_many([search])[0]
+
+    def run_many(self, searches: Iterable[Search]) -> List[List[Any]]:
+        """Results of each search, in order; same-shape searches share requests."""
+        searches = list(searches)
+        cached = self._from_cache(searches)
+        owned: Dict[str, Search] = {}
+        futures: List[Future] = []
+        with self._lock:
+            self.searches += len(searches)
+            for search in searches:
+                jql = search.jql()
+                if jql in cached:
+                    fut = Future()
+                    fut.set_result(cached[jql])
+                    futures.append(fut)
+                    continue
+                fut = self._inflight.get(jql)
+                if fut is None:
+                    fut = self._inflight[jql] = Future()
+                    owned[jql] = search
+                futures.append(fut)
+        try:
+            self._run_owned(owned)
+        finally:
+            with self._lock:
+                for jql in owned:
+                    fut = self._inflight.pop(jql)
+                    if not fut.done():
+                        fut.set_exception(RuntimeError(f"search not resolved: {jql}"))
+        results = [fut.result() for fut in futures]
+        if self.cache is not None:
+            by_jql = {s.jql(): r for s, r in zip(searches, results)}
+            for jql, search in owned.items():
+                if search.ttl is not None:
+                    self.cache.put(jql, "key", by_jql[jql])
+        return results
+
+    def _from_cache(self, searches: List[Search]) -> Dict[str, List[Any]]:
+        """Results of cached searches by JQL; stale ones are refreshed in the background."""
+        out: Dict[str, List[Any]] = {}
+        if self.cache is None:
+            return out
+        from .search_cache import MISS, STALE
+
+        for search in searches:
+            if search.ttl is None:
+                continue
+            jql = search.jql()
+            state, issues = self.cache.lookup(jql, "key", search.ttl)
+            if state == MISS:
+                continue
+            out[jql] = issues
+            if state == STALE:
+                self.cache.revalidate(jql, "key", lambda jql=jql: self._search(jql, "key"))
+        return out
+
+    def _run_owned(self, owned: Dict[str, Search]) -> None:
+        by_shape: Dict[Any, List[Tuple[str, Search]]] = {}
+        for jql, search in owned.items():
+            by_shape.setdefault(search.shape, []).append((jql, search))
+        link_fields = self._link_fields() if any(len(v) > 1 for v in by_shape.values()) else {}
+        for group in by_shape.values():
+            first = group[0][1]
+            field_id = link_fields.get(first.link or "")
+            if len(group) == 1 or field_id is None:
+                for jql, _ in group:
+                    self._resolve(jql, lambda jql=jql: self._search(jql, "key"))
+                continue
+            by_value = {search.value: jql for jql, search in group}
+            for values in chunk_values(first, list(by_value), self._max_length):
+                try:
+                    issues = self._search(first.jql(values), f"key,{field_id}")
+                except Exception as e:
+                    for value in values:
+                        self._inflight[by_value[value]].set_exception(e)
+                    continue
+                # Map results back; a merged search keeps the ORDER BY of each part
+                buckets: Dict[str, List[Any]] = {value: [] for value in values}
+                for issue in issues:
+                    fields = (getattr(issue, "raw", None) or {}).get("fields") or {}
+                    owner = link_value(fields.get(field_id))
+                    if owner in buckets:
+                        buckets[owner].append(issue)
+                for value, found in buckets.items():
+                    self._inflight[by_value[value]].set_result(found)
+
+    def _resolve(self, jql: str, call: Callable[[], List[Any]]) -> None:
+        fut = self._inflight[jql]
+        try:
+            fut.set_result(call())
+        except Exception as e:
+            fut.set_exception(e)
+
+    def _search(self, jql: str, fields: str) -> List[Any]:
+        with self._lock:
+            self.requests += 1
+        logger.debug("JQL: %s", jql)
+        return self._execute(jql, fields)
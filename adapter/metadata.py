@@ -0,0 +1,149 @@
+"""Jira metadata (fields, priorities, statuses, components) cached on disk.
+
+Field ids, priority/status names and project components change rarely; they
+are fetched once per TTL (a day by default) into `{cache_dir}/metadata.json`
+and used to resolve logical field names to ids and to reject invalid update
+payloads before they are sent.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+METADATA_TTL = 24 * 3600
+
+
+def _name(obj: Any) -> str:
+    return obj["name"] if isinstance(obj, dict) else getattr(obj, "name", str(obj))
+
+
+@dataclass
+class JiraMetadata:
+    fields: List[Dict[str, Any]]  # raw /field entries: id, name, custom, schema
+    priorities: List[str]
+    statuses: List[str]
+    components: Dict[str, List[str]] = field(default_factory=dict)  # project key -> names
+    fetched_at: float = 0.0
+
+    @classmethod
+    def fetch(cls, jira: Any, fetched_at: float) -> "JiraMetadata":
+        """Read the metadata endpoints with a JIRA client (components are per project, on demand)."""
+        fields = [{"id": f["id"], "name": f.get("name", ""), "custom": f.get("custom", False),
+                   "schema": f.get("schema") or {}} for f in jira.fields()]
+        return cls(
+            fields=fields,
+            priorities=[_name(p) for p in jira.priorities()],
+            statuses=[_name(s) for s in jira.statuses()],
+            fetched_at=fetched_at,
+        )
+
+    # ---------------
+    # Lookups
+    # ---------------
+    @property
+    def field_ids(self) -> Dict[str, List[str]]:
+        """Field name -> ids (custom field names are not unique)."""
+        out: Dict[str, List[str]] = {}
+        for f in self.fields:
+            out.setdefault(f["name"], []).append(f["id"])
+        return out
+
+    def field_schema(self, field_id: str) -> Optional[Dict[str, Any]]:
+        return next((f["schema"] for f in self.fields if f["id"] == field_id), None)
+
+    def unknown_statuses(self, names: Iterable[str]) -> List[str]:
+        known = set(self.statuses)
+        return [n for n in names if n not in known]
+
+    # ---------------
+    # Validation
+    # ---------------
+    def validate_update(self, project: str, payload: Dict[str, Any]) -> None:
+        """Raise ValueError if `payload` ({field id: Jira value}) cannot be written."""
+        errors = []
+        for field_id, value in payload.items():
+            schema = self.field_schema(field_id)
+            if schema is None:
+                errors.append(f"unknown field {field_id}")
+                continue
+            if field_id == "priority" and value is not None and _name(value) not in self.priorities:
+                errors.append(f"unknown priority {_name(value)!r}")
+            elif field_id == "components" and project in self.components:
+                unknown = [_name(c) for c in value or [] if _name(c) not in self.components[project]]
+                if unknown:
+                    errors.append(f"unknown {project} components {unknown}")
+            elif field_id == "labels":
+                bad = [v for v in value or [] if not isinstance(v, str) or not v or " " in v]
+                if bad:
+                    errors.append(f"invalid labels {bad}")
+            elif schema.get("type") == "number" and value is not None and not isinstance(value, (int, float)):
+                errors.append(f"{field_id} expects a number, got {value!r}")
+        if errors:
+            raise ValueError(f"invalid update for {project}: " + "; ".join(errors))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"fields": self.fields, "priorities": self.priorities, "statuses": self.statuses,
+                "components": self.components, "fetched_at": self.fetched_at}
+
+
+class MetadataCache:
+    """Loads JiraMetadata from `{cache_dir}/metadata.json`, refetching after `ttl`."""
+
+    def __init__(self, cache_dir: Optional[str] = './out/.metadata-cache', ttl: float = METADATA_TTL,
+                 clock: Callable[[], float] = time.time) -> None:
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.cache_dir or "", "metadata.json")
+
+    def load(self, connect: Callable[[], Any]) -> JiraMetadata:
+        """Cached metadata; `connect()` returns the JIRA client, only called to refetch."""
+        with self._lock:
+            meta = self._read()
+            if meta is not None and self._clock() - meta.fetched_at <= self.ttl:
+                return meta
+            logger.info("refresh Jira metadata (fields, priorities, statuses)")
+            meta = JiraMetadata.fetch(connect(), self._clock())
+            self.save(meta)
+            return meta
+
+    def components(self, jira: Any, meta: JiraMetadata, project: str) -> List[str]:
+        """Component names of `project`, fetched once per metadata refresh."""
+        with self._lock:
+            if project not in meta.components:
+                meta.components[project] = [_name(c) for c in jira.project_components(project)]
+                self.save(meta)
+            return meta.components[project]
+
+    def save(self, meta: JiraMetadata) -> None:
+        if self.cache_dir is None:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(meta.to_dict(), fh)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning("Failed to write metadata cache %s: %s", self.path, e)
+
+    def _read(self) -> Optional[JiraMetadata]:
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                return JiraMetadata(**json.load(fh))
+        except (OSError, ValueError, TypeError):
+            return None
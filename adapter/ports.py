@@ -1,4 +1,4 @@
-from typing import Protocol, List, Any
+from typing import Protocol, Dict, List, Any, Optional
 
 
 class Repository(Protocol):
@@ -8,18 +8,49 @@ class Repository(Protocol):
     def find_lvl2_new_features(self, sprint: str, squad: str) -> List[str]:
         ...
 
-    def find_pci_children_by_parent_link(self, parent_key: str) -> List[str]:
+    # squad=None: children of all squads (shared multi-squad builds filter locally)
+    def find_pci_children_by_parent_link(self, parent_key: str, squad: Optional[str] = None) -> List[str]:
         ...
 
-    def find_children_by_epic_link(self, epic_key: str, squad: str) -> List[str]:
+    def find_children_by_epic_link(self, epic_key: str, squad: Optional[str]) -> List[str]:
+        ...
+
+    # Batched forms ({parent key: child keys}); optional, see tree_builder.child_keys_batch
+    def find_pci_children_by_parent_links(self, parent_keys: List[str], squad: Optional[str] = None) -> Dict[str, List[str]]:
+        ...
+
+    def find_children_by_epic_links(self, epic_keys: List[str], squad: Optional[str]) -> Dict[str, List[str]]:
         ...
 
     def find_pci_keys_with_label_and_squad(self, label: str, squad: str) -> List[str]:
         ...
 
+    def find_pci_with_labels(self, labels: List[str], squad: str) -> List[dict[str, Any]]:
+        """REST payloads ({key, fields}) of open PCI issues of the squad carrying
+        any of `labels`, projected to the fields read by lsd.mappers.to_domain."""
+        ...
+
+    def find_updated_since(self, minutes: int, squad: str) -> List[dict[str, Any]]:
+        """REST payloads ({key, fields, changelog}) of LVL2/PCI issues updated in
+        the last `minutes`, closed ones included."""
+        ...
+
     # Generic field access (productizing customfields)
     def get_fields(self, key: str, fields: List[str]) -> dict[str, Any]:
         ...
 
     def update_fields(self, key: str, fields: dict[str, Any]) -> None:
         ...
+
+    # Bulk mutations
+    def add_labels(self, keys: List[str], label: str) -> List[str]:
+        ...
+
+
+def find_children_batch(repo: Any, batch: str, single: str, keys: List[str], squad: Optional[str]) -> Dict[str, List[str]]:
+    """Call the batched search `batch` of `repo`, or `single` once per key when
+    the repository does not provide it (batched forms are optional)."""
+    method = getattr(repo, batch, None)
+    if method is not None:
+        return method(keys, squad)
+    return {k: getattr(repo, single)(k, squad) for k in keys}
@@ -0,0 +1,205 @@
+"""Search-result cache for slowly changing JQL searches.
+
+Entries hold the issue keys (and requested fields) returned by one search,
+keyed by the normalized JQL plus the requested fields. They live in memory
+(LRU bounded) and, when a directory is given, on disk so that runs a few
+minutes apart share them. Each lookup carries the TTL of its query:
+
+- fresh entries are returned as is;
+- stale entries are returned immediately when `stale_while_revalidate` is set,
+  while one background thread per entry runs the search again;
+- otherwise the caller runs the search and stores the result.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+FRESH, STALE, MISS = "fresh", "stale", "miss"
+
+
+def normalize_jql(jql: str) -> str:
+    return " ".join(jql.split())
+
+
+class CachedIssue:
+    """Search result served from the cache (same `.key` / `.raw` as jira issues)."""
+
+    __slots__ = ("key", "raw")
+
+    def __init__(self, raw: Dict[str, Any]) -> None:
+        self.key = raw["key"]
+        self.raw = raw
+
+
+class SearchCache:
+    """Search results by (normalized JQL, fields); `cache_dir=None` keeps them in memory only."""
+
+    def __init__(self, cache_dir: Optional[str] = './out/.search-cache', max_entries: int = 256,
+                 stale_while_revalidate: bool = False, clock: Callable[[], float] = time.time) -> None:
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.stale_while_revalidate = stale_while_revalidate
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._refreshing: Dict[str, threading.Thread] = {}
+        self.hits = 0
+        self.stale = 0
+        self.misses = 0
+
+    def summary(self) -> str:
+        return f"search cache: {self.hits} fresh, {self.stale} stale, {self.misses} misses"
+
+    # ---------------
+    # Lookup / store
+    # ---------------
+    @staticmethod
+    def digest(jql: str, fields: str) -> str:
+        import hashlib  # ~5 ms: kept off the CLI import path
+
+        key = f"{normalize_jql(jql)}\n{','.join(sorted(fields.split(',')))}"
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def lookup(self, jql: str, fields: str, ttl: float) -> Tuple[str, Optional[List[CachedIssue]]]:
+        """(FRESH|STALE|MISS, cached issues); STALE only with stale_while_revalidate."""
+        digest = self.digest(jql, fields)
+        entry = self._get(digest)
+        if entry is not None:
+            stored_at, raws = entry
+            if self._clock() - stored_at <= ttl:
+                state = FRESH
+            elif self.stale_while_revalidate:
+                state = STALE
+            else:
+                entry = None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return MISS, None
+            if state == FRESH:
+                self.hits += 1
+            else:
+                self.stale += 1
+        return state, [CachedIssue(raw) for raw in raws]
+
+    def put(self, jql: str, fields: str, issues: List[Any]) -> None:
+        wanted = [f for f in fields.split(",") if f != "key"]
+        raws = []
+        for issue in issues:
+            src = (getattr(issue, "raw", None) or {}).get("fields") or {}
+            raws.append({"key": issue.key, "fields": {f: src.get(f) for f in wanted}})
+        digest = self.digest(jql, fields)
+        stored_at = self._clock()
+        with self._lock:
+            self._remember(digest, (stored_at, raws))
+        if self.cache_dir is not None:
+            self._write(digest, {"jql": normalize_jql(jql), "fields": fields, "stored_at": stored_at, "issues": raws})
+
+    def revalidate(self, jql: str, fields: str, search: Callable[[], List[Any]]) -> None:
+        """Run `search` in the background and store its result (once per entry)."""
+        digest = self.digest(jql, fields)
+
+        def refresh() -> None:
+            try:
+                self.put(jql, fields, search())
+            except Exception as e:
+                logger.warning("search cache refresh failed (%s): %s", e, jql)
+            finally:
+                with self._lock:
+                    self._refreshing.pop(digest, None)
+
+        with self._lock:
+            if digest in self._refreshing:
+                return
+            # Not a daemon thread: a CLI run exits after the refresh is stored
+            thread = self._refreshing[digest] = threading.Thread(target=refresh, name="search-refresh")
+        thread.start()
+
+    def wait(self) -> None:
+        """Block until background refreshes are done."""
+        while True:
+            with self._lock:
+                threads = list(self._refreshing.values())
+            if not threads:
+                return
+            for thread in threads:
+                thread.join()
+
+    def invalidate(self) -> None:
+        """Drop every entry (after writes that may change search results)."""
+        with self._lock:
+            self._entries.clear()
+        if self.cache_dir is None:
+            return
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for name in names:
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+
+    # ---------------
+    # Storage
+    # ---------------
+    def _remember(self, digest: str, entry: Tuple[float, List[Dict[str, Any]]]) -> None:
+        self._entries[digest] = entry
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir or "", f"{digest}.json")
+
+    def _get(self, digest: str) -> Optional[Tuple[float, List[Dict[str, Any]]]]:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                self._entries.move_to_end(digest)
+                return entry
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._path(digest), encoding="utf-8") as fh:
+                data = json.load(fh)
+            entry = (float(data["stored_at"]), list(data["issues"]))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        with self._lock:
+            self._remember(digest, entry)
+        return entry
+
+    def _write(self, digest: str, data: Dict[str, Any]) -> None:
+        path = self._path(digest)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)  # type: ignore[arg-type]
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(data, fh)
+            os.replace(tmp, path)
+            self._prune()
+        except OSError as e:
+            logger.warning("Failed to write search cache entry %s: %s", path, e)
+
+    def _prune(self) -> None:
+        # Least recently stored entries go first once the directory is over bound
+        entries = [e for e in os.scandir(self.cache_dir) if e.name.endswith(".json")]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
@@ -1,7 +1,7 @@
 import logging
-from typing import List, Any
+from typing import Callable, Dict, List, Any, Optional
 
-from .ports import Repository
+from .ports import Repository, find_children_batch
 
 
 logger = logging.getLogger(__name__)
@@ -12,10 +12,14 @@ class SimRepository(Repository):
 
     All read/search operations are delegated to the wrapped repository.
     Only `update_fields` is intercepted to avoid side effects in simulation mode.
+    An optional `on_change(key, fields)` listener receives each skipped update
+    (the change plan), e.g. to stream it out.
     """
 
-    def __init__(self, wrapped: Repository) -> None:
+    def __init__(self, wrapped: Repository, on_change: Optional[Callable[[str, dict[str, Any]], None]] = None) -> None:
         self._wrapped = wrapped
+        self._on_change = on_change
+        self.skipped = 0  # issue writes not sent (metrics)
 
     # ---------------
     # Reads / search
@@ -26,15 +30,29 @@ class SimRepository(Repository):
     def find_lvl2_new_features(self, sprint: str, squad: str) -> List[str]:
         return self._wrapped.find_lvl2_new_features(sprint, squad)
 
-    def find_pci_children_by_parent_link(self, parent_key: str) -> List[str]:
-        return self._wrapped.find_pci_children_by_parent_link(parent_key)
+    def find_pci_children_by_parent_link(self, parent_key: str, squad: Optional[str] = None) -> List[str]:
+        return self._wrapped.find_pci_children_by_parent_link(parent_key, squad)
 
-    def find_children_by_epic_link(self, epic_key: str, squad: str) -> List[str]:
+    def find_children_by_epic_link(self, epic_key: str, squad: Optional[str]) -> List[str]:
         return self._wrapped.find_children_by_epic_link(epic_key, squad)
 
+    def find_pci_children_by_parent_links(self, parent_keys: List[str], squad: Optional[str] = None) -> Dict[str, List[str]]:
+        return find_children_batch(self._wrapped, "find_pci_children_by_parent_links",
+                                   "find_pci_children_by_parent_link", parent_keys, squad)
+
+    def find_children_by_epic_links(self, epic_keys: List[str], squad: Optional[str]) -> Dict[str, List[str]]:
+        return find_children_batch(self._wrapped, "find_children_by_epic_links",
+                                   "find_children_by_epic_link", epic_keys, squad)
+
     def find_pci_keys_with_label_and_squad(self, label: str, squad: str) -> List[str]:
         return self._wrapped.find_pci_keys_with_label_and_squad(label, squad)
 
+    def find_pci_with_labels(self, labels: List[str], squad: str) -> List[dict[str, Any]]:
+        return self._wrapped.find_pci_with_labels(labels, squad)
+
+    def find_updated_since(self, minutes: int, squad: str) -> List[dict[str, Any]]:
+        return self._wrapped.find_updated_since(minutes, squad)
+
     # ---------------
     # Generic field access
     # ---------------
@@ -60,3 +78,18 @@ class SimRepository(Repository):
             return
         pretty = ", ".join(f"{k}={v!r}" for k, v in fields.items())
         logger.info("[SIMU] skip update for %s: %s", key, pretty)
+        self.skipped += 1
+        if self._on_change is not None:
+            self._on_change(key, fields)
+
+    def add_labels(self, keys: List[str], label: str) -> List[str]:
+        # Same policy as update_fields: log the bulk operation instead of sending it.
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return []
+        logger.info("[SIMU] skip bulk add label %r for %d issues: %s", label, len(keys), ", ".join(keys))
+        self.skipped += len(keys)
+        if self._on_change is not None:
+            for key in keys:
+                self._on_change(key, {"labels": {"add": label}})
+        return keys
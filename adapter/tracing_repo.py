@@ -0,0 +1,97 @@
+from typing import Any, Dict, List, Optional
+
+from lsd.tracing import span
+
+from .ports import Repository, find_children_batch
+
+
+def _count(result: Any) -> int:
+    if isinstance(result, dict):
+        return sum(len(v) for v in result.values())
+    return len(result)
+
+
+class TracingRepository(Repository):
+    """Repository decorator recording one span per call (see lsd.tracing).
+
+    Spans are named `repo.<method>` and carry the issue key(s), squad and
+    result count. Wrap the remote repository directly so that the trace shows
+    actual Jira round trips, not identity-map hits.
+    """
+
+    def __init__(self, wrapped: Repository) -> None:
+        self._wrapped = wrapped
+
+    # ---------------
+    # Reads / search
+    # ---------------
+    def get_issue(self, key: str) -> Any:
+        with span("repo.get_issue", "repo", key=key):
+            return self._wrapped.get_issue(key)
+
+    def find_lvl2_new_features(self, sprint: str, squad: str) -> List[str]:
+        with span("repo.find_lvl2_new_features", "repo", sprint=sprint, squad=squad) as s:
+            keys = self._wrapped.find_lvl2_new_features(sprint, squad)
+            s.set(count=len(keys))
+            return keys
+
+    def find_pci_children_by_parent_link(self, parent_key: str, squad: Optional[str] = None) -> List[str]:
+        with span("repo.find_pci_children_by_parent_link", "repo", key=parent_key, squad=squad) as s:
+            keys = self._wrapped.find_pci_children_by_parent_link(parent_key, squad)
+            s.set(count=len(keys))
+            return keys
+
+    def find_children_by_epic_link(self, epic_key: str, squad: Optional[str]) -> List[str]:
+        with span("repo.find_children_by_epic_link", "repo", key=epic_key, squad=squad) as s:
+            keys = self._wrapped.find_children_by_epic_link(epic_key, squad)
+            s.set(count=len(keys))
+            return keys
+
+    def find_pci_children_by_parent_links(self, parent_keys: List[str], squad: Optional[str] = None) -> Dict[str, List[str]]:
+        with span("repo.find_pci_children_by_parent_links", "repo", keys=len(parent_keys), squad=squad) as s:
+            out = find_children_batch(self._wrapped, "find_pci_children_by_parent_links",
+                                      "find_pci_children_by_parent_link", parent_keys, squad)
+            s.set(count=_count(out))
+            return out
+
+    def find_children_by_epic_links(self, epic_keys: List[str], squad: Optional[str]) -> Dict[str, List[str]]:
+        with span("repo.find_children_by_epic_links", "repo", keys=len(epic_keys), squad=squad) as s:
+            out = find_children_batch(self._wrapped, "find_children_by_epic_links",
+                                      "find_children_by_epic_link", epic_keys, squad)
+            s.set(count=_count(out))
+            return out
+
+    def find_pci_keys_with_label_and_squad(self, label: str, squad: str) -> List[str]:
+        with span("repo.find_pci_keys_with_label_and_squad", "repo", label=label, squad=squad) as s:
+            keys = self._wrapped.find_pci_keys_with_label_and_squad(label, squad)
+            s.set(count=len(keys))
+            return keys
+
+    def find_pci_with_labels(self, labels: List[str], squad: str) -> List[dict[str, Any]]:
+        with span("repo.find_pci_with_labels", "repo", labels=list(labels), squad=squad) as s:
+            payloads = self._wrapped.find_pci_with_labels(labels, squad)
+            s.set(count=len(payloads))
+            return payloads
+
+    def find_updated_since(self, minutes: int, squad: str) -> List[dict[str, Any]]:
+        with span("repo.find_updated_since", "repo", minutes=minutes, squad=squad) as s:
+            payloads = self._wrapped.find_updated_since(minutes, squad)
+            s.set(count=len(payloads))
+            return payloads
+
+    # ---------------
+    # Generic field access
+    # ---------------
+    def get_fields(self, key: str, fields: List[str]) -> dict[str, Any]:
+        with span("repo.get_fields", "repo", key=key, fields=list(fields)):
+            return self._wrapped.get_fields(key, fields)
+
+    def update_fields(self, key: str, fields: dict[str, Any]) -> None:
+        with span("repo.update_fields", "repo", key=key, fields=list(fields)):
+            self._wrapped.update_fields(key, fields)
+
+    def add_labels(self, keys: List[str], label: str) -> List[str]:
+        with span("repo.add_labels", "repo", label=label, keys=len(keys)) as s:
+            added = self._wrapped.add_labels(keys, label)
+            s.set(count=len(added))
+            return added
@@ -1,14 +1,13 @@
+import atexit
 import os
 import sys
+import json
 import argparse
 import logging
 import re
-from jira import JIRA
 from lsd.logging_utils import setup_logging
-from adapter import JiraRepository, SimRepository
-from lsd.tree_builder import build_lsd_tree, iter_pci_epic_keys, iter_lvl2_keys
-from lsd.presenter import to_ascii
-from lsd import services
+# Other imports are deferred to the code paths using them: `--help`, argument
+# errors and thin-client runs do not pay for jira/requests or tree building.
 
 JIRA_SERVER = 'https://jira.ovhcloud.tools'
 JIRA_TOKEN = os.environ.get('JIRA_TOKEN')
@@ -30,29 +29,120 @@ def valid_quarter(s_quarter):
         logger.error('Request Quarter is %s, expecting %s, exit', s_quarter, SUPPORTED_QUARTER)
         sys.exit(1)
 
+def valid_squad(s_squad, known):
+    if s_squad not in known:
+        logger.error('Squad is %s, expecting one of %s, exit', s_squad, known)
+        sys.exit(1)
+
 def valid_pci_issue(s_pci_epic):
     if not re.search(r"^PCI-\d{4,5}$", s_pci_epic):
         logger.error('PCI Epic is %s, expecting PCI-xxxxx, exit', s_pci_epic)
         sys.exit(1)
+
+def _run_summary(repo, search_cache):
+    summary = repo.summary()
+    if search_cache is not None:
+        summary += ', ' + search_cache.summary()
+    return summary
+
+def _jira_repo_factory(server, token, get_server_info):
+    # Repository of a --processes worker: own client and connection pool
+    from adapter import JiraRepository, MetadataCache
+
+    return JiraRepository.connect(server, token, get_server_info=get_server_info, metadata_cache=MetadataCache())
+
+def _print_findings(findings, ndjson):
+    for finding in findings:
+        if ndjson:
+            ndjson.emit({"kind": "reconcile", "finding": finding.kind, "key": finding.key, "squad": finding.squad,
+                         "label": finding.label, "labels": list(finding.labels)})
+        else:
+            print(finding)
+    logger.info('%d reconciliation finding(s)', len(findings))
     
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument("year", help="fiscal formated as '26'", type=str)
-    parser.add_argument("quarter", help="quarter formated as '1'", type=str)
-    parser.add_argument("squad", help="Squad to work on", type=str, choices=['Network'])
-    parser.add_argument("--action", help="...", type=str, choices=["set-quarter", "set-prio", "find-orphans", "aggregate-points"])
+    parser.add_argument("quarter", help="quarter formated as '1', or comma-separated quarters ('1,2')", type=str)
+    parser.add_argument("squad", help="Squad to work on, comma-separated squads or 'all' (see lsd/squads.py)", type=str)
+    parser.add_argument("--action", help="...", type=str, choices=["set-quarter", "set-prio", "find-orphans", "aggregate-points", "reconcile"])
     parser.add_argument("--update", help="Apply updates to Jira (default is simulation)", action='store_true')
     parser.add_argument("--skip-closed", help="skip and LVL3 closed (only compatible with view)", action='store_true')
-    parser.add_argument("--pci-epic", help="PCI epics to apply dedicated action", type=str)
+    parser.add_argument("--format", help="Output format: ascii tree (default) or streamed NDJSON records", type=str, choices=["ascii", "ndjson"], default="ascii")
+    parser.add_argument("--workers", help="Run the child searches and issue fetches of each tree level with N threads (output order unchanged)", type=int, default=1)
+    parser.add_argument("--processes", help="Shard LVL2 roots across N worker processes (CPU-bound large builds; output order unchanged)", type=int, default=1)
+    parser.add_argument("--export", help="Export the tree to Parquet (.parquet) or Arrow IPC (other extensions)", type=str)
+    parser.add_argument("--snapshot", help="Save the built tree as a JSON snapshot (.gz to compress)", type=str)
+    parser.add_argument("--diff-from", help="Print changes between a saved snapshot and the built tree", type=str)
+    parser.add_argument("--watch", help="Stay alive and re-sync every N seconds, printing only changed nodes", type=int, metavar="SECONDS")
+    parser.add_argument("--serve", help="Run as a daemon on 127.0.0.1:PORT keeping the Jira session and trees warm", type=int, metavar="PORT")
+    parser.add_argument("--daemon", help="Thin-client mode: ask the daemon at URL (e.g. http://127.0.0.1:8765)", type=str, metavar="URL")
+    parser.add_argument("--token-file", help="Daemon token file written by --serve and read by --daemon (default ./out/.daemon-PORT.token)", type=str)
+    parser.add_argument("--tree-max-age", help="Rebuild daemon trees older than N seconds (0: never)", type=int, default=15 * 60, metavar="SECONDS")
+    parser.add_argument("--no-server-info", help="Skip the Jira server-info handshake when connecting (Server/DC)", action='store_true')
+    parser.add_argument("--no-search-cache", help="Always run root/label searches against Jira (no cached search results)", action='store_true')
+    parser.add_argument("--profile", help="Write per-phase cProfile (cpu) or tracemalloc (mem) reports to ./out", type=str, choices=["cpu", "mem"])
+    parser.add_argument("--trace", help="Write a Chrome trace-event file of the run (open in Perfetto / chrome://tracing)", type=str, metavar="FILE")
+    parser.add_argument("--metrics-file", help="Write Prometheus textfile metrics of the run to FILE at exit (node_exporter textfile collector)", type=str, metavar="FILE")
+    parser.add_argument("--log-config", help="JSON file tuning logging: {\"queued\": true, \"sample\": {\"JQL: %%s\": 10}, \"aggregate\": [...]}", type=str)
+    parser.add_argument("--squads-file", help="JSON file registering extra squads (list of lsd.squads.SquadSpec fields)", type=str)
+    parser.add_argument("--pci-epic", help="PCI epics to apply dedicated action: 'all' or comma-separated keys", type=str)
     args = parser.parse_args()
 
     # Configure logging: fixed handlers
     # - Console level: INFO
     # - File level: DEBUG at ./out/logs.txt
-    setup_logging(log_file='./out/logs.txt')
+    # - Optional queued writer and per-category sampling/aggregation (--log-config)
+    log_config = {}
+    if args.log_config:
+        with open(args.log_config, encoding='utf-8') as f:
+            log_config = json.load(f)
+    setup_logging(log_file='./out/logs.txt', queued=bool(log_config.get('queued')),
+                  sample=log_config.get('sample'), aggregate=log_config.get('aggregate'))
     logger.debug("CLI parsed args: %s", args)
 
+    from lsd.squads import load_squads, squad_names
+
+    if args.squads_file:
+        load_squads(args.squads_file)
+    valid_year(args.year)
+    quarters = [q.strip() for q in args.quarter.split(',')]
+    for q in quarters:
+        valid_quarter(q)
+    squads = squad_names() if args.squad == 'all' else [s.strip() for s in args.squad.split(',')]
+    for s in squads:
+        valid_squad(s, squad_names())
+    targets = [(args.year, q, s) for q in quarters for s in squads]
+    if len(targets) > 1:
+        # Several trees in one run: view only, issues fetched once for all targets
+        if (args.action and args.action != 'reconcile') or args.daemon or args.serve is not None or args.watch or args.export or args.snapshot or args.diff_from:
+            logger.error('Several quarters/squads only support viewing and reconciling the trees, exit')
+            sys.exit(1)
+    else:
+        args.quarter, args.squad = quarters[0], squads[0]
+
+    # Thin client: everything is served from the daemon's warm state
+    if args.daemon:
+        from lsd.daemon import DaemonClient
+
+        try:
+            client = DaemonClient(args.daemon, token_file=args.token_file)
+        except OSError as e:
+            logger.error('Daemon token unavailable (%s), is the daemon running? exit', e)
+            sys.exit(1)
+        sys.stdout.write(client.view(args.year, args.quarter, args.squad, args.skip_closed, args.format))
+        if args.action and not args.skip_closed:
+            if args.pci_epic and args.pci_epic != 'all':
+                for k in args.pci_epic.split(','):
+                    valid_pci_issue(k.strip())
+            outcome = client.action(args.year, args.quarter, args.squad, args.action, args.update, args.pci_epic)
+            for item in outcome['plan']:
+                logger.info('[SIMU] skip update for %s: %s', item['key'], item['fields'])
+            if outcome['result'] is not None:
+                print(json.dumps(outcome['result'], indent=2))
+        sys.exit(0)
+
     # Validate environment
     if not JIRA_TOKEN:
         logger.error('Environment variable JIRA_TOKEN is required but missing')
@@ -61,48 +151,193 @@ if __name__ == '__main__':
         logger.error('Environment variable JIRA_SERVER is empty')
         sys.exit(1)
 
-    valid_year(args.year)
-    valid_quarter(args.quarter)
-    
     # default: build tree and print
-    jira = JIRA(server=JIRA_SERVER, token_auth=JIRA_TOKEN)
-    base_repo = JiraRepository(jira)
+    from lsd.profiling import Profiler
+
+    # Build, presentation and action phases; no-op without --profile
+    profiler = Profiler(args.profile)
+    if args.trace:
+        from lsd.tracing import start_tracing, stop_tracing
+
+        # Spans of phases, Jira calls, tree expansion, services and rendering
+        start_tracing()
+        atexit.register(lambda: logger.info('Trace written to %s (%d spans)', args.trace, stop_tracing(args.trace)))
+    run_metrics = None
+    if args.metrics_file:
+        from lsd.metrics import RunMetrics
+
+        # Written at exit, also for failed runs (lsd_run_success 0)
+        run_metrics = RunMetrics(year=args.year, quarter=args.quarter, squad=args.squad)
+        run_metrics.track(profiler=profiler)
+        atexit.register(run_metrics.write_textfile, args.metrics_file)
+    from adapter import IdentityMapRepository, JiraRepository, MetadataCache, SearchCache, SimRepository, TracingRepository
+
+    # Root/label search results are reused across runs; view-only runs answer
+    # from stale entries at once and refresh them in the background
+    search_cache = None
+    if not args.no_search_cache:
+        search_cache = SearchCache(stale_while_revalidate=not args.action and not args.update)
+    # The Jira client is only constructed on the first request
+    # Field ids, priorities, statuses and components are cached for a day; the
+    # logical field names are resolved to the ids reported by Jira on the first
+    # Jira call, before any issue is mapped, read or written
+    jira_repo = JiraRepository.connect(JIRA_SERVER, JIRA_TOKEN, get_server_info=not args.no_server_info,
+                                       search_cache=search_cache, metadata_cache=MetadataCache(),
+                                       resolve_fields=True)
+    # Per-run identity map: each issue is fetched at most once during this run
+    # (traced below it, so that spans are actual Jira calls)
+    base_repo = IdentityMapRepository(TracingRepository(jira_repo) if args.trace else jira_repo)
+    if run_metrics:
+        run_metrics.track(jira=jira_repo, identity_map=base_repo, search_cache=search_cache)
+    # Sharded builds: each worker process connects on its own (picklable factory)
+    shard_args = {}
+    if args.processes > 1:
+        import functools
+
+        shard_args = dict(processes=args.processes,
+                          repo_factory=functools.partial(_jira_repo_factory, JIRA_SERVER, JIRA_TOKEN, not args.no_server_info))
+    if len(targets) > 1:
+        from lsd.tree_builder import build_lsd_trees
+        from lsd.presenter import NdjsonWriter, to_ascii
+
+        with profiler.phase('build'):
+            trees = build_lsd_trees(base_repo, targets, args.skip_closed, max_workers=args.workers, **shard_args)
+        ndjson = NdjsonWriter() if args.format == 'ndjson' else None
+        with profiler.phase('present'):
+            for (year, quarter, squad), tree in trees.items():
+                if ndjson:
+                    ndjson.emit({"kind": "target", "year": year, "quarter": quarter, "squad": squad})
+                    for node in tree:
+                        ndjson.node(node)
+                else:
+                    print(f'== FY{year} Q{quarter} {squad} ==')
+                    print(to_ascii(tree))
+        if args.action == 'reconcile':
+            from lsd.reconcile import reconcile
+
+            with profiler.phase('action'):
+                _print_findings(reconcile(trees, base_repo).findings, ndjson)
+        logger.info('Run summary: %d trees, %s', len(trees), _run_summary(base_repo, search_cache))
+        if run_metrics:
+            run_metrics.observe_trees(trees.values())
+            run_metrics.completed()
+        sys.exit(0)
+    if args.serve is not None:
+        from lsd.daemon import TreeDaemon, serve, DEFAULT_HOST
+
+        # Long-lived: no run-scoped identity map
+        daemon = TreeDaemon(jira_repo, max_age=args.tree_max_age or None)
+        # Pre-warm the requested target before accepting requests
+        daemon.tree(args.year, args.quarter, args.squad, args.skip_closed)
+        serve(daemon, DEFAULT_HOST, args.serve, token_file=args.token_file)
+        sys.exit(0)
+    from lsd.tree_builder import build_lsd_tree, iter_pci_epic_keys, iter_lvl2_keys
+    from lsd.presenter import ProgressiveAsciiPrinter, NdjsonWriter
+    from lsd import services
+
+    ndjson = NdjsonWriter() if args.format == 'ndjson' else None
     if args.update:
         repo = base_repo
         logger.info('Update mode enabled: changes will be applied to Jira')
     else:
-        repo = SimRepository(base_repo)
+        repo = SimRepository(base_repo, on_change=ndjson.change if ndjson else None)
+        if run_metrics:
+            run_metrics.track(sim=repo)
         logger.info('Simulation mode (default): no changes will be applied. Use --update to apply.')
-    tree = build_lsd_tree(repo, args.year, args.quarter, args.squad, args.skip_closed)
-    # Debug: list LVL2 items discovered via iterator
-    try:
-        lvl2_keys = list(iter_lvl2_keys(tree))
-        logger.debug("LVL2 items in tree: %s", ", ".join(lvl2_keys) or "<none>")
-    except Exception as e:
-        logger.debug("Failed to iterate LVL2 keys: %s", e)
-    print(to_ascii(tree))
+    # ASCII output is printed progressively, one LVL2 subtree at a time
+    printer = None if ndjson else ProgressiveAsciiPrinter()
+    # Streamed output (progressive ASCII subtrees, NDJSON nodes) is part of the build phase
+    with profiler.phase('build'):
+        tree = build_lsd_tree(repo, args.year, args.quarter, args.squad, args.skip_closed,
+                              on_node=ndjson.node if ndjson else None, on_root=printer,
+                              max_workers=args.workers, **shard_args)
+    if run_metrics:
+        run_metrics.observe_trees([tree])
+    with profiler.phase('present'):
+        if printer:
+            printer.finish(tree)
+        # Debug: list LVL2 items discovered via iterator
+        try:
+            lvl2_keys = list(iter_lvl2_keys(tree))
+            logger.debug("LVL2 items in tree: %s", ", ".join(lvl2_keys) or "<none>")
+        except Exception as e:
+            logger.debug("Failed to iterate LVL2 keys: %s", e)
+        if args.export:
+            from lsd.export import write_arrow
+
+            write_arrow(tree, args.export)
+        if args.diff_from:
+            from lsd.snapshot import load_tree
+            from lsd.diff import diff_trees
+
+            old_tree, old_meta = load_tree(args.diff_from)
+            changes = diff_trees(old_tree, tree)
+            logger.info('%d change(s) since snapshot %s %s', len(changes), args.diff_from, old_meta)
+            for change in changes:
+                if ndjson:
+                    ndjson.emit({"kind": "diff", **vars(change)})
+                else:
+                    print(change)
+        if args.snapshot:
+            from lsd.snapshot import save_tree
+
+            save_tree(tree, args.snapshot, meta={"year": args.year, "quarter": args.quarter, "squad": args.squad})
 
     # actions tweak
     if args.skip_closed:
         logger.warning('--skip-closed flag is set, skipping any other commands')
     elif args.action:
-        if args.action == "set-quarter":
-            services.propagate_sprint(tree, args.year, args.quarter, repo)
-        elif args.action == "set-prio":
-            services.propagate_priority(tree, repo)
-        elif args.action == "find-orphans":
-            services.find_orphans(tree, args.year, args.quarter, args.squad, repo)
-        elif args.action == "aggregate-points":
-            if args.pci_epic:
-                valid_pci_issue(args.pci_epic)
-                # Validate that the requested epic exists in the current tree
-                epic_keys = set(iter_pci_epic_keys(tree))
-                if args.pci_epic not in epic_keys:
-                    logger.error('PCI Epic %s not present in the current tree, exit', args.pci_epic)
+        with profiler.phase('action'):
+            if args.action == "set-quarter":
+                services.propagate_sprint(tree, args.year, args.quarter, repo)
+            elif args.action == "set-prio":
+                services.propagate_priority(tree, repo)
+            elif args.action == "find-orphans":
+                services.find_orphans(tree, args.year, args.quarter, args.squad, repo,
+                                      on_orphan=ndjson.orphan if ndjson else None)
+            elif args.action == "reconcile":
+                from lsd.reconcile import reconcile
+
+                _print_findings(reconcile({(args.year, args.quarter, args.squad): tree}, repo).findings, ndjson)
+            elif args.action == "aggregate-points":
+                if args.pci_epic:
+                    if args.pci_epic == 'all':
+                        requested = None
+                    else:
+                        requested = [k.strip() for k in args.pci_epic.split(',') if k.strip()]
+                        for k in requested:
+                            valid_pci_issue(k)
+                        # Validate that the requested epics exist in the current tree
+                        epic_keys = set(iter_pci_epic_keys(tree))
+                        for k in requested:
+                            if k not in epic_keys:
+                                logger.error('PCI Epic %s not present in the current tree, exit', k)
+                                sys.exit(1)
+                    services.aggregate_all_points(tree, repo, requested)
+                else:
+                    logger.error('--pci-epic is MD with --actions=aggregate-points, exit')
                     sys.exit(1)
-                services.aggregate_points(tree, args.pci_epic, repo)
-            else:
-                logger.error('--pci-epic is MD with --actions=aggregate-points, exit')
-                sys.exit(1)
     else:
         logger.info('No action defined, exit')
+    logger.info('Run summary: %s', _run_summary(base_repo, search_cache))
+    if run_metrics:
+        run_metrics.completed()
+
+    if args.watch:
+        from lsd.watch import TreeWatcher
+
+        logger.info('Watching for changes every %ds (Ctrl-C to stop)', args.watch)
+        # Polls must see fresh issues and roots: bypass the run's identity map
+        # and the search cache
+        live_repo = jira_repo.without_search_cache()
+        watch_repo = live_repo if args.update else SimRepository(live_repo, on_change=ndjson.change if ndjson else None)
+        watcher = TreeWatcher(tree, watch_repo, args.year, args.quarter, args.squad, args.skip_closed,
+                              link_field_ids=jira_repo.link_field_ids())
+        if ndjson:
+            on_change = lambda change: ndjson.emit({"kind": "diff", **vars(change)})
+        else:
+            on_change = print
+        try:
+            watcher.run(args.watch, on_change=on_change, on_orphan=ndjson.orphan if ndjson else None)
+        except KeyboardInterrupt:
+            logger.info('Watch stopped')
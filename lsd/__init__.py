@@ -2,6 +2,16 @@
 
 The active modules are:
 - lsd.models, lsd.mappers, lsd.tree_builder, lsd.services, lsd.presenter, lsd.labels
+- lsd.rollup (story point roll-up engine)
+- lsd.columnar (optional NumPy analytics view)
+- lsd.export (Arrow IPC / Parquet export)
+- lsd.hashing (Merkle-style subtree content hashes)
+- lsd.snapshot, lsd.diff (saved trees and structured diff)
+- lsd.daemon, lsd.ingest, lsd.watch (warm trees, webhook and polling sync)
+- lsd.squads (data-driven squad filter registry)
+
+Keep imports cheap: third-party packages (jira, numpy, pyarrow, graphviz) are
+imported where used, never at package or CLI start-up.
 
 Legacy (impure) implementations that directly called Jira live in backup/lsd/.
 """
@@ -0,0 +1,224 @@
+"""Optional array-backed (columnar) view of the LSD tree for analytics.
+
+The `nutree.Tree` of domain objects stays the source of truth; `ColumnarTree`
+is a read-only snapshot storing one row per node in NumPy arrays (parent index,
+depth, type/status/priority codes, story points, components in CSR form) so
+repeated group-by and roll-up queries are vectorized.
+
+NumPy is only required when this module is used.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from .status import CLOSED_STATUSES
+
+
+logger = logging.getLogger(__name__)
+
+# Columns usable with group_sum / group_count
+GROUP_COLUMNS = ("type", "status", "prio", "component")
+
+
+def _numpy():
+    # Lazy import so numpy is optional unless the columnar view is used
+    try:
+        import numpy as np  # type: ignore
+    except Exception as e:
+        logger.error('NumPy package is required for lsd.columnar: %s', e)
+        raise
+    return np
+
+
+class _Vocab:
+    """Interning table mapping strings to dense integer codes."""
+
+    def __init__(self) -> None:
+        self.names: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def code(self, name: Optional[str]) -> int:
+        name = name or ""
+        c = self._codes.get(name)
+        if c is None:
+            c = self._codes[name] = len(self.names)
+            self.names.append(name)
+        return c
+
+
+@dataclass
+class ColumnarTree:
+    """Columnar snapshot of an LSD tree (rows in depth-first pre-order).
+
+    Parents always precede their children, so `parent[i] < i` for non-roots
+    (roots have parent -1 and depth 0).
+    """
+
+    keys: List[str]
+    parent: Any
+    depth: Any
+    type_code: Any
+    status_code: Any
+    prio_code: Any
+    story_points: Any
+    comp_offsets: Any
+    comp_codes: Any
+    vocabs: Dict[str, List[str]]
+    _data: List[Any] = field(default_factory=list, repr=False)
+    _index: Dict[str, int] = field(default_factory=dict, repr=False)
+    _codes: Dict[str, Dict[str, int]] = field(default_factory=dict, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    # -----------------
+    # Back to the key/domain view
+    # -----------------
+    def index_of(self, key: str) -> int:
+        """Row index of the first node carrying `key`; KeyError if absent."""
+        return self._index[key]
+
+    def node(self, i: int) -> Any:
+        """Domain object for row `i`."""
+        return self._data[i]
+
+    def nodes(self, rows: Iterable[int]) -> List[Any]:
+        """Domain objects for the given rows (e.g. `np.flatnonzero(mask)`)."""
+        return [self._data[int(i)] for i in rows]
+
+    def children_of(self, i: int) -> List[int]:
+        np = _numpy()
+        return np.flatnonzero(self.parent == i).tolist()
+
+    # -----------------
+    # Masks
+    # -----------------
+    def mask(self, column: str, *names: str) -> Any:
+        """Boolean mask of rows whose `column` (type/status/prio) is in `names`."""
+        np = _numpy()
+        codes = self._column(column)
+        lookup = self._lookup(column)
+        return np.isin(codes, [lookup[n] for n in names if n in lookup])
+
+    def closed_mask(self) -> Any:
+        return self.mask("status", *CLOSED_STATUSES)
+
+    # -----------------
+    # Aggregations
+    # -----------------
+    def group_sum(self, by: str, values: Any = None, where: Any = None) -> Dict[str, int]:
+        """Sum `values` (default: story points) per distinct value of `by`.
+
+        `by` is one of GROUP_COLUMNS; `where` is an optional boolean row mask.
+        For "component", a row with several components counts for each of them.
+        """
+        np = _numpy()
+        vals = self.story_points if values is None else np.asarray(values)
+        if where is not None:
+            vals = np.where(where, vals, 0)
+        names = self._names(by)
+        if by == "component":
+            counts = np.diff(self.comp_offsets)
+            codes = self.comp_codes
+            vals = np.repeat(vals, counts)
+        else:
+            codes = self._column(by)
+        sums = np.bincount(codes, weights=vals, minlength=len(names))
+        return {name: int(s) for name, s in zip(names, sums) if s}
+
+    def group_count(self, by: str, where: Any = None) -> Dict[str, int]:
+        """Number of rows per distinct value of `by` (restricted to `where`)."""
+        np = _numpy()
+        ones = np.ones(len(self), dtype=np.int64)
+        return self.group_sum(by, ones, where)
+
+    def rollup(self, values: Any = None, where: Any = None) -> Any:
+        """Return per-row subtree sums of `values` (default: story points).
+
+        Rows excluded by `where` contribute 0 but still forward their
+        descendants' totals. Evaluated level by level, deepest first.
+        """
+        np = _numpy()
+        vals = self.story_points if values is None else np.asarray(values)
+        totals = np.array(vals, dtype=np.int64)
+        if where is not None:
+            totals = np.where(where, totals, 0)
+        for d in range(int(self.depth.max(initial=0)), 0, -1):
+            rows = np.flatnonzero(self.depth == d)
+            np.add.at(totals, self.parent[rows], totals[rows])
+        return totals
+
+    # -----------------
+    # Internals
+    # -----------------
+    def _column(self, name: str) -> Any:
+        try:
+            return {"type": self.type_code, "status": self.status_code, "prio": self.prio_code}[name]
+        except KeyError:
+            raise KeyError(f"Unknown column: {name}") from None
+
+    def _names(self, name: str) -> List[str]:
+        if name not in self.vocabs:
+            raise KeyError(f"Unknown column: {name}")
+        return self.vocabs[name]
+
+    def _lookup(self, name: str) -> Dict[str, int]:
+        if name not in self._codes:
+            self._codes[name] = {n: i for i, n in enumerate(self._names(name))}
+        return self._codes[name]
+
+
+def from_tree(tree) -> ColumnarTree:
+    """Build a ColumnarTree from a `nutree.Tree` of domain objects."""
+    np = _numpy()
+    vocabs = {c: _Vocab() for c in GROUP_COLUMNS}
+    keys: List[str] = []
+    data: List[Any] = []
+    parent: List[int] = []
+    depth: List[int] = []
+    types: List[int] = []
+    statuses: List[int] = []
+    prios: List[int] = []
+    points: List[int] = []
+    comp_offsets: List[int] = [0]
+    comp_codes: List[int] = []
+    row_of: Dict[int, int] = {}
+    index: Dict[str, int] = {}
+
+    for node in tree:
+        d = node.data
+        p = node.parent
+        prow = row_of[p.node_id] if p is not None else -1
+        row = len(keys)
+        row_of[node.node_id] = row
+        key = getattr(d, "key", "")
+        keys.append(key)
+        data.append(d)
+        index.setdefault(key, row)
+        parent.append(prow)
+        depth.append(depth[prow] + 1 if prow >= 0 else 0)
+        types.append(vocabs["type"].code(getattr(d, "type", "")))
+        statuses.append(vocabs["status"].code(getattr(d, "status", "")))
+        prios.append(vocabs["prio"].code(getattr(d, "prio", None)))
+        points.append(int(getattr(d, "story_points", 0) or 0))
+        for c in getattr(d, "components", None) or []:
+            comp_codes.append(vocabs["component"].code(c))
+        comp_offsets.append(len(comp_codes))
+
+    logger.debug('columnar view built with %d rows', len(keys))
+    return ColumnarTree(
+        keys=keys,
+        parent=np.array(parent, dtype=np.int32),
+        depth=np.array(depth, dtype=np.int16),
+        type_code=np.array(types, dtype=np.int16),
+        status_code=np.array(statuses, dtype=np.int16),
+        prio_code=np.array(prios, dtype=np.int16),
+        story_points=np.array(points, dtype=np.int64),
+        comp_offsets=np.array(comp_offsets, dtype=np.int64),
+        comp_codes=np.array(comp_codes, dtype=np.int32),
+        vocabs={c: v.names for c, v in vocabs.items()},
+        _data=data,
+        _index=index,
+    )
@@ -0,0 +1,398 @@
+"""Long-running daemon keeping the Jira session and built trees warm.
+
+The daemon owns one Repository (and thus one Jira client/session) and caches
+built trees per (year, quarter, squad, skip_closed). It serves views and
+actions over local HTTP (127.0.0.1 by default) so `jira-for-pci.py --daemon`
+can act as a thin client answering from memory.
+
+Requests must carry the daemon token (`X-LSD-Token` header), a Host header
+naming the loopback address, and POST bodies must be `application/json`:
+together they stop web pages from driving the daemon (CSRF, DNS rebinding).
+`serve` writes a fresh token to a 0600 file that `DaemonClient` reads.
+Cached trees are rebuilt after `max_age` seconds, so a missed webhook does
+not leave a tree stale forever.
+
+Endpoints (JSON bodies, text/plain or application/x-ndjson for views):
+- GET  /health
+- GET  /tree?year=26&quarter=1&squad=Network[&skip_closed=1][&format=ndjson][&refresh=1]
+- POST /action   {"year", "quarter", "squad", "action", "update", "pci_epic"}
+- POST /refresh  {"year", "quarter", "squad"} (all fields optional filters)
+- POST /webhook  Jira issue webhook payload, applied to every cached tree
+  (the token may also be given as `?token=` for webhook relays)
+"""
+from __future__ import annotations
+
+import hmac
+import io
+import json
+import logging
+import os
+import threading
+import time
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from nutree import Tree
+
+    from adapter.ports import Repository
+
+# Tree building, services and presenters are imported by the server side only,
+# so the thin client (DaemonClient) stays cheap to import.
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_MAX_AGE = 15 * 60  # seconds before a cached tree is rebuilt
+TOKEN_HEADER = 'X-LSD-Token'
+LOOPBACK_HOSTS = ('127.0.0.1', 'localhost', '[::1]')
+
+TreeKey = Tuple[str, str, str, bool]
+
+
+def _flag(value: Any) -> bool:
+    return str(value).lower() in ('1', 'true', 'yes', 'on')
+
+
+def default_token_file(port: int) -> str:
+    return os.path.join('./out', f'.daemon-{port}.token')
+
+
+def write_token(path: str) -> str:
+    """Write a new random token to `path`, readable by the owner only."""
+    import secrets
+
+    token = secrets.token_urlsafe(32)
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+        os.fchmod(fh.fileno(), 0o600)  # the file may predate this run
+        fh.write(token)
+    return token
+
+
+def read_token(path: str) -> str:
+    with open(path, encoding='utf-8') as fh:
+        return fh.read().strip()
+
+
+class TreeDaemon:
+    """In-memory tree cache and action runner shared by all requests."""
+
+    def __init__(self, repo: Repository, build: Optional[Callable[..., Tree]] = None,
+                 max_age: Optional[float] = DEFAULT_MAX_AGE) -> None:
+        if build is None:
+            from .tree_builder import build_lsd_tree as build
+        self._repo = repo
+        self._build = build
+        self.max_age = max_age  # None: kept until refreshed
+        self._trees: Dict[TreeKey, Tree] = {}
+        self._built_at: Dict[TreeKey, float] = {}
+        self._link_ids: Optional[List[str]] = None
+        self._lock = threading.Lock()
+        self._key_locks: Dict[TreeKey, threading.Lock] = {}
+        # Serializes reads of cached trees with in-place webhook updates
+        self._tree_lock = threading.RLock()
+
+    @property
+    def repo(self) -> Repository:
+        return self._repo
+
+    def cached_keys(self):
+        with self._lock:
+            return list(self._trees)
+
+    def tree(self, year: str, quarter: str, squad: str, skip_closed: bool = False, refresh: bool = False) -> Tree:
+        """Return the cached tree for the target, building it on first use."""
+        key = (year, quarter, squad, bool(skip_closed))
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # One build per target at a time; other targets are not blocked
+        with key_lock:
+            with self._lock:
+                tree = None if refresh else self._trees.get(key)
+                if tree is not None and self.max_age is not None \
+                        and time.monotonic() - self._built_at[key] > self.max_age:
+                    logger.info('daemon: tree %s older than %ss, rebuild', key, self.max_age)
+                    tree = None
+            if tree is None:
+                logger.info('daemon: build tree %s', key)
+                tree = self._build(self._repo, year, quarter, squad, bool(skip_closed))
+                with self._lock:
+                    self._trees[key] = tree
+                    self._built_at[key] = time.monotonic()
+            return tree
+
+    def invalidate(self, year: Optional[str] = None, quarter: Optional[str] = None, squad: Optional[str] = None) -> int:
+        """Drop cached trees matching the given filters; returns the count."""
+        with self._lock:
+            drop = [k for k in self._trees
+                    if (year is None or k[0] == year)
+                    and (quarter is None or k[1] == quarter)
+                    and (squad is None or k[2] == squad)]
+            for k in drop:
+                del self._trees[k]
+                del self._built_at[k]
+        logger.info('daemon: invalidated %d tree(s)', len(drop))
+        return len(drop)
+
+    # -----------------
+    # Views / actions
+    # -----------------
+    def view(self, year: str, quarter: str, squad: str, skip_closed: bool = False,
+             fmt: str = 'ascii', refresh: bool = False) -> str:
+        from .presenter import NdjsonWriter, to_ascii
+
+        tree = self.tree(year, quarter, squad, skip_closed, refresh)
+        with self._tree_lock:
+            if fmt == 'ndjson':
+                buf = io.StringIO()
+                writer = NdjsonWriter(buf)
+                for node in tree:
+                    writer.node(node)
+                return buf.getvalue()
+            return to_ascii(tree) + '\n'
+
+    def action(self, year: str, quarter: str, squad: str, action: str,
+               update: bool = False, pci_epic: Optional[str] = None) -> Dict[str, Any]:
+        """Run a CLI action against the cached tree (simulation unless `update`)."""
+        from adapter.sim_repo import SimRepository
+
+        tree = self.tree(year, quarter, squad)
+        plan = []
+        if update:
+            repo: Repository = self._repo
+        else:
+            repo = SimRepository(self._repo, on_change=lambda k, f: plan.append({'key': k, 'fields': f}))
+        with self._tree_lock:
+            result = self._run_action(tree, year, quarter, squad, action, repo, pci_epic)
+        if update:
+            # Writes make the cached snapshot stale
+            self.invalidate(year, quarter, squad)
+        return {'action': action, 'update': update, 'result': result, 'plan': plan}
+
+    def _run_action(self, tree: Tree, year: str, quarter: str, squad: str, action: str,
+                    repo: Repository, pci_epic: Optional[str]) -> Any:
+        from . import services
+
+        result: Any = None
+        if action == 'set-quarter':
+            result = services.propagate_sprint(tree, year, quarter, repo)
+        elif action == 'set-prio':
+            services.propagate_priority(tree, repo)
+        elif action == 'find-orphans':
+            result = [str(o) for o in services.find_orphans(tree, year, quarter, squad, repo)]
+        elif action == 'reconcile':
+            from .reconcile import reconcile
+
+            result = [str(f) for f in reconcile({(year, quarter, squad): tree}, repo).findings]
+        elif action == 'aggregate-points':
+            if not pci_epic:
+                raise ValueError('pci_epic is required for aggregate-points')
+            keys = None if pci_epic == 'all' else [k.strip() for k in pci_epic.split(',') if k.strip()]
+            result = services.aggregate_all_points(tree, repo, keys)
+        else:
+            raise ValueError(f'Unknown action: {action}')
+        return result
+
+    def link_field_ids(self) -> List[str]:
+        """Parent/Epic Link field ids of the repository (JiraRepository), else []."""
+        if self._link_ids is None:
+            accessor = getattr(self._repo, 'link_field_ids', None)
+            self._link_ids = list(accessor()) if accessor is not None else []
+        return self._link_ids
+
+    def ingest(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply a Jira webhook payload to every cached tree in place."""
+        from .ingest import TreeIngestor
+
+        with self._lock:
+            targets = list(self._trees.items())
+        out: Dict[str, Any] = {}
+        with self._tree_lock:
+            for (year, quarter, squad, skip_closed), tree in targets:
+                ingestor = TreeIngestor(tree, squad, skip_closed, repo=self._repo,
+                                        link_field_ids=self.link_field_ids())
+                changes = ingestor.apply(event)
+                if changes:
+                    out[f'{year}/{quarter}/{squad}'] = changes
+        return {'changes': out}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    daemon: TreeDaemon  # set on the server-specific subclass
+
+    def log_message(self, fmt, *args):  # route http.server logs to logging
+        logger.debug('daemon http: ' + fmt, *args)
+
+    def _send(self, status: int, body: str, content_type: str = 'application/json') -> None:
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _json(self, status: int, payload: Any) -> None:
+        self._send(status, json.dumps(payload, default=str))
+
+    def _body(self) -> Dict[str, Any]:
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}') if length else {}
+
+    def _rejected(self, method: str, path: str, q: Dict[str, str]) -> Optional[Tuple[int, str]]:
+        """(status, reason) when the request must be refused, else None."""
+        port = self.server.server_address[1]
+        host = self.headers.get('Host', '')
+        if host not in {f'{h}:{port}' for h in LOOPBACK_HOSTS}:
+            return 403, 'unexpected Host header'
+        token = self.server.token  # type: ignore[attr-defined]
+        if token is not None:
+            given = self.headers.get(TOKEN_HEADER) or (q.get('token') if path == '/webhook' else None) or ''
+            if not hmac.compare_digest(given.encode('utf-8'), token.encode('utf-8')):
+                return 401, 'missing or invalid token'
+        if method == 'POST':
+            content_type = self.headers.get('Content-Type', '').split(';')[0].strip().lower()
+            if content_type != 'application/json':
+                return 415, 'expected Content-Type: application/json'
+        return None
+
+    def _dispatch(self, method: str) -> None:
+        url = urllib.parse.urlparse(self.path)
+        q = {k: v[-1] for k, v in urllib.parse.parse_qs(url.query).items()}
+        try:
+            rejected = self._rejected(method, url.path, q)
+            if rejected is not None:
+                logger.warning('daemon: refused %s %s: %s', method, url.path, rejected[1])
+                self._json(rejected[0], {'error': rejected[1]})
+                return
+            route = self.server.routes.get((method, url.path))  # type: ignore[attr-defined]
+            if route is None:
+                self._json(404, {'error': f'no route {method} {url.path}'})
+                return
+            route(self, q)
+        except (KeyError, ValueError) as e:
+            self._json(400, {'error': str(e)})
+        except Exception as e:
+            logger.exception('daemon: request failed')
+            self._json(500, {'error': str(e)})
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+
+def _health(h: _Handler, q) -> None:
+    h._json(200, {'status': 'ok', 'trees': [list(k) for k in h.daemon.cached_keys()]})
+
+
+def _tree(h: _Handler, q) -> None:
+    fmt = q.get('format', 'ascii')
+    body = h.daemon.view(q['year'], q['quarter'], q['squad'], _flag(q.get('skip_closed')), fmt, _flag(q.get('refresh')))
+    h._send(200, body, 'application/x-ndjson' if fmt == 'ndjson' else 'text/plain')
+
+
+def _action(h: _Handler, q) -> None:
+    b = h._body()
+    h._json(200, h.daemon.action(b['year'], b['quarter'], b['squad'], b['action'],
+                                 _flag(b.get('update')), b.get('pci_epic')))
+
+
+def _refresh(h: _Handler, q) -> None:
+    b = h._body()
+    h._json(200, {'invalidated': h.daemon.invalidate(b.get('year'), b.get('quarter'), b.get('squad'))})
+
+
+def _webhook(h: _Handler, q) -> None:
+    h._json(200, h.daemon.ingest(h._body()))
+
+
+ROUTES: Dict[Tuple[str, str], Callable[[_Handler, Dict[str, str]], None]] = {
+    ('GET', '/health'): _health,
+    ('GET', '/tree'): _tree,
+    ('POST', '/action'): _action,
+    ('POST', '/refresh'): _refresh,
+    ('POST', '/webhook'): _webhook,
+}
+
+
+def make_server(daemon: TreeDaemon, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                token: Optional[str] = None) -> ThreadingHTTPServer:
+    """Create (but do not start) the HTTP server; port 0 picks a free port.
+
+    Without `token` no token is required (tests); Host and Content-Type are
+    checked in any case.
+    """
+    handler = type('DaemonHandler', (_Handler,), {'daemon': daemon})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.routes = dict(ROUTES)  # type: ignore[attr-defined]
+    server.token = token  # type: ignore[attr-defined]
+    server.daemon_threads = True
+    return server
+
+
+def serve(daemon: TreeDaemon, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+          token_file: Optional[str] = None) -> None:
+    """Serve until interrupted, with a new token written to `token_file`."""
+    token_file = token_file or default_token_file(port)
+    server = make_server(daemon, host, port, token=write_token(token_file))
+    logger.info('daemon listening on http://%s:%d (token in %s)', *server.server_address[:2], token_file)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info('daemon stopped')
+    finally:
+        server.server_close()
+
+
+class DaemonClient:
+    """Minimal stdlib client used by the CLI in --daemon mode."""
+
+    def __init__(self, url: str, timeout: float = 600.0, token: Optional[str] = None,
+                 token_file: Optional[str] = None) -> None:
+        """`token` defaults to the content of `token_file`, itself defaulting to
+        the file `serve` writes for the URL's port."""
+        self._url = url.rstrip('/')
+        self._timeout = timeout
+        if token is None:
+            port = urllib.parse.urlparse(self._url).port or DEFAULT_PORT
+            token = read_token(token_file or default_token_file(port))
+        self._token = token
+
+    def _request(self, path: str, payload: Optional[Dict[str, Any]] = None) -> str:
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        headers = {TOKEN_HEADER: self._token}
+        if data:
+            headers['Content-Type'] = 'application/json'
+        req = urllib.request.Request(self._url + path, data=data, headers=headers)
+        with urllib.request.urlopen(req, timeout=self._timeout) as resp:
+            return resp.read().decode('utf-8')
+
+    def health(self) -> Dict[str, Any]:
+        return json.loads(self._request('/health'))
+
+    def view(self, year: str, quarter: str, squad: str, skip_closed: bool = False,
+             fmt: str = 'ascii', refresh: bool = False) -> str:
+        q = urllib.parse.urlencode({'year': year, 'quarter': quarter, 'squad': squad,
+                                    'skip_closed': int(skip_closed), 'format': fmt, 'refresh': int(refresh)})
+        return self._request(f'/tree?{q}')
+
+    def action(self, year: str, quarter: str, squad: str, action: str,
+               update: bool = False, pci_epic: Optional[str] = None) -> Dict[str, Any]:
+        return json.loads(self._request('/action', {'year': year, 'quarter': quarter, 'squad': squad,
+                                                    'action': action, 'update': update, 'pci_epic': pci_epic}))
+
+    def refresh(self, year: Optional[str] = None, quarter: Optional[str] = None,
+                squad: Optional[str] = None) -> int:
+        return json.loads(self._request('/refresh', {'year': year, 'quarter': quarter, 'squad': squad}))['invalidated']
+
+    def webhook(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        return json.loads(self._request('/webhook', event))
@@ -0,0 +1,156 @@
+"""Structured diff between two LSD trees (e.g. two saved snapshots).
+
+Subtree hashes (lsd.hashing) let the walk skip identical branches entirely,
+so the cost is proportional to what changed, not to the tree size. The old
+tree is usually a snapshot carrying its stored hashes: only the new tree is
+hashed.
+"""
+from __future__ import annotations
+
+import dataclasses
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from .hashing import annotate_hashes, subtree_hash, tree_hash
+
+
+logger = logging.getLogger(__name__)
+
+# Field name -> change kind; other differing fields are reported as "field"
+_FIELD_KINDS = {
+    "status": "status",
+    "prio": "prio",
+    "story_points": "points",
+}
+
+
+@dataclass(frozen=True)
+class Change:
+    """One difference between the old and the new tree.
+
+    kind: added | removed | moved | status | prio | points | field
+    - added/removed: `parent` is the parent key in the new/old tree.
+    - moved: `old`/`new` are the old/new parent keys.
+    - points: `delta` is new - old story points.
+    """
+
+    kind: str
+    key: str
+    field: Optional[str] = None
+    old: Any = None
+    new: Any = None
+    parent: Optional[str] = None
+    delta: Optional[int] = None
+
+    def __str__(self) -> str:
+        if self.kind in ("added", "removed"):
+            return f"{self.kind} {self.key} (parent {self.parent or '-'})"
+        if self.kind == "moved":
+            return f"moved {self.key}: {self.old or '-'} -> {self.new or '-'}"
+        if self.kind == "points":
+            return f"points {self.key}: {self.old} -> {self.new} ({self.delta:+d})"
+        return f"{self.kind} {self.key}: {self.field} {self.old!r} -> {self.new!r}"
+
+
+def _key(node) -> str:
+    return getattr(node.data, "key", "")
+
+
+def parent_key(node) -> Optional[str]:
+    parent = node.parent
+    return _key(parent) if parent is not None else None
+
+
+def field_changes(a, b) -> List[Change]:
+    """Field-level changes between two versions `a` -> `b` of the same issue."""
+    if not (dataclasses.is_dataclass(a) and dataclasses.is_dataclass(b)):
+        return []
+    out = []
+    names = [f.name for f in dataclasses.fields(b)]
+    for name in names:
+        va, vb = getattr(a, name, None), getattr(b, name, None)
+        if va == vb:
+            continue
+        kind = _FIELD_KINDS.get(name, "field")
+        delta = int(vb or 0) - int(va or 0) if kind == "points" else None
+        out.append(Change(kind, b.key, field=name, old=va, new=vb, delta=delta))
+    return out
+
+
+def _index_children(node_or_tree) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for child in node_or_tree.children:
+        out.setdefault(_key(child), child)
+    return out
+
+
+def diff_trees(old_tree, new_tree) -> List[Change]:
+    """Return the changes needed to go from `old_tree` to `new_tree`.
+
+    Nodes are matched by issue key among siblings; a key that disappears from
+    one parent and appears under another is reported once as "moved".
+    Added/removed subtrees are reported node by node.
+    Hashes already stored on `old_tree` (loaded snapshot) are reused, so it
+    must not have changed since they were computed; `new_tree` is rehashed.
+    """
+    if tree_hash(old_tree) == annotate_hashes(new_tree):
+        return []
+
+    changes: List[Change] = []
+    # Roots of subtrees present on one side only, by key
+    added: Dict[str, Any] = {}
+    removed: Dict[str, Any] = {}
+    matched: Dict[str, Any] = {}
+    # (old, new, compare own fields); the trees themselves carry no data
+    stack = [(old_tree, new_tree, False)]
+    while True:
+        while stack:
+            old, new, compare_self = stack.pop()
+            if compare_self:
+                changes.extend(field_changes(old.data, new.data))
+            old_children = _index_children(old)
+            new_children = _index_children(new)
+            for key, n in new_children.items():
+                o = old_children.get(key)
+                if o is None:
+                    added.setdefault(key, n)
+                elif subtree_hash(o) != subtree_hash(n):
+                    stack.append((o, n, True))
+            for key, o in old_children.items():
+                if key not in new_children:
+                    removed.setdefault(key, o)
+        # Same key removed in one place and added in another (possibly deep in
+        # a removed/added subtree): a move, diffed as a matched pair.
+        added_all = _expand(added.values(), matched)
+        removed_all = _expand(removed.values(), matched)
+        moved = [k for k in added_all if k in removed_all]
+        if not moved:
+            break
+        for key in moved:
+            o, n = removed_all[key], added_all[key]
+            matched[key] = n
+            changes.append(Change("moved", key, old=parent_key(o), new=parent_key(n)))
+            if subtree_hash(o) != subtree_hash(n):
+                stack.append((o, n, True))
+
+    for key, d in _expand(added.values(), matched).items():
+        changes.append(Change("added", key, parent=parent_key(d)))
+    for key, d in _expand(removed.values(), matched).items():
+        changes.append(Change("removed", key, parent=parent_key(d)))
+    logger.debug('diff produced %d changes', len(changes))
+    return changes
+
+
+def _expand(roots, matched: Dict[str, Any]) -> Dict[str, Any]:
+    """Map key -> node for the given subtrees, skipping matched (moved) branches."""
+    out: Dict[str, Any] = {}
+    stack = list(roots)[::-1]
+    while stack:
+        node = stack.pop()
+        key = _key(node)
+        if key in matched:
+            continue
+        out.setdefault(key, node)
+        stack.extend(reversed(list(node.children)))
+    return out
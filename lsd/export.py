@@ -0,0 +1,120 @@
+"""Columnar export of the LSD tree (Arrow IPC / Parquet) for downstream analytics.
+
+One row per node: key, parent key, level, type, status, prio, labels,
+components, story_points, pu and blfnt. Rows are produced by a generator and
+written in record batches, so the full table is never materialized.
+
+pyarrow is only required when writing files.
+"""
+from __future__ import annotations
+
+import logging
+import os
+from typing import Any, Dict, Iterator, Optional
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 5000
+
+COLUMNS = (
+    "key", "parent_key", "level", "project", "type", "status", "prio",
+    "labels", "components", "story_points", "pu", "blfnt",
+)
+
+
+def node_record(issue: Any, parent_key: Optional[str], level: int) -> Dict[str, Any]:
+    """Return the flat record of a domain issue (fields absent on its type are None)."""
+    sp = getattr(issue, "story_points", None)
+    comps = getattr(issue, "components", None)
+    return {
+        "key": getattr(issue, "key", ""),
+        "parent_key": parent_key,
+        "level": level,
+        "project": getattr(issue, "project", ""),
+        "type": getattr(issue, "type", ""),
+        "status": getattr(issue, "status", ""),
+        "prio": getattr(issue, "prio", None),
+        "labels": list(getattr(issue, "labels", None) or []),
+        "components": list(comps) if comps is not None else None,
+        "story_points": int(sp) if sp is not None else None,
+        "pu": getattr(issue, "pu", None),
+        "blfnt": getattr(issue, "blfnt", None),
+    }
+
+
+def iter_records(tree) -> Iterator[Dict[str, Any]]:
+    """Yield one record per node, depth-first (parents before children).
+
+    Level is 0 for top-level LVL2 items.
+    """
+    for node in tree:
+        parent = node.parent
+        parent_key = getattr(parent.data, "key", None) if parent is not None else None
+        yield node_record(node.data, parent_key, node.depth() - 1)
+
+
+def _arrow_schema(pa):
+    return pa.schema([
+        ("key", pa.string()),
+        ("parent_key", pa.string()),
+        ("level", pa.int16()),
+        ("project", pa.string()),
+        ("type", pa.string()),
+        ("status", pa.string()),
+        ("prio", pa.string()),
+        ("labels", pa.list_(pa.string())),
+        ("components", pa.list_(pa.string())),
+        ("story_points", pa.int64()),
+        ("pu", pa.string()),
+        ("blfnt", pa.string()),
+    ])
+
+
+def write_arrow(tree, path: str, *, fmt: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Stream the tree to `path` as Parquet or Arrow IPC (file format).
+
+    `fmt` is "parquet" or "ipc"; when omitted it is derived from the extension
+    (.parquet/.pq -> parquet, anything else -> ipc). Returns the number of rows.
+    """
+    # Lazy import so pyarrow is optional unless exporting
+    try:
+        import pyarrow as pa  # type: ignore
+    except Exception as e:
+        logger.error('pyarrow package is required for write_arrow: %s', e)
+        raise
+
+    if fmt is None:
+        fmt = "parquet" if path.endswith((".parquet", ".pq")) else "ipc"
+    if fmt not in ("parquet", "ipc"):
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+
+    schema = _arrow_schema(pa)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq  # type: ignore
+        writer = pq.ParquetWriter(path, schema)
+        write = writer.write_batch
+    else:
+        writer = pa.ipc.new_file(path, schema)
+        write = writer.write_batch
+
+    rows = 0
+    batch: Dict[str, list] = {c: [] for c in COLUMNS}
+    try:
+        for rec in iter_records(tree):
+            for c in COLUMNS:
+                batch[c].append(rec[c])
+            rows += 1
+            if len(batch["key"]) >= batch_size:
+                write(pa.RecordBatch.from_pydict(batch, schema=schema))
+                batch = {c: [] for c in COLUMNS}
+        if batch["key"]:
+            write(pa.RecordBatch.from_pydict(batch, schema=schema))
+    finally:
+        writer.close()
+    logger.info('Exported %d rows to %s (%s)', rows, path, fmt)
+    return rows
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import logging
+from dataclasses import dataclass, replace
 from enum import Enum
 from typing import Any, Callable, Dict, List, Optional
 
 
+logger = logging.getLogger(__name__)
+
+
 class FieldType(str, Enum):
     INT = "int"
     FLOAT = "float"
@@ -22,13 +26,14 @@ class CustomFieldSpec:
     writable: bool = True
     in_transform: Optional[Callable[[Any], Any]] = None
     out_transform: Optional[Callable[[Any], Any]] = None
+    jira_name: Optional[str] = None  # Jira field name used to resolve `jira_id` (resolve_field_ids)
 
 
 # Initial registry: extend as needed
 FIELD_REGISTRY: Dict[str, CustomFieldSpec] = {
     # Jira default for story points commonly used by Jira Cloud
     "story_points": CustomFieldSpec(
-        name="story_points", jira_id="customfield_10006", ftype=FieldType.INT
+        name="story_points", jira_id="customfield_10006", ftype=FieldType.INT, jira_name="Story Points"
     ),
     # Built-in labels field
     "labels": CustomFieldSpec(
@@ -101,6 +106,35 @@ FIELD_REGISTRY: Dict[str, CustomFieldSpec] = {
 }
 
 
+def resolve_field_ids(field_ids: Dict[str, List[str]]) -> List[str]:
+    """Point registry specs at the ids Jira reports (`field_ids`: Jira field name -> ids).
+
+    Specs with a `jira_name` take the id of that field (the registered id wins
+    when several fields share the name); custom field ids unknown to Jira are
+    logged. Returns the logical names whose id changed.
+    """
+    known = {i for ids in field_ids.values() for i in ids}
+    changed = []
+    for name, spec in list(FIELD_REGISTRY.items()):
+        ids = field_ids.get(spec.jira_name or "") or []
+        if ids and spec.jira_id not in ids:
+            logger.info("field %s: %s -> %s (from Jira metadata)", name, spec.jira_id, ids[0])
+            FIELD_REGISTRY[name] = replace(spec, jira_id=ids[0])
+            changed.append(name)
+        elif spec.jira_id not in known:
+            logger.warning("field %s: id %s unknown to Jira", name, spec.jira_id)
+    return changed
+
+
+def set_field_ids(ids: Dict[str, str]) -> None:
+    """Apply ids already resolved elsewhere (`ids`: logical name -> Jira id),
+    e.g. by the parent of a worker process."""
+    for name, jira_id in ids.items():
+        spec = FIELD_REGISTRY.get(name)
+        if spec is not None and spec.jira_id != jira_id:
+            FIELD_REGISTRY[name] = replace(spec, jira_id=jira_id)
+
+
 class FieldAccessMixin:
     """Lightweight mixin to access logical fields on an Issue via a Repository.
 
@@ -0,0 +1,66 @@
+"""Merkle-style content hashes for LSD tree nodes.
+
+A node's hash covers its domain fields and, in order, the hashes of its
+children: two subtrees with the same hash render identically, so callers can
+reuse cached output or skip identical branches.
+"""
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+from typing import Any
+
+from nutree import IterMethod
+
+
+HASH_META_KEY = "lsd_hash"
+# Bumped when the digest changes: stored hashes of another version are ignored
+HASH_VERSION = 2
+
+
+_FIELD_NAMES: dict = {}  # dataclass type -> field names
+
+
+def issue_digest(issue: Any) -> str:
+    """Hash of a domain object's own fields (type name included)."""
+    cls = type(issue)
+    names = _FIELD_NAMES.get(cls)
+    if names is None:
+        names = _FIELD_NAMES[cls] = tuple(f.name for f in dataclasses.fields(cls)) if dataclasses.is_dataclass(cls) else ()
+    # Domain fields are str/int/None and lists of str: their repr is stable
+    # and much cheaper than a JSON encoding
+    payload = tuple(getattr(issue, name) for name in names) if names else repr(issue)
+    raw = repr((cls.__name__, payload))
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def annotate_hashes(tree) -> str:
+    """Compute subtree hashes bottom-up and store them on each node's meta.
+
+    Returns the hash of the whole tree (combination of top-level hashes).
+    Must be re-run after the tree or its domain objects change.
+    """
+    for node in tree.iterator(method=IterMethod.POST_ORDER):
+        h = hashlib.blake2b(digest_size=16)
+        h.update(issue_digest(node.data).encode("ascii"))
+        for child in node.children:
+            h.update(child.get_meta(HASH_META_KEY).encode("ascii"))
+        node.set_meta(HASH_META_KEY, h.hexdigest())
+    return tree_hash(tree)
+
+
+def tree_hash(tree) -> str:
+    """Hash of the whole tree from the stored top-level hashes (see subtree_hash)."""
+    h = hashlib.blake2b(digest_size=16)
+    for node in tree.children:
+        h.update(subtree_hash(node).encode("ascii"))
+    return h.hexdigest()
+
+
+def subtree_hash(node) -> str:
+    """Hash stored by annotate_hashes (computed on the fly if missing)."""
+    value = node.get_meta(HASH_META_KEY)
+    if value is None:
+        annotate_hashes(node.tree)
+        value = node.get_meta(HASH_META_KEY)
+    return value
@@ -0,0 +1,172 @@
+"""Inverted indexes over an LSD tree and a small query API on top.
+
+`index_for(tree)` returns the TreeIndex of a tree (built on first use; the
+tree builder builds it with the tree and lsd.ingest keeps it current on
+incremental updates). Each indexed attribute maps a value to the nodes
+carrying it, so selections intersect small node sets instead of scanning:
+
+    index_for(tree).select(type="Story", open=True, prio="High", parent_type="Epic")
+"""
+from __future__ import annotations
+
+import weakref
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from nutree import Tree
+
+from .status import CLOSED_STATUSES
+
+
+# Query name -> domain attribute; label/component are multi-valued
+FIELDS = {
+    "label": "labels",
+    "component": "components",
+    "status": "status",
+    "prio": "prio",
+    "type": "type",
+    "project": "project",
+}
+
+Criterion = Union[str, Iterable[str], None]
+
+
+def _values(data: Any, attr: str) -> Tuple[str, ...]:
+    value = getattr(data, attr, None)
+    if value is None:
+        return ()
+    if isinstance(value, (list, tuple, set)):
+        return tuple(str(v) for v in value)
+    return (str(value),)
+
+
+class TreeIndex:
+    """Value -> nodes maps for the FIELDS of the domain objects of one tree.
+
+    Node sets keep insertion order (tree order for a freshly built tree).
+    Incremental changes go through `add_subtree`, `remove_subtree` and
+    `update`; moving a node needs no update (`parent_type` is checked at
+    query time).
+    """
+
+    def __init__(self, tree: Tree) -> None:
+        self._tree = weakref.ref(tree)
+        self._nodes: Dict[int, Any] = {}
+        self._by: Dict[str, Dict[str, Dict[int, None]]] = {f: {} for f in FIELDS}
+        self._closed: Dict[int, None] = {}
+        self._indexed: Dict[int, Dict[str, Tuple[str, ...]]] = {}
+        for node in tree:
+            self._add(node)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    # ---------------
+    # Maintenance
+    # ---------------
+    def _add(self, node) -> None:
+        nid = node.node_id
+        self._nodes[nid] = node
+        values = {f: _values(node.data, attr) for f, attr in FIELDS.items()}
+        self._indexed[nid] = values
+        for f, vs in values.items():
+            for v in vs:
+                self._by[f].setdefault(v, {})[nid] = None
+        if getattr(node.data, "status", None) in CLOSED_STATUSES:
+            self._closed[nid] = None
+
+    def _discard(self, node) -> None:
+        nid = node.node_id
+        values = self._indexed.pop(nid, None)
+        if values is None:
+            return
+        del self._nodes[nid]
+        for f, vs in values.items():
+            for v in vs:
+                bucket = self._by[f].get(v)
+                if bucket is not None:
+                    bucket.pop(nid, None)
+                    if not bucket:
+                        del self._by[f][v]
+        self._closed.pop(nid, None)
+
+    def add_subtree(self, node) -> None:
+        """Index `node` and its descendants (after they were attached)."""
+        for n in node.iterator(add_self=True):
+            self._add(n)
+
+    def remove_subtree(self, node) -> None:
+        """Drop `node` and its descendants (before they are removed)."""
+        for n in node.iterator(add_self=True):
+            self._discard(n)
+
+    def update(self, node) -> None:
+        """Re-index `node` after its domain object changed in place."""
+        self._discard(node)
+        self._add(node)
+
+    # ---------------
+    # Queries
+    # ---------------
+    def values(self, field: str) -> List[str]:
+        """Distinct indexed values of `field` (e.g. all labels in the tree)."""
+        return list(self._by[field])
+
+    def count(self, field: str, value: str) -> int:
+        return len(self._by[field].get(value, ()))
+
+    def select(self, *, open: Optional[bool] = None, parent_type: Criterion = None, **criteria: Criterion) -> List[Any]:
+        """Nodes matching every criterion (a value or an iterable of accepted values).
+
+        criteria: label, component, status, prio, type, project (see FIELDS);
+        `open`: True excludes closed statuses, False keeps only them;
+        `parent_type`: type of the parent issue (e.g. "Epic").
+        """
+        sets: List[Dict[int, None]] = []
+        for name, accepted in criteria.items():
+            if name not in FIELDS:
+                raise KeyError(f"Unknown index field: {name}")
+            if accepted is None:
+                continue
+            accepted = [accepted] if isinstance(accepted, str) else list(accepted)
+            buckets = [self._by[name].get(v, {}) for v in accepted]
+            sets.append(buckets[0] if len(buckets) == 1 else {n: None for b in buckets for n in b})
+        if open is False:
+            sets.append(self._closed)
+        base = min(sets, key=len) if sets else self._nodes
+        rest = [s for s in sets if s is not base]
+        parents = None
+        if parent_type is not None:
+            parents = {parent_type} if isinstance(parent_type, str) else set(parent_type)
+        out = []
+        for nid in base:
+            if any(nid not in s for s in rest) or (open and nid in self._closed):
+                continue
+            node = self._nodes[nid]
+            if parents is not None:
+                parent = node.parent
+                if parent is None or getattr(parent.data, "type", None) not in parents:
+                    continue
+            out.append(node)
+        return out
+
+    def keys(self, **criteria: Any) -> List[str]:
+        """Issue keys of `select(**criteria)`, without duplicates."""
+        return list(dict.fromkeys(n.data.key for n in self.select(**criteria)))
+
+
+_INDEXES: Dict[int, TreeIndex] = {}
+
+
+def index_for(tree: Tree) -> TreeIndex:
+    """The index of `tree`, built on first use and dropped with the tree."""
+    index = _INDEXES.get(id(tree))
+    if index is None or index._tree() is not tree:
+        index = _INDEXES[id(tree)] = TreeIndex(tree)
+        weakref.finalize(tree, _INDEXES.pop, id(tree), None)
+    return index
+
+
+def peek_index(tree: Tree) -> Optional[TreeIndex]:
+    """The index of `tree` if one was built, else None (nothing to keep current)."""
+    index = _INDEXES.get(id(tree))
+    return index if index is not None and index._tree() is tree else None
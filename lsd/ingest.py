@@ -0,0 +1,208 @@
+"""Apply Jira issue webhooks to an in-memory LSD tree.
+
+Handles created/updated/deleted issue events and link changes (Parent Link,
+Epic Link) so a cached tree stays current without polling:
+- domain objects are updated in place;
+- nodes are re-parented when their Parent Link / Epic Link changes;
+- the tree_builder filters are re-evaluated against the issue's parent in
+  the tree (squad component/labels, closed issues), as a rebuild would;
+- the tree's inverted indexes (lsd.index), when built, are kept current.
+"""
+from __future__ import annotations
+
+import dataclasses
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from nutree import Tree
+
+from adapter.ports import Repository
+from .index import peek_index
+from .mappers import issue_from_json, to_domain
+from .models import PCIssue
+from .tree_builder import accepts_child, add_subtree, find_nodes
+
+
+logger = logging.getLogger(__name__)
+
+# Changelog field names carrying the hierarchy links
+LINK_FIELDS = ("Parent Link", "Epic Link", "parent")
+
+ISSUE_UPDATED = "jira:issue_updated"
+ISSUE_DELETED = "jira:issue_deleted"
+ISSUELINK_EVENTS = ("issuelink_created", "issuelink_deleted")
+
+
+def _link_change(event: Dict[str, Any]) -> Optional[str]:
+    """New parent key when the changelog touches a link field ("" when cleared), else None."""
+    for item in (event.get("changelog") or {}).get("items") or []:
+        if item.get("field") in LINK_FIELDS:
+            return item.get("toString") or item.get("to") or ""
+    return None
+
+
+def event_from_issue(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Webhook-shaped update event from a polled REST issue (changelog expanded).
+
+    History items are flattened newest first so the latest link change wins.
+    """
+    items: List[Dict[str, Any]] = []
+    for history in reversed((payload.get("changelog") or {}).get("histories") or []):
+        items.extend(history.get("items") or [])
+    issue = {k: v for k, v in payload.items() if k != "changelog"}
+    return {"webhookEvent": ISSUE_UPDATED, "issue": issue, "changelog": {"items": items}}
+
+
+def _parent_from_fields(fields: Dict[str, Any], link_field_ids: List[str]) -> Optional[str]:
+    parent = fields.get("parent")
+    if isinstance(parent, dict) and parent.get("key"):
+        return parent["key"]
+    for fid in link_field_ids:
+        value = fields.get(fid)
+        if isinstance(value, dict):
+            value = value.get("key") or value.get("value")
+        if value:
+            return str(value)
+    return None
+
+
+class TreeIngestor:
+    """Apply webhook events to one tree built for `squad` / `skip_closed`.
+
+    - `repo` (optional) is used to fetch the children of an Epic or Feature
+      newly attached to the tree; without it they appear on the next rebuild.
+    - `link_field_ids` lists custom field ids holding Parent/Epic Link values
+      (used for created events, which carry no changelog).
+    """
+
+    def __init__(self, tree: Tree, squad: str, skip_closed: bool = False,
+                 repo: Optional[Repository] = None, link_field_ids: Optional[List[str]] = None) -> None:
+        self.tree = tree
+        self.squad = squad
+        self.skip_closed = skip_closed
+        self.repo = repo
+        self.link_field_ids = list(link_field_ids or [])
+
+    def _keep(self, dom, parent) -> bool:
+        # Searches exclude closed statuses (JQL_NOT_CLOSED), so a closed PCI
+        # issue would not be part of a rebuilt tree either.
+        if isinstance(dom, PCIssue) and dom.is_closed():
+            return False
+        return accepts_child(parent.data if parent is not None else None, dom, self.squad, self.skip_closed)
+
+    def _remove_node(self, node) -> None:
+        index = peek_index(self.tree)
+        if index is not None:
+            index.remove_subtree(node)
+        node.remove()
+
+    def _remove(self, key: str) -> int:
+        nodes = find_nodes(self.tree, key)
+        for node in nodes:
+            self._remove_node(node)
+        return len(nodes)
+
+    def sync_roots(self, keys: List[str]) -> Tuple[List[Any], List[str]]:
+        """Make the top level match the LVL2 root search result `keys`.
+
+        Features that joined the sprint are fetched with their subtree (needs
+        `repo`) and appended; those that left it are removed. Returns (added
+        nodes, removed keys).
+        """
+        wanted = set(keys)
+        present = {getattr(node.data, "key", None): node for node in self.tree.children}
+        removed = [key for key in present if key not in wanted]
+        for key in removed:
+            self._remove_node(present[key])
+        added = []
+        if self.repo is not None:
+            for key in keys:
+                if key in present:
+                    continue
+                node = add_subtree(self.repo, self.tree, key, self.squad, self.skip_closed)
+                if node is not None:
+                    index = peek_index(self.tree)
+                    if index is not None:
+                        index.add_subtree(node)
+                    added.append(node)
+        return added, removed
+
+    def _attach(self, parent_key: str, dom, existing) -> Optional[str]:
+        parents = find_nodes(self.tree, parent_key)
+        if not parents:
+            # New parent is outside this tree: the issue leaves it
+            return "removed" if self._remove(dom.key) else None
+        parent = parents[0]
+        if existing:
+            node = existing[0]
+            for extra in existing[1:]:
+                self._remove_node(extra)
+            if node.parent is not parent:
+                node.move_to(parent)
+                return "moved"
+            return None
+        if self.repo is not None:
+            node = add_subtree(self.repo, parent, dom.key, self.squad, self.skip_closed)
+        else:
+            node = parent.add(dom)
+        index = peek_index(self.tree)
+        if index is not None and node is not None:
+            index.add_subtree(node)
+        return "added"
+
+    def apply(self, event: Dict[str, Any]) -> List[str]:
+        """Apply one webhook payload; returns a list of "<change> <key>" strings."""
+        kind = event.get("webhookEvent", "")
+        if kind in ISSUELINK_EVENTS:
+            # Issue links (blocks/relates) do not shape the LSD hierarchy
+            logger.debug('ingest: ignore %s', kind)
+            return []
+        issue = event.get("issue") or {}
+        key = issue.get("key")
+        if not key:
+            return []
+        if kind == ISSUE_DELETED:
+            return [f"removed {key}"] if self._remove(key) else []
+
+        dom = to_domain(issue_from_json(issue))
+        existing = find_nodes(self.tree, key)
+        changes: List[str] = []
+        parent_key = _link_change(event)
+        if parent_key is None and not existing:
+            parent_key = _parent_from_fields(issue.get("fields") or {}, self.link_field_ids)
+        # Parent the issue hangs under once the event is applied (None: top level)
+        if parent_key:
+            parents = find_nodes(self.tree, parent_key)
+            parent = parents[0] if parents else None
+        else:
+            parent = existing[0].parent if existing else None
+        if not self._keep(dom, parent):
+            return [f"removed {key}"] if self._remove(key) else []
+
+        # In-place update of the cached domain objects
+        index = peek_index(self.tree)
+        for node in existing:
+            if type(node.data) is type(dom):
+                for f in dataclasses.fields(dom):
+                    setattr(node.data, f.name, getattr(dom, f.name))
+            else:
+                node.set_data(dom)
+            if index is not None:
+                index.update(node)
+        if existing:
+            changes.append(f"updated {key}")
+
+        if parent_key is not None:
+            if parent_key:
+                change = self._attach(parent_key, dom, existing)
+            elif existing and existing[0].parent is not None:
+                # Link cleared: the issue no longer hangs under this tree
+                self._remove(key)
+                change = "removed"
+            else:
+                change = None
+            if change:
+                changes.append(f"{change} {key}")
+        for change in changes:
+            logger.info('ingest: %s', change)
+        return changes
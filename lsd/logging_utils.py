@@ -1,17 +1,185 @@
+import atexit
 import logging
 import os
-from typing import Optional
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
 
 
-def setup_logging(log_file: Optional[str] = None) -> None:
+class SamplingFilter(logging.Filter):
+    """Sample or aggregate log records by category, without touching call sites.
+
+    A category is a message template (e.g. 'JQL: %s') or a logger name.
+    - `sample` {category: n}: keep the 1st, (n+1)th, ... record of the category;
+    - `aggregate` categories: records are only counted, see `summary()`.
+    One instance may sit on several handlers: each record is decided once.
+    """
+
+    def __init__(self, sample: Optional[Dict[str, int]] = None, aggregate: Iterable[str] = ()) -> None:
+        super().__init__()
+        self.sample = {k: max(1, int(v)) for k, v in (sample or {}).items()}
+        self.aggregate = set(aggregate)
+        self.counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self._last: Optional[logging.LogRecord] = None
+        self._last_keep = True
+
+    def _category(self, record: logging.LogRecord) -> Optional[str]:
+        for category in (record.msg, record.name):
+            if isinstance(category, str) and (category in self.sample or category in self.aggregate):
+                return category
+        return None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        category = self._category(record)
+        if category is None:
+            return True
+        with self._lock:
+            if record is self._last:
+                return self._last_keep
+            self.counts[category] += 1
+            keep = category not in self.aggregate and (self.counts[category] - 1) % self.sample[category] == 0
+            self._last, self._last_keep = record, keep
+        return keep
+
+    def summary(self) -> List[str]:
+        """One line per category seen: aggregated counts and sampling ratios."""
+        lines = []
+        for category, n in sorted(self.counts.items()):
+            if category in self.aggregate:
+                lines.append(f"{n} x {category!r} (aggregated)")
+            else:
+                kept = (n - 1) // self.sample[category] + 1
+                lines.append(f"{kept}/{n} x {category!r} (sampled 1/{self.sample[category]})")
+        return lines
+
+
+class BufferedFileHandler(logging.FileHandler):
+    """FileHandler flushing at most every `flush_interval` seconds (always for WARNING+ and on close)."""
+
+    def __init__(self, filename: str, flush_interval: float = 1.0, **kwargs) -> None:
+        super().__init__(filename, **kwargs)
+        self.flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+        self._force = False
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self._force = record.levelno >= logging.WARNING
+        super().emit(record)
+
+    def flush(self) -> None:
+        now = time.monotonic()
+        if self._force or now - self._last_flush >= self.flush_interval:
+            super().flush()
+            self._last_flush = now
+
+    def close(self) -> None:
+        self._force = True
+        super().close()
+
+
+def _start_queue(handlers: List[logging.Handler]):
+    """Queue handler for the root logger and the started listener writing to `handlers`."""
+    # Imported here: logging.handlers costs ~25 ms at CLI startup
+    import queue
+    from logging.handlers import QueueHandler, QueueListener
+
+    class ThreadQueueHandler(QueueHandler):
+        # Same-process queue: only interpolate the message here; timestamps,
+        # formatting and I/O happen in the listener thread.
+        def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+            record.msg = record.getMessage()
+            record.args = None
+            return record
+
+    class FlushingQueueListener(QueueListener):
+        # Buffered handlers only flush when a later record arrives: when the
+        # queue stays empty for `idle` seconds (--serve/--watch between
+        # requests/polls), flush them from the listener thread.
+        idle = min((getattr(h, "flush_interval", 1.0) for h in handlers), default=1.0)
+
+        def dequeue(self, block: bool) -> logging.LogRecord:
+            while True:
+                try:
+                    return self.queue.get(block, self.idle if block else None)
+                except queue.Empty:
+                    if not block:
+                        raise
+                    for h in self.handlers:
+                        h.flush()
+
+    q: Any = queue.SimpleQueue()
+    listener = FlushingQueueListener(q, *handlers, respect_handler_level=True)
+    listener.start()
+    return ThreadQueueHandler(q), listener
+
+
+_listener: Any = None  # logging.handlers.QueueListener in queued mode
+_queue_handler: Optional[logging.Handler] = None
+_filter: Optional[SamplingFilter] = None
+
+
+def shutdown_logging() -> None:
+    """Log the sampling/aggregation summary, then drain and stop the queue writer."""
+    global _listener, _queue_handler, _filter
+    if _filter is not None:
+        log = logging.getLogger(__name__)
+        for line in _filter.summary():
+            log.info("log summary: %s", line)
+        _filter = None
+    if _listener is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener.stop()
+        for h in _listener.handlers:
+            h.close()
+        _listener = _queue_handler = None
+
+
+def use_direct_handlers() -> None:
+    """In a forked worker process (--processes): replace the inherited queue
+    handler, whose listener thread only runs in the parent, by handlers writing
+    directly to the same console and file. Worker records are then written
+    unbuffered, interleaved with the parent's, and left out of the sampling
+    summary; records are never dropped."""
+    global _listener, _queue_handler, _filter
+    if _listener is None:
+        return
+    root_logger = logging.getLogger()
+    root_logger.removeHandler(_queue_handler)
+    for h in _listener.handlers:
+        # Fresh handlers: the inherited ones may hold the parent's unwritten buffer
+        if isinstance(h, logging.FileHandler):
+            direct: logging.Handler = logging.FileHandler(h.baseFilename, encoding=h.encoding)
+        else:
+            direct = logging.StreamHandler(getattr(h, "stream", None))
+        direct.setLevel(h.level)
+        direct.setFormatter(h.formatter)
+        for f in _queue_handler.filters:
+            direct.addFilter(f)
+        root_logger.addHandler(direct)
+    _listener = _queue_handler = _filter = None
+
+
+def setup_logging(
+    log_file: Optional[str] = None,
+    queued: bool = False,
+    sample: Optional[Dict[str, int]] = None,
+    aggregate: Optional[Iterable[str]] = None,
+) -> None:
     """
     Configure application logging with fixed levels:
     - Console (stdout/stderr): INFO
     - File (if provided): DEBUG
 
-    No user configurability (ignores env and arguments beyond file path).
+    Levels are not configurable. Optional modes (see `--log-config`):
+    - `queued`: callers only enqueue records; a background thread formats and
+      writes them, the file being flushed in batches (BufferedFileHandler);
+    - `sample` / `aggregate`: per-category sampling or counting (SamplingFilter),
+      summarized at exit.
     Idempotent: does not duplicate handlers; if handlers exist, updates levels.
     """
+    global _listener, _queue_handler, _filter
     root_logger = logging.getLogger()
     # Allow all messages; handlers will filter by their own levels
     root_logger.setLevel(logging.DEBUG)
@@ -20,13 +188,14 @@ def setup_logging(log_file: Optional[str] = None) -> None:
         fmt="%(asctime)s %(levelname)s %(name)s: %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S",
     )
+    sampling = SamplingFilter(sample, aggregate or ()) if (sample or aggregate) else None
 
     if not root_logger.handlers:
         # Console handler at INFO
         ch = logging.StreamHandler()
         ch.setLevel(logging.INFO)
         ch.setFormatter(formatter)
-        root_logger.addHandler(ch)
+        handlers: List[logging.Handler] = [ch]
 
         # Optional file handler at DEBUG
         if log_file:
@@ -36,16 +205,30 @@ def setup_logging(log_file: Optional[str] = None) -> None:
                     os.makedirs(parent, exist_ok=True)
             except Exception:
                 pass
-            fh = logging.FileHandler(log_file)
+            fh = BufferedFileHandler(log_file) if queued else logging.FileHandler(log_file)
             fh.setLevel(logging.DEBUG)
             fh.setFormatter(formatter)
-            root_logger.addHandler(fh)
+            handlers.append(fh)
+
+        if queued:
+            _queue_handler, _listener = _start_queue(handlers)
+            if sampling is not None:
+                _queue_handler.addFilter(sampling)
+            root_logger.addHandler(_queue_handler)
+        else:
+            for h in handlers:
+                if sampling is not None:
+                    h.addFilter(sampling)
+                root_logger.addHandler(h)
+        if queued or sampling is not None:
+            _filter = sampling
+            atexit.register(shutdown_logging)
     else:
         # Update existing handlers' levels to match policy
         for h in root_logger.handlers:
             if isinstance(h, logging.FileHandler):
                 h.setLevel(logging.DEBUG)
                 h.setFormatter(formatter)
-            else:
+            elif h is not _queue_handler:
                 h.setLevel(logging.INFO)
                 h.setFormatter(formatter)
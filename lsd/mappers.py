@@ -1,6 +1,7 @@
 import logging
 from typing import Any, Optional
 
+from .fields import FIELD_REGISTRY
 from .models import (
     IssueBase,
     LVL2Epic,
@@ -29,14 +30,47 @@ def _safe_components(fields: Any) -> list[str]:
     return [getattr(c, "name", "") for c in comps]
 
 
+def _field_id(name: str) -> str:
+    # Registry ids, possibly remapped from Jira metadata (fields.resolve_field_ids)
+    return FIELD_REGISTRY[name].jira_id
+
+
 def _safe_story_points(fields: Any) -> int:
-    sp = getattr(fields, "customfield_10006", None)
+    sp = getattr(fields, _field_id("story_points"), None)
     try:
         return int(sp) if sp is not None else 0
     except Exception:
         return 0
 
 
+class _JsonObject:
+    """Attribute view over a Jira REST JSON dict (as found in webhooks)."""
+
+    def __init__(self, raw: dict) -> None:
+        self._raw = raw
+
+    def __getattr__(self, item: str) -> Any:
+        try:
+            return _from_json_value(self._raw[item])
+        except KeyError:
+            raise AttributeError(item) from None
+
+
+def _from_json_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        return _JsonObject(value)
+    if isinstance(value, list):
+        return [_from_json_value(v) for v in value]
+    return value
+
+
+def issue_from_json(payload: dict) -> Any:
+    """Wrap a REST issue payload ({"key", "fields": {...}}) for to_domain."""
+    obj = _JsonObject(payload)
+    obj.key = payload.get("key", "")  # type: ignore[attr-defined]
+    return obj
+
+
 def to_domain(issue: Any) -> IssueBase | PCIssue:
     """Map a jira.Issue-like object to a pure domain model instance.
 
@@ -53,7 +87,7 @@ def to_domain(issue: Any) -> IssueBase | PCIssue:
 
     if project == "LVL2":
         if itype == "Epic LPM":
-            blfnt = getattr(fields, "customfield_10530", None)
+            blfnt = getattr(fields, _field_id("blfnt"), None)
             blfnt_val = getattr(blfnt, "value", "na") if blfnt else "na"
             return LVL2Epic(
                 key=issue.key,
@@ -66,7 +100,7 @@ def to_domain(issue: Any) -> IssueBase | PCIssue:
                 blfnt=blfnt_val,
             )
         elif itype == "New Feature":
-            pu = getattr(fields, "customfield_16708", None)
+            pu = getattr(fields, _field_id("pu"), None)
             pu_val = getattr(pu, "value", "na") if pu else "na"
             return LVL2Feature(
                 key=issue.key,
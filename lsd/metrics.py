@@ -0,0 +1,144 @@
+"""Run metrics written as a Prometheus textfile (node_exporter textfile collector).
+
+    metrics = RunMetrics(year="26", quarter="1", squad="Network")
+    metrics.track(profiler=profiler, jira=jira_repo, identity_map=base_repo)
+    ...
+    metrics.observe_trees([tree])
+    metrics.completed()
+    metrics.write_textfile("/var/lib/node_exporter/textfile/lsd_network.prom")
+
+Values describe the last run (gauges). Every series carries the run labels
+(year, quarter, squad) so scheduled runs for several squads can write side by
+side. Statistics are read from the tracked objects when the file is written,
+so a failed run still reports what it did (with lsd_run_success 0).
+"""
+from __future__ import annotations
+
+import os
+import time
+from typing import Any, Dict, Iterable, List, Tuple
+
+from nutree import Tree
+
+
+PREFIX = "lsd_"
+
+# name -> help; all gauges
+METRICS = {
+    "run_success": "1 if the last run completed, else 0",
+    "run_timestamp_seconds": "End time of the last run (Unix time)",
+    "run_duration_seconds": "Duration of the last run by phase (phase=\"total\": whole run)",
+    "jira_requests": "Jira HTTP responses by method and status code",
+    "jira_request_bytes": "Request body bytes sent to Jira by method",
+    "jira_response_bytes": "Response body bytes received from Jira by method",
+    "jira_throttled_responses": "Jira responses retried after throttling (429) or unavailability (503)",
+    "jira_retry_wait_seconds": "Time waited before retrying throttled Jira requests",
+    "tree_issues": "Distinct issues in the built tree(s) by type",
+    "writes": "Issue writes applied to Jira or skipped (simulation)",
+    "cache_lookups": "Cache lookups by cache and result",
+    "cache_hit_ratio": "Hit ratio by cache",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class RunMetrics:
+    def __init__(self, **labels: str) -> None:
+        self.labels = {k: str(v) for k, v in labels.items()}
+        self.sources: Dict[str, Any] = {}
+        self.success = False
+        self._start = time.perf_counter()
+        self._values: Dict[str, Dict[Labels, float]] = {}
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        if name not in METRICS:
+            raise KeyError(f"Unknown metric: {name}")
+        self._values.setdefault(name, {})[tuple(sorted(labels.items()))] = float(value)
+
+    def track(self, **sources: Any) -> None:
+        """Register statistics sources read by `collect()`:
+        profiler (phase durations), jira (JiraRepository: HTTP stats, writes),
+        sim (SimRepository: skipped writes), identity_map, search_cache."""
+        self.sources.update({k: v for k, v in sources.items() if v is not None})
+
+    def observe_trees(self, trees: Iterable[Tree]) -> None:
+        by_type: Dict[str, set] = {}
+        for tree in trees:
+            for node in tree:
+                by_type.setdefault(getattr(node.data, "type", None) or "unknown", set()).add(node.data.key)
+        for issue_type, keys in by_type.items():
+            self.set("tree_issues", len(keys), type=issue_type)
+
+    def completed(self) -> None:
+        self.success = True
+
+    def collect(self) -> None:
+        """Read the tracked sources into metric values."""
+        self.set("run_success", 1 if self.success else 0)
+        self.set("run_timestamp_seconds", time.time())
+        self.set("run_duration_seconds", time.perf_counter() - self._start, phase="total")
+        profiler = self.sources.get("profiler")
+        if profiler is not None:
+            for phase, seconds in profiler.durations.items():
+                self.set("run_duration_seconds", seconds, phase=phase)
+        jira = self.sources.get("jira")
+        if jira is not None:
+            http = jira.http
+            for (method, code), n in http.requests.items():
+                self.set("jira_requests", n, method=method, code=code)
+            for method, n in http.bytes_sent.items():
+                self.set("jira_request_bytes", n, method=method)
+            for method, n in http.bytes_received.items():
+                self.set("jira_response_bytes", n, method=method)
+            for code, n in http.throttled.items():
+                self.set("jira_throttled_responses", n, code=code)
+            self.set("jira_retry_wait_seconds", http.retry_wait)
+            self.set("writes", jira.writes, outcome="applied")
+        sim = self.sources.get("sim")
+        if sim is not None:
+            self.set("writes", sim.skipped, outcome="skipped")
+        identity_map = self.sources.get("identity_map")
+        if identity_map is not None:
+            self._cache("identity_map", hit=identity_map.hits, miss=identity_map.misses)
+        search_cache = self.sources.get("search_cache")
+        if search_cache is not None:
+            self._cache("search", fresh=search_cache.hits, stale=search_cache.stale, miss=search_cache.misses)
+
+    def _cache(self, cache: str, **results: int) -> None:
+        for result, n in results.items():
+            self.set("cache_lookups", n, cache=cache, result=result)
+        total = sum(results.values())
+        if total:
+            self.set("cache_hit_ratio", 1 - results["miss"] / total, cache=cache)
+
+    def render(self) -> str:
+        """Metric values in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for name in (n for n in METRICS if n in self._values):
+            full, series = PREFIX + name, self._values[name]
+            lines.append(f"# HELP {full} {METRICS[name]}")
+            lines.append(f"# TYPE {full} gauge")
+            for labels, value in sorted(series.items()):
+                pairs = {**self.labels, **dict(labels)}
+                rendered = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs.items())
+                lines.append(f"{full}{{{rendered}}} {_number(value)}" if rendered else f"{full} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str) -> None:
+        """Collect and write atomically (temp file + rename): the collector never reads a partial file."""
+        self.collect()
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
@@ -1,11 +1,89 @@
+import hashlib
+import json
 import logging
 import os
-from typing import Tuple
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from .export import node_record
+from .hashing import annotate_hashes, subtree_hash
+from .models import PCIssue
+from .tracing import span, traced
 
 
 logger = logging.getLogger(__name__)
 
 
+class RenderCache:
+    """Content hashes of rendered graph outputs, one entry per output file.
+
+    render_graph and write_dot_per_feature record the subtree hash (see
+    lsd.hashing) each output was produced from, and skip outputs whose hash
+    is unchanged. Entries of a namespace (output kind and options) are kept
+    in memory and stored in one index file, `{cache_dir}/{namespace}.json`;
+    `save()` (called by the renderers) keeps only the entries used during the
+    run. `cache_dir=None` keeps the cache in memory only (daemon). Safe to
+    delete at any time.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = './out/.render-cache') -> None:
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[str, dict[str, str]] = {}  # namespace -> output key -> hash
+        self._used: dict[str, set] = {}
+
+    def _path(self, namespace: str) -> str:
+        return os.path.join(self.cache_dir, f'{namespace}.json')
+
+    def _namespace(self, namespace: str) -> dict[str, str]:
+        entries = self._entries.get(namespace)
+        if entries is None:
+            entries = {}
+            if self.cache_dir is not None:
+                try:
+                    with open(self._path(namespace), encoding='utf-8') as fh:
+                        entries = json.load(fh)
+                except (OSError, ValueError):
+                    pass
+            self._entries[namespace] = entries
+            self._used[namespace] = set()
+        return entries
+
+    def get(self, namespace: str, key: str) -> Optional[str]:
+        value = self._namespace(namespace).get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._used[namespace].add(key)
+        return value
+
+    def put(self, namespace: str, key: str, value: str) -> None:
+        self._namespace(namespace)[key] = value
+        self._used[namespace].add(key)
+
+    def save(self, namespace: str) -> None:
+        """Drop the entries not used since loading and write the index file."""
+        entries = self._namespace(namespace)
+        used = self._used[namespace]
+        for key in [k for k in entries if k not in used]:
+            del entries[key]
+        if self.cache_dir is None:
+            return
+        path = self._path(namespace)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f'{path}.{os.getpid()}.tmp'
+            with open(tmp, 'w', encoding='utf-8') as fh:
+                json.dump(entries, fh)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning('Failed to write render cache %s: %s', path, e)
+
+
+@traced("render")
 def to_ascii(tree) -> str:
     """Return a human-readable ASCII representation of the tree.
 
@@ -14,6 +92,70 @@ def to_ascii(tree) -> str:
     return tree.format()
 
 
+def _prefixed(lines: List[str], is_last: bool) -> List[str]:
+    first, rest = ("╰── ", "    ") if is_last else ("├── ", "│   ")
+    return [first + lines[0]] + [rest + line for line in lines[1:]]
+
+
+class ProgressiveAsciiPrinter:
+    """Print each LVL2 root subtree as soon as it is complete.
+
+    Use as build_lsd_tree(on_root=printer). Output is line-for-line identical to
+    to_ascii(tree) once the build finishes; call finish(tree) afterwards so an
+    empty tree still prints its header.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None) -> None:
+        self._stream = stream or sys.stdout
+        self._started = False
+
+    def _header(self, tree) -> None:
+        if not self._started:
+            self._started = True
+            self._stream.write(f"{tree}\n")
+
+    def __call__(self, node, is_last: bool) -> None:
+        with span("print_subtree", "render", key=getattr(node.data, "key", None)):
+            self._header(node.tree)
+            lines = node.format(add_self=True).split("\n")
+            self._stream.write("\n".join(_prefixed(lines, is_last)) + "\n")
+            self._stream.flush()
+
+    def finish(self, tree) -> None:
+        self._header(tree)
+        self._stream.flush()
+
+
+class NdjsonWriter:
+    """Stream newline-delimited JSON records (one per line, flushed) to `stream`.
+
+    Each record carries a `kind`: "node" (tree node as attached), "orphan"
+    (from services.find_orphans) or "change" (change-plan item). Methods are
+    usable directly as callbacks for build_lsd_tree(on_node=...),
+    find_orphans(on_orphan=...) and SimRepository(on_change=...).
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None) -> None:
+        self._stream = stream or sys.stdout
+
+    def emit(self, record: dict[str, Any]) -> None:
+        self._stream.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self._stream.flush()
+
+    def node(self, node) -> None:
+        parent = node.parent
+        parent_key = getattr(parent.data, "key", None) if parent is not None else None
+        self.emit({"kind": "node", **node_record(node.data, parent_key, node.depth() - 1)})
+
+    def orphan(self, issue) -> None:
+        rec = node_record(issue, None, 0)
+        del rec["parent_key"], rec["level"]
+        self.emit({"kind": "orphan", **rec})
+
+    def change(self, key: str, fields: dict[str, Any]) -> None:
+        self.emit({"kind": "change", "key": key, "fields": fields})
+
+
 def _wrap(text: str, width: int) -> str:
     if not text:
         return ""
@@ -71,13 +213,33 @@ def _node_label(issue) -> Tuple[str, dict]:
     return label, attrs
 
 
-def render_graph(tree, *, out_dir: str = './out', filename: str = 'lsd-tree', fmt: str = 'png', open_view: bool = True) -> str:
+def _output_key(path: str) -> str:
+    return hashlib.blake2b(os.path.abspath(path).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _is_output_fresh(cache: RenderCache, namespace: str, path: str, digest: str) -> bool:
+    """True when `path` exists and was produced from content hash `digest`."""
+    return os.path.exists(path) and cache.get(namespace, _output_key(path)) == digest
+
+
+@traced("render")
+def render_graph(tree, *, out_dir: str = './out', filename: str = 'lsd-tree', fmt: str = 'png', open_view: bool = True,
+                 cache: Optional[RenderCache] = None) -> str:
     """Render the tree to a Graphviz graph, save to disk, and optionally open it.
 
     - Node labels: key + status + wrapped title (readable in boxes).
     - Layout: top-to-bottom tree.
     - Returns the path (without extension) to the generated file from graphviz.
+    - With a RenderCache, rendering is skipped when the tree hash matches the
+      one recorded for the existing output file.
     """
+    out_path = os.path.join(out_dir, filename)
+    saved_path = f'{out_path}.{fmt}'
+    if cache is not None:
+        digest = annotate_hashes(tree)
+        if _is_output_fresh(cache, 'graph', saved_path, digest):
+            logger.info('Graph unchanged, reuse %s', saved_path)
+            return saved_path
     # Lazy import so graphviz is optional unless rendering
     try:
         from graphviz import Digraph  # type: ignore
@@ -90,43 +252,22 @@ def render_graph(tree, *, out_dir: str = './out', filename: str = 'lsd-tree', fm
     dot = Digraph('LSD', format=fmt)
     dot.attr(rankdir='TB', fontsize='12', fontname='Arial')
 
-    # We need stable ids for nodes; use incremental indices during traversal
+    # Single depth-first pass: parents are visited before children, so each
+    # node gets its id before any edge from its parent is emitted.
     id_map = {}
-    counter = 0
-
-    # First pass: create all nodes
     for node in tree:
-        nid = id_map.setdefault(id(node), f'n{counter}')
-        if nid == f'n{counter}':
-            counter += 1
+        nid = id_map[id(node)] = f'n{len(id_map)}'
         label, attrs = _node_label(node.data)
         dot.node(nid, label=label, **attrs)
+        parent = node.parent
+        if parent is not None:
+            dot.edge(id_map[id(parent)], nid, color='gray60')
 
-    # Second pass: create edges (parent -> children)
-    def walk(n):
-        pid = id_map[id(n)]
-        for child in n:
-            cid = id_map[id(child)]
-            dot.edge(pid, cid, color='gray60')
-            walk(child)
-
-    # root(s) are children of the Tree object; detect by nodes without parents
-    # nutree.Tree is iterable depth-first; we can start from the real root (tree.root)
-    try:
-        root = tree.root
-    except Exception:
-        root = None
-    if root is not None:
-        walk(root)
-    else:
-        # Fallback: no explicit root attribute; best-effort pass over first-level nodes
-        for node in tree:
-            for child in node:
-                dot.edge(id_map[id(node)], id_map[id(child)], color='gray60')
-
-    out_path = os.path.join(out_dir, filename)
     logger.info('Rendering graph to %s.%s', out_path, fmt)
     saved = dot.render(out_path, cleanup=True)
+    if cache is not None:
+        cache.put('graph', _output_key(saved_path), digest)
+        cache.save('graph')
 
     if open_view:
         try:
@@ -135,3 +276,146 @@ def render_graph(tree, *, out_dir: str = './out', filename: str = 'lsd-tree', fm
             logger.warning('Failed to open viewer: %s', e)
 
     return saved
+
+
+# -----------------
+# Direct DOT writer (no graphviz package needed)
+# -----------------
+_GRAPH_ATTRS = 'rankdir="TB", fontsize="12", fontname="Arial"'
+_EDGE_ATTRS = 'color="gray60"'
+
+
+def _dot_quote(value: str) -> str:
+    escaped = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return f'"{escaped}"'
+
+
+def _dot_node(nid: str, label: str, attrs: dict) -> str:
+    parts = [f'label={_dot_quote(label)}'] + [f'{k}={_dot_quote(v)}' for k, v in attrs.items()]
+    return f'  {nid} [{", ".join(parts)}];'
+
+
+def _is_collapsed(node, collapse_closed: bool) -> bool:
+    d = node.data
+    return collapse_closed and isinstance(d, PCIssue) and d.is_closed() and node.has_children()
+
+
+def iter_dot(
+    roots: Iterable,
+    *,
+    name: str = 'LSD',
+    collapse_closed: bool = False,
+    max_leaves: Optional[int] = None,
+) -> Iterator[str]:
+    """Yield DOT source lines for the subtrees under `roots` (a tree or nodes).
+
+    Iterative (explicit stack), single pass, constant memory per line.
+    - collapse_closed: closed PCI issues are drawn without their descendants,
+      labelled with the number of hidden nodes.
+    - max_leaves: at most N leaf children are drawn per node; the rest are
+      summarized by one "+K more" node (with their story points).
+    """
+    if hasattr(roots, 'children') and not hasattr(roots, 'data'):
+        roots = roots.children  # nutree.Tree: start from top-level nodes
+    yield f'digraph {_dot_quote(name)} {{'
+    yield f'  graph [{_GRAPH_ATTRS}];'
+    counter = 0
+    stack: List[Tuple[Any, Optional[str]]] = [(n, None) for n in reversed(list(roots))]
+    while stack:
+        node, pid = stack.pop()
+        nid = f'n{counter}'
+        counter += 1
+        label, attrs = _node_label(node.data)
+        collapsed = _is_collapsed(node, collapse_closed)
+        if collapsed:
+            label += f"\n[+{node.count_descendants()} hidden]"
+            attrs = {**attrs, 'style': 'rounded,filled,dashed'}
+        yield _dot_node(nid, label, attrs)
+        if pid is not None:
+            yield f'  {pid} -> {nid} [{_EDGE_ATTRS}];'
+        if collapsed:
+            continue
+        children = list(node.children)
+        if max_leaves is not None:
+            leaves = [c for c in children if not c.has_children()]
+            if len(leaves) > max_leaves:
+                hidden = leaves[max_leaves:]
+                hidden_ids = {id(c) for c in hidden}
+                children = [c for c in children if id(c) not in hidden_ids]
+                points = sum(int(getattr(c.data, 'story_points', 0) or 0) for c in hidden)
+                mid = f'n{counter}'
+                counter += 1
+                yield _dot_node(mid, f"+{len(hidden)} more\n{points} pts",
+                                {'shape': 'note', 'fontsize': '10', 'fontname': 'Arial', 'color': 'gray60'})
+                yield f'  {nid} -> {mid} [{_EDGE_ATTRS}, style="dashed"];'
+        for child in reversed(children):
+            stack.append((child, nid))
+    yield '}'
+
+
+@traced("render")
+def write_dot(roots: Iterable, path: str, **kwargs) -> str:
+    """Stream DOT source for `roots` to `path`; kwargs as for iter_dot."""
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as fh:
+        for line in iter_dot(roots, **kwargs):
+            fh.write(line + '\n')
+    return path
+
+
+def _render_dot_file(path: str, fmt: str) -> str:
+    import subprocess  # only needed when rendering with the `dot` binary
+
+    out = f'{os.path.splitext(path)[0]}.{fmt}'
+    subprocess.run(['dot', f'-T{fmt}', path, '-o', out], check=True)
+    return out
+
+
+@traced("render")
+def write_dot_per_feature(
+    tree,
+    out_dir: str = './out',
+    *,
+    fmt: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    cache: Optional[RenderCache] = None,
+    **kwargs,
+) -> List[str]:
+    """Write one DOT file per top-level LVL2 item under `out_dir`.
+
+    When `fmt` is given (e.g. "svg"), each file is laid out by a separate
+    `dot` process, up to `max_workers` at a time, so layout time is bounded by
+    the largest feature rather than the whole quarter. Returns the written
+    paths (rendered ones when `fmt` is set). kwargs as for iter_dot.
+    With a RenderCache, features whose subtree hash is unchanged since the
+    last run are neither rewritten nor rendered again.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    if cache is not None:
+        annotate_hashes(tree)
+    # Options change the output: make them part of the cache namespace
+    namespace = 'dot-' + hashlib.blake2b(repr(sorted(kwargs.items())).encode('utf-8'), digest_size=8).hexdigest()
+    outputs: List[str] = []
+    todo: List[Tuple[str, str, Optional[str]]] = []
+    for node in tree.children:
+        key = getattr(node.data, 'key', '') or f'node-{len(outputs)}'
+        dot_path = os.path.join(out_dir, f'{key}.dot')
+        out = f'{os.path.splitext(dot_path)[0]}.{fmt}' if fmt else dot_path
+        outputs.append(out)
+        digest = subtree_hash(node) if cache is not None else None
+        if digest is not None and _is_output_fresh(cache, namespace, out, digest):
+            logger.debug('Graph for %s unchanged, skip', key)
+            continue
+        write_dot([node], dot_path, name=key, **kwargs)
+        todo.append((dot_path, out, digest))
+    if fmt and todo:
+        logger.info('Rendering %d graphs to %s (%s)', len(todo), out_dir, fmt)
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+            list(pool.map(lambda t: _render_dot_file(t[0], fmt), todo))
+    if cache is not None:
+        for _, out, digest in todo:
+            cache.put(namespace, _output_key(out), digest)
+        cache.save(namespace)
+    return outputs
@@ -0,0 +1,135 @@
+"""Per-phase CPU (cProfile) and memory (tracemalloc) reports for CLI runs.
+
+    profiler = Profiler("cpu")           # or "mem", or None for no-op phases
+    with profiler.phase("build"):
+        tree = build_lsd_tree(...)
+
+Each phase writes `profile-<phase>.txt` to the output directory (next to
+logs.txt); CPU phases also dump `profile-<phase>.pstats` for external viewers.
+Memory reports list the allocations made during the phase and still alive at
+its end (traces are cleared when a phase starts; imports excluded), overall
+and for the modules building the tree (lsd.mappers, nutree).
+cProfile only sees the calling thread: with --workers > 1, fetches running
+in pool threads are missing from CPU reports.
+"""
+from __future__ import annotations
+
+import contextlib
+import fnmatch
+import logging
+import os
+import time
+from typing import Dict, Iterator, List, Optional
+
+from .tracing import span
+
+
+logger = logging.getLogger(__name__)
+
+MODES = ("cpu", "mem")
+TOP = 30
+# Allocations whose traceback goes through these files get their own section
+FOCUS = {"lsd.mappers": "*/lsd/mappers.py", "nutree": "*/nutree/*"}
+TRACEBACK_DEPTH = 10
+
+
+class Profiler:
+    def __init__(self, mode: Optional[str], out_dir: str = "./out") -> None:
+        if mode is not None and mode not in MODES:
+            raise ValueError(f"Unknown profile mode: {mode} (expected one of {MODES})")
+        self.mode = mode
+        self.out_dir = out_dir
+        self.reports: List[str] = []
+        self.durations: Dict[str, float] = {}  # phase -> seconds (also without a mode)
+        if mode == "mem":
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(TRACEBACK_DEPTH)
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Profile the enclosed block; the report is written even if it raises or exits.
+
+        Also recorded as a tracing span (see lsd.tracing) and timed in
+        `durations`, with or without a mode.
+        """
+        start = time.perf_counter()
+        try:
+            with span(name, "phase"):
+                if self.mode is None:
+                    yield
+                else:
+                    yield from self._profiled(name)
+        finally:
+            self.durations[name] = self.durations.get(name, 0.0) + time.perf_counter() - start
+
+    def _profiled(self, name: str) -> Iterator[None]:
+        os.makedirs(self.out_dir, exist_ok=True)
+        path = os.path.join(self.out_dir, f"profile-{name}.txt")
+        start = time.perf_counter()
+        if self.mode == "cpu":
+            import cProfile
+
+            prof = cProfile.Profile()
+            prof.enable()
+            try:
+                yield
+            finally:
+                prof.disable()
+                self._write_cpu(prof, name, path, time.perf_counter() - start)
+                self._written(name, path)
+        else:
+            import tracemalloc
+
+            tracemalloc.clear_traces()
+            tracemalloc.reset_peak()
+            try:
+                yield
+            finally:
+                self._write_mem(tracemalloc.take_snapshot(), name, path, time.perf_counter() - start)
+                self._written(name, path)
+
+    def _written(self, name: str, path: str) -> None:
+        self.reports.append(path)
+        logger.info("Profile of phase %s (%s): %s", name, self.mode, path)
+
+    def _write_cpu(self, prof, name: str, path: str, elapsed: float) -> None:
+        import pstats
+
+        prof.dump_stats(os.path.join(self.out_dir, f"profile-{name}.pstats"))
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"phase {name}: {elapsed:.3f}s wall\n\n")
+            stats = pstats.Stats(prof, stream=f).strip_dirs()
+            stats.sort_stats("cumulative").print_stats(TOP)
+            stats.sort_stats("tottime").print_stats(TOP)
+
+    def _write_mem(self, snapshot, name: str, path: str, elapsed: float) -> None:
+        import tracemalloc
+
+        current, peak = tracemalloc.get_traced_memory()
+        # Module code and tables loaded by lazy imports are not run data
+        snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__),
+                                           tracemalloc.Filter(False, "<frozen importlib._bootstrap*>", all_frames=True)])
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"phase {name}: {elapsed:.3f}s wall, {current / 1024:.0f} KiB traced since phase start (peak {peak / 1024:.0f} KiB)\n")
+            self._write_top(f, "all", [((st.traceback[0].filename, st.traceback[0].lineno), st.size, st.count)
+                                       for st in snapshot.statistics("lineno")])
+            by_traceback = snapshot.statistics("traceback")
+            for label, pattern in FOCUS.items():
+                # Charged to the innermost frame of the focused module, not to
+                # the builtin/dataclass code that did the allocation
+                rows = {}
+                for st in by_traceback:
+                    frame = next((fr for fr in st.traceback if fnmatch.fnmatch(fr.filename, pattern)), None)
+                    if frame is not None:
+                        size, count = rows.get((frame.filename, frame.lineno), (0, 0))
+                        rows[(frame.filename, frame.lineno)] = (size + st.size, count + st.count)
+                self._write_top(f, label, sorted(((where, size, count) for where, (size, count) in rows.items()),
+                                                 key=lambda row: -row[1]))
+
+    @staticmethod
+    def _write_top(f, label: str, rows) -> None:
+        f.write(f"\ntop {TOP} allocators ({label}): {sum(row[1] for row in rows) / 1024:.0f} KiB\n")
+        for (filename, lineno), size, count in rows[:TOP]:
+            f.write(f"  {size / 1024:9.1f} KiB {count:7d} blocks  {filename}:{lineno}\n")
@@ -0,0 +1,161 @@
+"""Quarter-label reconciliation of built trees against Jira.
+
+One projected search per squad returns every open PCI issue carrying any
+FY{year}Q{1..4} label of the target years. Keys are numbered once and each
+label and each tree becomes an int bitmap, so orphans, mislabeled issues and
+issues labeled for several quarters are plain set algebra: no per-issue fetch.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from nutree import Tree
+
+from adapter.ports import Repository
+from .labels import str_lvl3_sprint_label
+from .mappers import issue_from_json, to_domain
+from .models import IssueBase, PCIssue
+from .tree_builder import Target
+
+
+logger = logging.getLogger(__name__)
+
+QUARTERS = ("1", "2", "3", "4")
+ORPHAN, MISLABELED, MULTI_QUARTER = "orphan", "mislabeled", "multi-quarter"
+
+
+@dataclass(frozen=True)
+class Finding:
+    """One reconciliation result for a squad.
+
+    kind: orphan | mislabeled | multi-quarter
+    - orphan: labeled `label` in Jira but absent from that quarter's tree.
+    - mislabeled: in the `label` quarter tree without that label, carrying
+      the quarter labels `labels` instead.
+    - multi-quarter: carries several quarter labels (`labels`).
+    """
+
+    kind: str
+    key: str
+    squad: str
+    label: Optional[str] = None
+    labels: Tuple[str, ...] = ()
+
+    def __str__(self) -> str:
+        if self.kind == ORPHAN:
+            return f"orphan {self.key}: {self.label} but not in the {self.squad} tree"
+        if self.kind == MISLABELED:
+            return f"mislabeled {self.key}: in the {self.label} {self.squad} tree, labeled {', '.join(self.labels)}"
+        return f"multi-quarter {self.key}: {', '.join(self.labels)}"
+
+
+class KeyIndex:
+    """Dense numbering of issue keys so that key sets are int bitmaps."""
+
+    def __init__(self) -> None:
+        self._ids: Dict[str, int] = {}
+        self._keys: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def id(self, key: str) -> int:
+        i = self._ids.get(key)
+        if i is None:
+            i = self._ids[key] = len(self._keys)
+            self._keys.append(key)
+        return i
+
+    def bitmap(self, keys: Iterable[str]) -> int:
+        bits = 0
+        for key in keys:
+            bits |= 1 << self.id(key)
+        return bits
+
+    def keys(self, bitmap: int) -> List[str]:
+        """Keys of the set bits, in numbering order."""
+        out = []
+        while bitmap:
+            low = bitmap & -bitmap
+            out.append(self._keys[low.bit_length() - 1])
+            bitmap ^= low
+        return out
+
+
+@dataclass
+class Reconciliation:
+    findings: List[Finding]
+    issues: Dict[str, IssueBase]  # labeled issues returned by the searches, by key
+
+    def of_kind(self, kind: str) -> List[Finding]:
+        return [f for f in self.findings if f.kind == kind]
+
+
+def _open_pci(tree: Tree) -> Dict[str, PCIssue]:
+    # Same population as the label search: open PCI Tasks/Stories/Epics
+    return {n.data.key: n.data for n in tree
+            if isinstance(n.data, PCIssue) and n.data.type in ("Task", "Story", "Epic") and not n.data.is_closed()}
+
+
+def reconcile(trees: Dict[Target, Tree], repo: Repository) -> Reconciliation:
+    """Compare the quarter labels carried in Jira with the built trees.
+
+    Trees are grouped by squad; each squad costs one search covering the four
+    quarters of every target year, so labels of quarters without a tree still
+    reveal mislabeled and multi-quarter issues.
+    """
+    by_squad: Dict[str, Dict[Target, Tree]] = {}
+    for target, tree in trees.items():
+        by_squad.setdefault(target[2], {})[target] = tree
+
+    findings: List[Finding] = []
+    issues: Dict[str, IssueBase] = {}
+    for squad, squad_trees in by_squad.items():
+        labels = [str_lvl3_sprint_label(y, q) for y in sorted({t[0] for t in squad_trees}) for q in QUARTERS]
+        index = KeyIndex()
+        labeled = dict.fromkeys(labels, 0)  # label -> issues labeled in Jira
+        for payload in repo.find_pci_with_labels(labels, squad):
+            dom = to_domain(issue_from_json(payload))
+            issues[dom.key] = dom
+            bit = 1 << index.id(dom.key)
+            for label in labels:
+                if label in dom.labels:
+                    labeled[label] |= bit
+        n_labeled = len(index)
+
+        def carried(key: str, dom: IssueBase) -> Tuple[str, ...]:
+            dom = issues.get(key, dom)
+            return tuple(label for label in labels if label in dom.labels)
+
+        # Tree issues absent from the search keep their snapshot labels
+        snapshot = dict.fromkeys(labels, 0)
+        trees_pci = {target: _open_pci(tree) for target, tree in squad_trees.items()}
+        for pci in trees_pci.values():
+            for key, dom in pci.items():
+                if key not in issues:
+                    bit = 1 << index.id(key)
+                    for label in carried(key, dom):
+                        snapshot[label] |= bit
+
+        seen = multi = 0
+        for label in labels:
+            multi |= seen & labeled[label]
+            seen |= labeled[label]
+        any_label = seen
+        for label in labels:
+            any_label |= snapshot[label]
+
+        for (year, quarter, _), pci in trees_pci.items():
+            label = str_lvl3_sprint_label(year, quarter)
+            in_tree = index.bitmap(pci)
+            for key in sorted(index.keys(labeled[label] & ~in_tree)):
+                findings.append(Finding(ORPHAN, key, squad, label=label))
+            for key in sorted(index.keys(in_tree & any_label & ~(labeled[label] | snapshot[label]))):
+                findings.append(Finding(MISLABELED, key, squad, label=label, labels=carried(key, pci[key])))
+        for key in sorted(index.keys(multi)):
+            findings.append(Finding(MULTI_QUARTER, key, squad, labels=carried(key, issues[key])))
+        logger.info('Reconciled %s: %d labeled issues, %d tree(s), %d finding(s)',
+                    squad, n_labeled, len(squad_trees), sum(f.squad == squad for f in findings))
+    return Reconciliation(findings, issues)
@@ -0,0 +1,64 @@
+"""Bottom-up story point roll-up over the LSD tree.
+
+One post-order traversal computes totals for every PCI Epic and every LVL2
+Feature; services decide what to write back.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Dict
+
+from nutree import IterMethod, Tree
+
+from .models import LVL2Feature, PCIEpic, PCIssue
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RollupRules:
+    """Roll-up configuration.
+
+    - include_closed: count story points of closed children.
+    - nested: an Epic under an Epic contributes its rolled-up total instead of
+      its own story points (default mirrors the historical direct-children sum).
+    """
+
+    include_closed: bool = True
+    nested: bool = False
+
+
+def compute_rollup(tree: Tree, rules: RollupRules | None = None) -> Dict[str, int]:
+    """Return {key: total} for every PCI Epic and LVL2 Feature in the tree.
+
+    - PCI Epic: sum of its children's story points (rolled-up totals for nested
+      Epics when `rules.nested`).
+    - LVL2 Feature: sum of its PCI Epics' totals plus direct Tasks/Stories points.
+    """
+    rules = rules or RollupRules()
+    totals: Dict[str, int] = {}
+    # Contribution of each node to its parent, filled children-first
+    contrib: Dict[int, int] = {}
+    for node in tree.iterator(method=IterMethod.POST_ORDER):
+        d = node.data
+        if isinstance(d, (PCIEpic, LVL2Feature)):
+            total = 0
+            # node.children: direct children only (iterating a node is depth-first)
+            for child in node.children:
+                cd = child.data
+                if not isinstance(cd, PCIssue):
+                    continue
+                if cd.is_closed() and not rules.include_closed:
+                    continue
+                if isinstance(d, LVL2Feature) or (rules.nested and isinstance(cd, PCIEpic)):
+                    total += contrib.get(child.node_id, 0)
+                else:
+                    total += int(cd.story_points or 0)
+            totals[d.key] = total
+            contrib[node.node_id] = total
+        elif isinstance(d, PCIssue):
+            contrib[node.node_id] = int(d.story_points or 0)
+    logger.debug('roll-up computed for %d items', len(totals))
+    return totals
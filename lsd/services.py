@@ -1,5 +1,5 @@
 import logging
-from typing import List
+from typing import Dict, Iterable, List, Optional
 
 from adapter.ports import Repository
 from nutree import Tree
@@ -8,27 +8,45 @@ from .mappers import to_domain
 from .models import PCIssue, PCITaskStory, PCIEpic, IssueBase, LVL2Feature, LVL2Epic
 from .labels import str_lvl3_sprint_label
 from .fields import update_field, read_field
+from .rollup import RollupRules, compute_rollup
+from .index import index_for
+from .tracing import traced
+from .tree_builder import find_nodes
 
 
 logger = logging.getLogger(__name__)
 
+PCI_TYPES = ("Task", "Story", "Epic")
 
-def propagate_sprint(tree: Tree, year: str, quarter: str, repo: Repository) -> None:
+
+@traced("service")
+def propagate_sprint(tree: Tree, year: str, quarter: str, repo: Repository) -> List[str]:
     """Add the FY{year}Q{quarter} label to all non-closed PCI issues in the tree.
 
-    Writes via repository only; does not mutate domain objects in-memory.
+    Issues already carrying the label in the tree snapshot are skipped, the rest
+    is sent in one bulk call. Writes via repository only; does not mutate domain
+    objects in-memory. Returns the keys labeled (failed issues are logged by
+    the repository and left out).
     """
     label = str_lvl3_sprint_label(year, quarter)
     logger.info('Propagate sprint label %s to PCI issues', label)
-    for node in tree:
+    keys: List[str] = []
+    for node in index_for(tree).select(project="PCI", type=PCI_TYPES, open=True):
         data = node.data
-        if isinstance(data, PCIssue) and not data.is_closed() and data.type in ("Task", "Story", "Epic"):
-            try:
-                update_field(repo, data.key, "labels", [label], merge=True)
-            except Exception as e:
-                logger.error('Failed to set label for %s: %s', data.key, e)
+        if label in (data.labels or []):
+            logger.debug('(-) label %s already set for %s', label, data.key)
+            continue
+        keys.append(data.key)
+    if not keys:
+        return []
+    try:
+        return repo.add_labels(keys, label)
+    except Exception as e:
+        logger.error('Failed to set label %s for %s: %s', label, ", ".join(keys), e)
+        return []
 
 
+@traced("service")
 def propagate_priority(tree: Tree, repo: Repository) -> None:
     """Propagate Epic priority to related Tasks/Stories.
 
@@ -37,7 +55,8 @@ def propagate_priority(tree: Tree, repo: Repository) -> None:
       (siblings of the Epic under the feature) are also updated.
     """
     logger.info('Propagate priority from Epics to Tasks/Stories')
-    for node in tree:
+    index = index_for(tree)
+    for node in index.select(project=("PCI", "LVL2"), type=("Epic", "New Feature")):
         data = node.data
 
         # Case 1: direct children of Epics
@@ -77,38 +96,54 @@ def propagate_priority(tree: Tree, repo: Repository) -> None:
                                 logger.error('Failed to set priority for %s: %s', cd.key, e)
 
 
-def find_orphans(tree: Tree, year: str, quarter: str, squad: str, repo: Repository) -> List[IssueBase]:
+@traced("service")
+def find_orphans(
+    tree: Tree,
+    year: str,
+    quarter: str,
+    squad: str,
+    repo: Repository,
+    on_orphan=None,
+    candidates: Optional[Iterable[IssueBase]] = None,
+) -> List[IssueBase]:
     """Return PCI issues labeled for the quarter but not present in LSD tree.
 
-    Also logs each orphan for visibility.
+    Also logs each orphan for visibility; `on_orphan(issue)` is called for each
+    orphan as soon as it is found. With `candidates` (already fetched domain
+    issues, e.g. recently updated ones), only those are checked: no search and
+    no per-issue fetch.
     """
     label = str_lvl3_sprint_label(year, quarter)
-    in_tree = set()
-    for node in tree:
-        d = node.data
-        if isinstance(d, PCIssue) and d.type in ("Task", "Story", "Epic"):
-            in_tree.add(d.key)
+    if candidates is None:
+        in_tree = set(index_for(tree).keys(project="PCI", type=PCI_TYPES))
+        pool = (to_domain(repo.get_issue(key))
+                for key in repo.find_pci_keys_with_label_and_squad(label, squad)
+                if key not in in_tree)
+    else:
+        # Same criteria as the label search, evaluated locally
+        pool = (d for d in candidates
+                if isinstance(d, PCIssue) and d.type in PCI_TYPES
+                and label in d.labels and squad in d.components and not d.is_closed()
+                and not find_nodes(tree, d.key))
 
     orphans: List[IssueBase] = []
-    for key in repo.find_pci_keys_with_label_and_squad(label, squad):
-        if key not in in_tree:
-            raw = repo.get_issue(key)
-            dom = to_domain(raw)
-            orphans.append(dom)
-            logger.warning('(-) orphan %s found: %s', label, str(dom))
+    for dom in pool:
+        orphans.append(dom)
+        logger.warning('(-) orphan %s found: %s', label, str(dom))
+        if on_orphan is not None:
+            on_orphan(dom)
     return orphans
 
 
+@traced("service")
 def aggregate_points(tree: Tree, epic_key: str, repo: Repository) -> int:
     """Sum story points of an Epic's direct children and update the Epic.
 
     Returns the computed total. Raises KeyError if the epic is not in the tree.
     """
-    target: PCIEpic | None = None
-    for node in tree:
+    for node in find_nodes(tree, epic_key):
         d = node.data
-        if isinstance(d, PCIEpic) and d.key == epic_key:
-            target = d
+        if isinstance(d, PCIEpic):
             # Compute only direct children as in current logic
             total = 0
             for child in node:
@@ -124,17 +159,57 @@ def aggregate_points(tree: Tree, epic_key: str, repo: Repository) -> int:
     raise KeyError(f'Epic {epic_key} not found in tree')
 
 
+@traced("service")
+def aggregate_all_points(
+    tree: Tree,
+    repo: Repository,
+    epic_keys: Optional[Iterable[str]] = None,
+    rules: Optional[RollupRules] = None,
+) -> Dict[str, int]:
+    """Roll up story points for all PCI Epics and LVL2 Features in one pass.
+
+    Epic totals are written back only when they differ from the tree snapshot;
+    `epic_keys` restricts writes to the given Epics (default: all). LVL2 Feature
+    totals are computed and logged but not written.
+    Returns the computed totals by key. Raises KeyError if a requested epic is
+    not in the tree.
+    """
+    totals = compute_rollup(tree, rules)
+    index = index_for(tree)
+    epics: Dict[str, PCIEpic] = {}
+    for node in index.select(project="PCI", type="Epic"):
+        epics.setdefault(node.data.key, node.data)
+    if epic_keys is None:
+        targets = list(epics)
+    else:
+        targets = list(dict.fromkeys(epic_keys))
+        missing = [k for k in targets if k not in epics]
+        if missing:
+            raise KeyError(f'Epic(s) {", ".join(missing)} not found in tree')
+
+    for key in targets:
+        total = totals[key]
+        if int(epics[key].story_points or 0) == total:
+            logger.debug('(-) unchanged story points=%s for %s', total, key)
+            continue
+        try:
+            update_field(repo, key, "story_points", total)
+            logger.info('(i) story points=%s for %s', total, key)
+        except Exception as e:
+            logger.error('Failed to set story points for %s: %s', key, e)
+    for node in index.select(project="LVL2", type="New Feature"):
+        d = node.data
+        logger.info('(i) story points=%s for feature %s', totals[d.key], d.key)
+    return totals
+
+
+@traced("service")
 def update_lvl2_pu(tree: Tree, feature_key: str, value: str, repo: Repository) -> None:
     """Update the LVL2 Feature 'pu' field (customfield_16708) using the field abstraction.
 
     If the feature is present in the tree, logs its presence; otherwise still performs the update.
     """
-    found = False
-    for node in tree:
-        d = node.data
-        if isinstance(d, LVL2Feature) and d.key == feature_key:
-            found = True
-            break
+    found = any(isinstance(n.data, LVL2Feature) for n in find_nodes(tree, feature_key))
     try:
         update_field(repo, feature_key, "pu", value)
         if found:
@@ -145,17 +220,13 @@ def update_lvl2_pu(tree: Tree, feature_key: str, value: str, repo: Repository) -
         logger.error("Failed to update 'pu' for %s: %s", feature_key, e)
 
 
+@traced("service")
 def update_lvl2_blfnt(tree: Tree, epic_key: str, value: str, repo: Repository) -> None:
     """Update the LVL2 Epic 'blfnt' field (customfield_10530) using the field abstraction.
 
     If the epic is present in the tree, logs its presence; otherwise still performs the update.
     """
-    found = False
-    for node in tree:
-        d = node.data
-        if isinstance(d, LVL2Epic) and d.key == epic_key:
-            found = True
-            break
+    found = any(isinstance(n.data, LVL2Epic) for n in find_nodes(tree, epic_key))
     try:
         update_field(repo, epic_key, "blfnt", value)
         if found:
@@ -0,0 +1,76 @@
+"""Save and load LSD trees as JSON snapshots (optionally gzip-compressed).
+
+Format: {"version": 1, "meta": {...}, "hash_version": N,
+"nodes": [[class, fields, parent_index, subtree_hash], ...]} with nodes in
+depth-first pre-order (parent_index -1 for top-level items). Subtree hashes
+(lsd.hashing) are restored on load so that diffing against a snapshot only
+hashes the new tree; snapshots without them (or of another hash version)
+are hashed on demand. Reading and writing are iterative, so deep trees are fine.
+"""
+from __future__ import annotations
+
+import dataclasses
+import gzip
+import json
+import logging
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from nutree import Tree
+
+from .hashing import HASH_META_KEY, HASH_VERSION, annotate_hashes
+from .models import IssueBase, LVL2Epic, LVL2Feature, PCIEpic, PCIssue, PCITaskStory
+
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+_MODEL_CLASSES = {cls.__name__: cls for cls in (IssueBase, LVL2Epic, LVL2Feature, PCIssue, PCIEpic, PCITaskStory)}
+
+
+def _open(path: str, mode: str):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def save_tree(tree: Tree, path: str, meta: Optional[Dict[str, Any]] = None) -> int:
+    """Write `tree` to `path` (.gz suffix compresses). Returns the node count."""
+    annotate_hashes(tree)
+    rows = []
+    row_of: Dict[int, int] = {}
+    for node in tree:
+        parent = node.parent
+        row_of[node.node_id] = len(rows)
+        d = node.data
+        fields = dataclasses.asdict(d) if dataclasses.is_dataclass(d) else {'key': getattr(d, 'key', str(d))}
+        rows.append([type(d).__name__, fields, row_of[parent.node_id] if parent is not None else -1,
+                     node.get_meta(HASH_META_KEY)])
+    parent_dir = os.path.dirname(path)
+    if parent_dir:
+        os.makedirs(parent_dir, exist_ok=True)
+    with _open(path, 'w') as fh:
+        json.dump({'version': SNAPSHOT_VERSION, 'meta': meta or {}, 'hash_version': HASH_VERSION, 'nodes': rows}, fh)
+    logger.info('Saved snapshot of %d nodes to %s', len(rows), path)
+    return len(rows)
+
+
+def load_tree(path: str) -> Tuple[Tree, Dict[str, Any]]:
+    """Read a snapshot written by save_tree; returns (tree, meta)."""
+    with _open(path, 'r') as fh:
+        doc = json.load(fh)
+    if doc.get('version') != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {doc.get('version')}")
+    tree = Tree('LVL2')
+    keep_hashes = doc.get('hash_version') == HASH_VERSION
+    nodes = []
+    for cls_name, fields, parent, *rest in doc['nodes']:
+        cls = _MODEL_CLASSES.get(cls_name, IssueBase)
+        known = {f.name for f in dataclasses.fields(cls)}
+        data = cls(**{k: v for k, v in fields.items() if k in known})
+        node = (nodes[parent] if parent >= 0 else tree).add(data)
+        if keep_hashes and rest and rest[0]:
+            node.set_meta(HASH_META_KEY, rest[0])
+        nodes.append(node)
+    return tree, doc.get('meta') or {}
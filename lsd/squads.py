@@ -0,0 +1,79 @@
+"""Squad filter registry.
+
+Each squad is described by data only: the PCI component it owns, extra PCI
+labels accepted under LVL2 Features, and the LVL2 fields ("OVH Product",
+"Contributor(s) Squad(s) (Manual)") selecting its Features. The Jira adapter
+builds its JQL from these specs and the tree builder applies the same rules
+locally, so squads can be added without code changes (see load_squads).
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .models import PCIssue
+
+
+@dataclass(frozen=True)
+class SquadSpec:
+    name: str
+    component: str  # PCI component owned by the squad
+    pci_labels: Tuple[str, ...] = ()  # PCI labels also accepted under LVL2 Features
+    lvl2_products: Tuple[str, ...] = ()  # LVL2 "OVH Product" values
+    lvl2_contributor: Optional[str] = None  # LVL2 "Contributor(s) Squad(s) (Manual)" value
+
+    def owns(self, issue: PCIssue) -> bool:
+        """PCI issue carries the squad component (Epic Link children, Epics)."""
+        return self.component in (issue.components or [])
+
+    def accepts_feature_child(self, issue: PCIssue) -> bool:
+        """PCI issue belongs to the squad under an LVL2 Feature (Parent Link children)."""
+        return self.owns(issue) or any(label in (issue.labels or []) for label in self.pci_labels)
+
+
+SQUAD_REGISTRY: Dict[str, SquadSpec] = {
+    "Network": SquadSpec(
+        name="Network",
+        component="Network",
+        pci_labels=("Openstack_Networking",),
+        lvl2_products=(
+            "Public cloud Network - Floating IP (Neutron)",
+            "Public cloud Network - Load Balancer (Octavia)",
+            "Public cloud Network - Public & Private Network (Neutron)",
+            "Public cloud Network - Public Gateway (Neutron)",
+        ),
+        lvl2_contributor="PU.pCI/Network",
+    ),
+}
+
+
+def get_squad(name: str) -> Optional[SquadSpec]:
+    """Registered spec for `name`, or None (no squad-specific filtering)."""
+    return SQUAD_REGISTRY.get(name)
+
+
+def squad_names() -> List[str]:
+    return sorted(SQUAD_REGISTRY)
+
+
+def register_squad(spec: SquadSpec) -> None:
+    SQUAD_REGISTRY[spec.name] = spec
+
+
+def load_squads(path: str) -> List[str]:
+    """Register squads from a JSON list of SquadSpec fields; returns their names."""
+    with open(path, encoding="utf-8") as fh:
+        entries = json.load(fh)
+    names = []
+    for entry in entries:
+        spec = SquadSpec(
+            name=entry["name"],
+            component=entry.get("component", entry["name"]),
+            pci_labels=tuple(entry.get("pci_labels") or ()),
+            lvl2_products=tuple(entry.get("lvl2_products") or ()),
+            lvl2_contributor=entry.get("lvl2_contributor"),
+        )
+        register_squad(spec)
+        names.append(spec.name)
+    return names
@@ -0,0 +1,129 @@
+"""Lightweight spans written as a Chrome trace-event file (Perfetto, chrome://tracing).
+
+    start_tracing()
+    with span("build", cat="tree", squad=squad) as s:
+        ...
+        s.set(nodes=len(tree))
+    stop_tracing("./out/trace.json")
+
+Spans are recorded as complete ("X") events carrying their attributes as
+`args`, one track per thread, so pool fetches show up side by side. When
+tracing is off `span()` returns a shared no-op, cheap enough for hot paths.
+"""
+from __future__ import annotations
+
+import functools
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class Tracer:
+    """Collects finished spans as trace events (list appends are thread-safe)."""
+
+    def __init__(self) -> None:
+        self.pid = os.getpid()
+        self.events: List[Dict[str, Any]] = []
+        self._t0 = time.perf_counter_ns()
+        self._threads: Dict[int, str] = {}
+
+    def now_us(self) -> float:
+        return (time.perf_counter_ns() - self._t0) / 1000
+
+    def add(self, name: str, cat: str, start_us: float, end_us: float, args: Dict[str, Any]) -> None:
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        self.events.append({"name": name, "cat": cat, "ph": "X", "ts": start_us, "dur": end_us - start_us,
+                            "pid": self.pid, "tid": tid, "args": args})
+
+    def write(self, path: str) -> int:
+        """Write the trace file; returns the number of spans."""
+        meta = [{"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}}
+                for tid, name in list(self._threads.items())]
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": meta + self.events, "displayTimeUnit": "ms"}, f, default=str)
+        return len(self.events)
+
+
+class Span:
+    __slots__ = ("_tracer", "name", "cat", "args", "_start")
+
+    def __init__(self, tracer: Tracer, name: str, cat: str, args: Dict[str, Any]) -> None:
+        self._tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def set(self, **attrs: Any) -> None:
+        """Add attributes known once the work is done (result counts...)."""
+        self.args.update(attrs)
+
+    def __enter__(self) -> "Span":
+        self._start = self._tracer.now_us()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self._tracer.add(self.name, self.cat, self._start, self._tracer.now_us(), self.args)
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_NO_SPAN = _NoSpan()
+_tracer: Optional[Tracer] = None
+
+
+def span(name: str, cat: str = "lsd", **attrs: Any):
+    """Context manager timing the enclosed block as one span (no-op when tracing is off)."""
+    tracer = _tracer
+    if tracer is None:
+        return _NO_SPAN
+    return Span(tracer, name, cat, attrs)
+
+
+def traced(cat: str = "lsd") -> Callable[[Callable], Callable]:
+    """Decorator: one span per call, named after the function."""
+    def decorate(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return fn(*args, **kwargs)
+            with span(fn.__name__, cat):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def start_tracing() -> Tracer:
+    """Start recording spans (idempotent) and return the tracer."""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+    return _tracer
+
+
+def stop_tracing(path: Optional[str] = None) -> int:
+    """Stop recording; write the trace to `path` when given. Returns the number of spans."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is None:
+        return 0
+    return tracer.write(path) if path else len(tracer.events)
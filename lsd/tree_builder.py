@@ -1,11 +1,18 @@
 import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 from nutree import Tree
 
-from adapter.ports import Repository
+from adapter.ports import Repository, find_children_batch
+from .index import index_for
 from .mappers import to_domain
 from .models import PCIEpic, PCIssue
+from .fields import FIELD_REGISTRY, set_field_ids
 from .labels import str_lvl2_sprint_label
+from .logging_utils import use_direct_handlers
+from .squads import SQUAD_REGISTRY, get_squad, register_squad
+from .tracing import span
 
 
 logger = logging.getLogger(__name__)
@@ -15,51 +22,327 @@ def _child_keys_for(issue, repo: Repository, squad: str):
     """Return next-level child keys for the given domain issue.
 
     Mirrors the current behavior:
-    - LVL2 New Feature -> PCI children by Parent Link (Epic/Story/Task filtered to Network)
-    - PCI Epic -> Stories/Tasks by Epic Link (filtered to Network)
+    - LVL2 New Feature -> PCI children by Parent Link (Epic/Story/Task filtered to the squad)
+    - PCI Epic -> Stories/Tasks by Epic Link (filtered to the squad component)
     - Others -> no children
+    `squad=None` returns the children of all squads.
     """
     if issue.project == 'LVL2' and issue.type == 'New Feature':
-        return repo.find_pci_children_by_parent_link(issue.key)
+        return repo.find_pci_children_by_parent_link(issue.key, squad)
     if issue.project == 'PCI' and issue.type == 'Epic':
         return repo.find_children_by_epic_link(issue.key, squad)
     return []
 
 
-def _recurse_add(repo: Repository, ancestor, key: str, squad: str, skip_closed: bool):
+def child_keys_batch(issues: List, repo: Repository, squad: Optional[str]) -> Dict[str, List[str]]:
+    """`_child_keys_for` over many issues, using the batched repository searches
+    (one merged JQL per chunk of parents) when the repository provides them."""
+    features = [i.key for i in issues if i.project == 'LVL2' and i.type == 'New Feature']
+    epics = [i.key for i in issues if i.project == 'PCI' and i.type == 'Epic']
+    out: Dict[str, List[str]] = {i.key: [] for i in issues}
+    for keys, batch, single in (
+        (features, 'find_pci_children_by_parent_links', 'find_pci_children_by_parent_link'),
+        (epics, 'find_children_by_epic_links', 'find_children_by_epic_link'),
+    ):
+        if keys:
+            out.update(find_children_batch(repo, batch, single, keys, squad))
+    return out
+
+
+def _load(repo: Repository, key: str, squad: str, skip_closed: bool):
+    """Fetch and map one issue; return None when filtered out."""
     # Load raw issue and map to domain
     raw = repo.get_issue(key)
     dom = to_domain(raw)
 
-    # Filter: for Network squad, drop PCI Epics not in Network
-    if isinstance(dom, PCIEpic) and squad == 'Network' and not dom.is_network():
-        logger.debug('skip non-network Epic %s', dom.key)
-        return
+    return dom if passes_filters(dom, squad, skip_closed) else None
+
+
+def passes_filters(dom, squad: str, skip_closed: bool) -> bool:
+    """Post-fetch filters applied to every issue before it is attached."""
+    # Filter: drop PCI Epics not carrying the squad component (lsd.squads)
+    spec = get_squad(squad)
+    if isinstance(dom, PCIEpic) and spec is not None and not spec.owns(dom):
+        logger.debug('skip Epic %s outside squad %s', dom.key, squad)
+        return False
 
     # Filter: optionally skip closed PCI issues
     if isinstance(dom, PCIssue) and skip_closed and dom.is_closed():
         logger.debug('skip closed PCI issue %s', dom.key)
-        return
+        return False
+    return True
+
 
+def _recurse_add(repo: Repository, ancestor, key: str, squad: str, skip_closed: bool, on_node=None):
+    with span("expand", "tree", key=key) as s:
+        dom = _load(repo, key, squad, skip_closed)
+        if dom is None:
+            return None
+        node = ancestor.add(dom)
+        if on_node is not None:
+            on_node(node)
+        child_keys = _child_keys_for(dom, repo, squad)
+        s.set(children=len(child_keys))
+        for child_key in child_keys:
+            _recurse_add(repo, node, child_key, squad, skip_closed, on_node)
+        return node
+
+
+def _attach_key(ancestor, parent, key: str, squad: str, skip_closed: bool,
+                issues: Dict[str, object], children: Dict[str, List[str]], on_node=None):
+    """Attach `key` and its descendants from the maps filled by _expand
+    (`parent`: domain object of `ancestor`, None at the top level)."""
+    dom = issues[key]
+    if not accepts_child(parent, dom, squad, skip_closed):
+        return None
     node = ancestor.add(dom)
-    for child_key in _child_keys_for(dom, repo, squad):
-        _recurse_add(repo, node, child_key, squad, skip_closed)
+    if on_node is not None:
+        on_node(node)
+    for kid in children.get(key, ()):
+        _attach_key(node, dom, kid, squad, skip_closed, issues, children, on_node)
+    return node
+
+
+# Roots expanded together: children of a whole window are found with one
+# merged search per level (child_keys_batch)
+ROOT_WINDOW = 16
+
 
+def _root_windows(keys: List[str], progressive: bool) -> Iterable[List[str]]:
+    """Windows of ROOT_WINDOW roots; with a progressive consumer the first
+    root is expanded alone, so that its subtree is shown after one round trip
+    per level."""
+    start = 1 if progressive and keys else 0
+    if start:
+        yield keys[:1]
+    for i in range(start, len(keys), ROOT_WINDOW):
+        yield keys[i:i + ROOT_WINDOW]
 
-def build_lsd_tree(repo: Repository, year: str, quarter: str, squad: str, skip_closed: bool) -> Tree:
+
+def build_lsd_tree(
+    repo: Repository,
+    year: str,
+    quarter: str,
+    squad: str,
+    skip_closed: bool,
+    on_node=None,
+    on_root=None,
+    max_workers: int = 1,
+    processes: int = 1,
+    repo_factory: Optional[Callable[[], Repository]] = None,
+) -> Tree:
     """Build and return the LSD tree using the repository (no direct Jira calls).
 
     Root items are LVL2 New Features in the sprint SD-FY{year}-Q{quarter},
     filtered for the given squad when applicable.
+    - `on_node(node)` is called for each node as soon as it is attached.
+    - `on_root(node, is_last)` is called once a root subtree is complete, always
+      in root search order (priority DESC).
+    - Roots are expanded level by level in windows of ROOT_WINDOW (see
+      _expand): one merged child search per level and window instead of one
+      per parent; subtrees are attached, and `on_root` called, window by
+      window. With `on_node`/`on_root`, the first root is expanded alone.
+    - `max_workers > 1` fetches the issues of each level concurrently.
+    - `processes > 1` shards the roots across worker processes, each with its
+      own repository from `repo_factory` (picklable, see _init_shard_worker)
+      and `max_workers` threads; workers return the mapped issues and child
+      keys of their shard, attached in root order.
     """
     sprint = str_lvl2_sprint_label(year, quarter)
     logger.info('Build LSD tree for sprint %s (squad=%s, skip_closed=%s)', sprint, squad, skip_closed)
     tree = Tree('LVL2')
-    for key in repo.find_lvl2_new_features(sprint, squad):
-        _recurse_add(repo, tree, key, squad, skip_closed)
+    with span("build_lsd_tree", "tree", sprint=sprint, squad=squad) as s:
+        keys = repo.find_lvl2_new_features(sprint, squad)
+        issues: Dict[str, object] = {}
+        children: Dict[str, List[str]] = {}
+        attached = 0
+
+        def attach(window: List[str]) -> None:
+            nonlocal attached
+            for key in window:
+                node = _attach_key(tree, None, key, squad, skip_closed, issues, children, on_node)
+                if node is not None and on_root is not None:
+                    on_root(node, attached == len(keys) - 1)
+                attached += 1
+
+        if processes > 1 and len(keys) > 1:
+            with _shard_pool(repo_factory, processes) as procs:
+                shards = _shards(keys, processes)
+                futures = [procs.submit(_expand_shard, {k: {squad} for k in shard}, skip_closed, squad, max_workers)
+                           for shard in shards]
+                for shard, fut in zip(shards, futures):
+                    shard_issues, shard_children = fut.result()
+                    issues.update(shard_issues)
+                    children.update(shard_children)
+                    attach(shard)
+        else:
+            pool = ThreadPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+            try:
+                for window in _root_windows(keys, on_node is not None or on_root is not None):
+                    _expand(repo, {k: {squad} for k in window}, skip_closed, squad,
+                            pool.map if pool is not None else map, issues, children)
+                    attach(window)
+            finally:
+                if pool is not None:
+                    pool.shutdown()
+        # Inverted indexes for services and queries (kept current by lsd.ingest)
+        index_for(tree)
+        s.set(roots=len(keys), nodes=len(tree))
     return tree
 
 
+Target = Tuple[str, str, str]  # (year, quarter, squad)
+
+
+def accepts_child(parent, dom, squad: str, skip_closed: bool) -> bool:
+    """Local equivalent of the squad-filtered child searches (`parent` is the
+    parent domain object, None for roots), plus passes_filters."""
+    spec = get_squad(squad)
+    if spec is not None and isinstance(dom, PCIssue) and parent is not None:
+        if parent.project == 'LVL2' and not spec.accepts_feature_child(dom):
+            return False
+        if isinstance(parent, PCIEpic) and not spec.owns(dom):
+            return False
+    return passes_filters(dom, squad, skip_closed)
+
+
+def _expand(repo: Repository, reach: Dict[str, Set[str]], skip_closed: bool, scope: Optional[str],
+            run, issues: Dict[str, object], children: Dict[str, List[str]]) -> None:
+    """Level-by-level expansion from the roots in `reach` (key -> squads),
+    filling `issues` (key -> domain) and `children` (key -> child keys)."""
+    frontier = list(reach)
+    depth = 0
+    while frontier:
+        with span("level", "tree", depth=depth, frontier=len(frontier)) as s:
+            todo = [k for k in frontier if k not in issues]
+            for key, dom in zip(todo, run(lambda k: to_domain(repo.get_issue(k)), todo)):
+                issues[key] = dom
+            kept = {k: {sq for sq in reach[k] if passes_filters(issues[k], sq, skip_closed)} for k in frontier}
+            expand = [k for k in frontier if kept[k] and k not in children]
+            children.update(child_keys_batch([issues[k] for k in expand], repo, scope))
+            s.set(fetched=len(todo), expanded=len(expand))
+        # Propagate squads to children; a squad reaching a key again adds no work
+        next_frontier = []
+        for key in frontier:
+            for kid in children.get(key, ()):
+                new = kept[key] - reach.setdefault(kid, set())
+                if new:
+                    reach[kid] |= new
+                    next_frontier.append(kid)
+        frontier = list(dict.fromkeys(next_frontier))
+        depth += 1
+
+
+def build_lsd_trees(
+    repo: Repository,
+    targets: Iterable[Target],
+    skip_closed: bool,
+    max_workers: int = 1,
+    processes: int = 1,
+    repo_factory: Optional[Callable[[], Repository]] = None,
+) -> Dict[Target, Tree]:
+    """Build one LSD tree per (year, quarter, squad) target with shared fetches.
+
+    Root searches run once per distinct target; child searches run once per
+    parent (merged per level, see child_keys_batch) for all squads (squad-agnostic, filtered locally with the same
+    rules as build_lsd_tree) and each issue is fetched and mapped once. Trees
+    share the domain objects of issues they have in common.
+    `max_workers > 1` runs the issue fetches of each level concurrently.
+    `processes > 1` shards the distinct roots across worker processes (see
+    build_lsd_tree); each expands its roots and returns the mapped issues and
+    child keys, merged before the trees are attached. Issues below roots of
+    different shards may be fetched once per shard.
+    """
+    targets = list(dict.fromkeys(targets))
+    squads = {t[2] for t in targets}
+    # One squad: let Jira filter the children as a single build would
+    scope: Optional[str] = next(iter(squads)) if len(squads) == 1 else None
+    logger.info('Build %d LSD trees (skip_closed=%s): %s', len(targets), skip_closed, targets)
+
+    pool = ThreadPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+    run = pool.map if pool is not None else map
+    issues: Dict[str, object] = {}
+    children: Dict[str, List[str]] = {}
+    try:
+        roots = dict(zip(targets, run(
+            lambda t: repo.find_lvl2_new_features(str_lvl2_sprint_label(t[0], t[1]), t[2]), targets)))
+        # Squads reaching each key: only issues kept by some target are expanded
+        reach: Dict[str, Set[str]] = {}
+        for (_, _, squad), keys in roots.items():
+            for key in keys:
+                reach.setdefault(key, set()).add(squad)
+        if processes > 1 and len(reach) > 1:
+            with _shard_pool(repo_factory, processes) as procs:
+                futures = [procs.submit(_expand_shard, {k: reach[k] for k in shard}, skip_closed, scope, max_workers)
+                           for shard in _shards(list(reach), processes)]
+                for fut in futures:
+                    shard_issues, shard_children = fut.result()
+                    issues.update(shard_issues)
+                    children.update(shard_children)
+        else:
+            _expand(repo, reach, skip_closed, scope, run, issues, children)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    trees: Dict[Target, Tree] = {}
+    for target in targets:
+        tree = Tree('LVL2')
+        for key in roots[target]:
+            _attach_key(tree, None, key, target[2], skip_closed, issues, children)
+        index_for(tree)
+        trees[target] = tree
+    logger.info('Shared build: %d issues fetched, %d parents expanded for %d trees',
+                len(issues), len(children), len(trees))
+    return trees
+
+
+# -----------------
+# Process-pool sharding
+# -----------------
+SHARDS_PER_PROCESS = 4  # smaller shards balance the load and stream earlier
+_shard_repo: Optional[Repository] = None
+
+
+def _init_shard_worker(repo_factory: Callable[[], Repository], squads, field_ids: Dict[str, str]) -> None:
+    """Worker process setup: logging without the parent's queue listener,
+    squads registered in the parent (--squads-file), field ids resolved in the
+    parent (not inherited under spawn/forkserver) and a repository of its own
+    (own HTTP connection pool)."""
+    global _shard_repo
+    use_direct_handlers()
+    for spec in squads:
+        register_squad(spec)
+    set_field_ids(field_ids)
+    _shard_repo = repo_factory()
+
+
+def _shard_pool(repo_factory: Optional[Callable[[], Repository]], processes: int) -> ProcessPoolExecutor:
+    if repo_factory is None:
+        raise ValueError("processes > 1 needs a picklable repo_factory")
+    return ProcessPoolExecutor(max_workers=processes, initializer=_init_shard_worker,
+                               initargs=(repo_factory, tuple(SQUAD_REGISTRY.values()),
+                                         {name: spec.jira_id for name, spec in FIELD_REGISTRY.items()}))
+
+
+def _shards(keys: List[str], processes: int) -> List[List[str]]:
+    """Consecutive runs of `keys`, so that results merge back in key order."""
+    size = max(1, -(-len(keys) // (processes * SHARDS_PER_PROCESS)))
+    return [keys[i:i + size] for i in range(0, len(keys), size)]
+
+
+def _expand_shard(reach: Dict[str, Set[str]], skip_closed: bool, scope: Optional[str], max_workers: int):
+    """Worker: (issues, children) of the subtrees below the roots in `reach`."""
+    issues: Dict[str, object] = {}
+    children: Dict[str, List[str]] = {}
+    if max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            _expand(_shard_repo, reach, skip_closed, scope, pool.map, issues, children)
+    else:
+        _expand(_shard_repo, reach, skip_closed, scope, map, issues, children)
+    return issues, children
+
+
 def iter_lvl2_keys(tree: Tree):
     """Iterate over keys of LVL2 items present in the tree.
 
@@ -67,10 +350,8 @@ def iter_lvl2_keys(tree: Tree):
         for key in iter_lvl2_keys(tree):
             ...
     """
-    for node in tree:
-        data = getattr(node, 'data', None)
-        if getattr(data, 'project', None) == 'LVL2':
-            yield getattr(data, 'key', '')
+    for node in index_for(tree).select(project='LVL2'):
+        yield node.data.key
 
 
 def iter_pci_epic_keys(tree: Tree):
@@ -80,7 +361,16 @@ def iter_pci_epic_keys(tree: Tree):
         for key in iter_pci_epic_keys(tree):
             ...
     """
-    for node in tree:
-        data = getattr(node, 'data', None)
-        if isinstance(data, PCIEpic):
-            yield getattr(data, 'key', '')
+    for node in index_for(tree).select(project='PCI', type='Epic'):
+        yield node.data.key
+
+
+def add_subtree(repo: Repository, parent, key: str, squad: str, skip_closed: bool, on_node=None):
+    """Fetch `key` and its descendants and attach them under `parent` (same filters as a build)."""
+    return _recurse_add(repo, parent, key, squad, skip_closed, on_node)
+
+
+def find_nodes(tree: Tree, key: str):
+    """Return all nodes carrying issue `key` (an issue may appear under several parents)."""
+    # Domain objects hash by key, which nutree uses as data_id
+    return [n for n in tree.find_all(data_id=hash(key)) if getattr(n.data, 'key', None) == key]
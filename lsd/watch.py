@@ -0,0 +1,128 @@
+"""Keep a built LSD tree current by polling recently updated issues.
+
+Each poll runs one cheap `updated >= -Nm` search (Repository.find_updated_since),
+applies the returned issues to the in-memory tree through the webhook ingestor
+and reports only what changed, as lsd.diff.Change records. The LVL2 root
+search is re-run too, so Features joining or leaving the sprint are added or
+removed: give the watcher a repository without search cache
+(JiraRepository.without_search_cache). Orphan detection is incremental:
+only the polled issues are checked for the quarter label.
+"""
+from __future__ import annotations
+
+import copy
+import logging
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from nutree import Tree
+
+from adapter.ports import Repository
+from . import services
+from .diff import Change, field_changes, parent_key
+from .ingest import TreeIngestor, event_from_issue
+from .labels import str_lvl2_sprint_label
+from .mappers import issue_from_json, to_domain
+from .models import IssueBase
+from .tree_builder import find_nodes
+
+
+logger = logging.getLogger(__name__)
+
+# `updated` has minute resolution: always look back one extra minute
+OVERLAP_MINUTES = 1
+
+
+class TreeWatcher:
+    """Incrementally re-sync `tree` (built for year/quarter/squad) with Jira."""
+
+    def __init__(self, tree: Tree, repo: Repository, year: str, quarter: str, squad: str,
+                 skip_closed: bool = False, link_field_ids: Optional[List[str]] = None,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.tree = tree
+        self._repo = repo
+        self._year = year
+        self._quarter = quarter
+        self._squad = squad
+        self._ingestor = TreeIngestor(tree, squad, skip_closed, repo=repo, link_field_ids=link_field_ids)
+        self._clock = clock
+        self._last = clock()
+        self._orphans: set[str] = set()
+
+    def _state(self, key: str) -> Optional[Tuple[IssueBase, Optional[str]]]:
+        nodes = find_nodes(self.tree, key)
+        return (copy.copy(nodes[0].data), parent_key(nodes[0])) if nodes else None
+
+    def _changes(self, key: str, before, after) -> List[Change]:
+        if before is None and after is None:
+            return []
+        if before is None:
+            # Newly attached: report the node and whatever subtree came with it
+            node = find_nodes(self.tree, key)[0]
+            return [Change("added", n.data.key, parent=parent_key(n))
+                    for n in node.iterator(add_self=True)]
+        if after is None:
+            return [Change("removed", key, parent=before[1])]
+        out = []
+        if before[1] != after[1]:
+            out.append(Change("moved", key, old=before[1], new=after[1]))
+        out.extend(field_changes(before[0], after[0]))
+        return out
+
+    def _sync_roots(self) -> List[Change]:
+        keys = self._repo.find_lvl2_new_features(str_lvl2_sprint_label(self._year, self._quarter), self._squad)
+        added, removed = self._ingestor.sync_roots(keys)
+        changes = [Change("removed", key) for key in removed]
+        for node in added:
+            changes.extend(Change("added", n.data.key, parent=parent_key(n)) for n in node.iterator(add_self=True))
+        return changes
+
+    def poll(self) -> Tuple[List[Change], List[IssueBase]]:
+        """Fetch and apply updates since the last poll; returns (changes, new orphans)."""
+        now = self._clock()
+        minutes = max(1, math.ceil((now - self._last) / 60)) + OVERLAP_MINUTES
+        payloads = self._repo.find_updated_since(minutes, self._squad)
+        self._last = now
+
+        changes: List[Change] = []
+        polled: Dict[str, IssueBase] = {}
+        for payload in payloads:
+            key = payload.get("key")
+            if not key:
+                continue
+            before = self._state(key)
+            self._ingestor.apply(event_from_issue(payload))
+            changes.extend(self._changes(key, before, self._state(key)))
+            polled[key] = to_domain(issue_from_json(payload))
+        changes.extend(self._sync_roots())
+
+        # Orphans are reported once; attached ones may become orphans again later
+        self._orphans -= {c.key for c in changes if c.kind == "added"}
+        fresh = [d for k, d in polled.items() if k not in self._orphans]
+        orphans = services.find_orphans(self.tree, self._year, self._quarter, self._squad,
+                                        self._repo, candidates=fresh)
+        self._orphans.update(o.key for o in orphans)
+        logger.info('watch: %d updated issue(s), %d change(s), %d new orphan(s)',
+                    len(polled), len(changes), len(orphans))
+        return changes, orphans
+
+    def run(self, interval: float, on_change: Optional[Callable[[Change], None]] = None,
+            on_orphan: Optional[Callable[[IssueBase], None]] = None,
+            stop: Optional[threading.Event] = None) -> None:
+        """Poll every `interval` seconds until `stop` is set (or KeyboardInterrupt)."""
+        stop = stop or threading.Event()
+        while not stop.wait(interval):
+            try:
+                changes, orphans = self.poll()
+            except Exception as e:
+                # Transient Jira/network errors: keep watching, retry next tick
+                logger.error('watch: poll failed: %s', e)
+                continue
+            for change in changes:
+                if on_change is not None:
+                    on_change(change)
+            for orphan in orphans:
+                if on_orphan is not None:
+                    on_orphan(orphan)
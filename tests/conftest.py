@@ -58,6 +58,7 @@ class FakeRepo:
     def __init__(self):
         self.state: dict[str, dict[str, object]] = {}
         self.updates: list[tuple[str, dict[str, object]]] = []
+        self.bulk_updates: list[tuple[tuple[str, ...], str]] = []
 
     # Minimal API used by tests and services
     def get_issue(self, key: str):
@@ -73,6 +74,18 @@ class FakeRepo:
         box.update(fields)
         self.updates.append((key, fields))
 
+    def add_labels(self, keys: list[str], label: str) -> list[str]:
+        # Local stand-in for the bulk endpoint: one recorded call, server-side merge
+        keys = list(dict.fromkeys(keys))
+        for key in keys:
+            box = self.state.setdefault(key, {})
+            labels = list(box.get("labels") or [])
+            if label not in labels:
+                box["labels"] = labels + [label]
+        if keys:
+            self.bulk_updates.append((tuple(keys), label))
+        return keys
+
 
 @pytest.fixture()
 def repo():
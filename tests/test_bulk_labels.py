@@ -0,0 +1,109 @@
+import json
+
+from nutree import Tree
+
+from adapter import JiraRepository, SimRepository
+from lsd.models import LVL2Feature, PCIEpic, PCITaskStory
+from lsd.services import propagate_sprint
+
+
+def _tree():
+    tree = Tree('LVL2')
+    feat = tree.add(LVL2Feature(key="LVL2-1", project="LVL2", type="New Feature", title="f", status="Open"))
+    epic = feat.add(PCIEpic(key="PCI-E", project="PCI", type="Epic", title="e", status="To Do", labels=["FY26Q1"]))
+    epic.add(PCITaskStory(key="PCI-T1", project="PCI", type="Task", title="t1", status="To Do"))
+    epic.add(PCITaskStory(key="PCI-T2", project="PCI", type="Story", title="t2", status="In Progress"))
+    feat.add(PCITaskStory(key="PCI-DONE", project="PCI", type="Task", title="d", status="Done"))
+    return tree
+
+
+def test_propagate_sprint_sends_one_bulk_call_from_snapshot(repo):
+    """Le test vérifie qu'un seul appel bulk est émis, sans lecture par issue, en ignorant les issues déjà labellisées."""
+    sent = propagate_sprint(_tree(), "26", "1", repo)
+    assert sent == ["PCI-T1", "PCI-T2"]
+    assert repo.bulk_updates == [(("PCI-T1", "PCI-T2"), "FY26Q1")]
+    assert repo.updates == []
+    assert repo.state["PCI-T1"]["labels"] == ["FY26Q1"]
+    assert "PCI-DONE" not in repo.state
+
+
+def test_propagate_sprint_no_call_when_all_labeled(repo):
+    tree = _tree()
+    for node in tree:
+        node.data.labels.append("FY26Q1")
+    assert propagate_sprint(tree, "26", "1", repo) == []
+    assert repo.bulk_updates == []
+
+
+def test_sim_repository_does_not_forward_bulk_labels(repo):
+    sim = SimRepository(repo)
+    assert sim.add_labels(["PCI-1", "PCI-1", "PCI-2"], "FY26Q1") == ["PCI-1", "PCI-2"]
+    assert repo.bulk_updates == []
+
+
+class _Session:
+    def __init__(self, fail_post=False, fail_put=None):
+        self.fail_post = fail_post
+        self.fail_put = fail_put or ()
+        self.posts = []
+        self.puts = []
+
+    def post(self, url, data=None):
+        if self.fail_post:
+            raise RuntimeError("404")
+        self.posts.append((url, json.loads(data)))
+
+    def put(self, url, data=None):
+        if url.endswith(self.fail_put):
+            raise RuntimeError("403")
+        self.puts.append((url, json.loads(data)))
+
+
+class _Client:
+    def __init__(self, cloud, session):
+        self._is_cloud = cloud
+        self._session = session
+
+    def _get_url(self, path):
+        return f"https://jira/rest/api/2/{path}"
+
+
+def test_jira_repository_uses_bulk_endpoint_on_cloud():
+    session = _Session()
+    repo = JiraRepository(_Client(True, session))
+    repo.add_labels(["PCI-1", "PCI-2"], "FY26Q1")
+    assert len(session.posts) == 1
+    url, payload = session.posts[0]
+    assert url == "https://jira/rest/api/3/bulk/issues/fields"
+    assert payload["selectedIssueIdsOrKeys"] == ["PCI-1", "PCI-2"]
+    assert session.puts == []
+
+
+def test_jira_repository_falls_back_to_put_add_verb():
+    session = _Session(fail_post=True)
+    repo = JiraRepository(_Client(True, session))
+    repo.add_labels(["PCI-1", "PCI-2", "PCI-3"], "FY26Q1")
+    assert sorted(u for u, _ in session.puts) == [
+        "https://jira/rest/api/2/issue/PCI-1",
+        "https://jira/rest/api/2/issue/PCI-2",
+        "https://jira/rest/api/2/issue/PCI-3",
+    ]
+    assert all(p == {"update": {"labels": [{"add": "FY26Q1"}]}} for _, p in session.puts)
+
+
+def test_jira_repository_put_fallback_continues_past_failed_issues(caplog):
+    session = _Session(fail_post=True, fail_put=("/PCI-2",))
+    repo = JiraRepository(_Client(True, session))
+    keys = [f"PCI-{i}" for i in range(1, 61)]  # two PUT chunks
+    assert repo.add_labels(keys, "FY26Q1") == [k for k in keys if k != "PCI-2"]
+    assert len(session.puts) == 59
+    assert repo.writes == 59
+    assert "PCI-2" in caplog.text
+
+
+def test_jira_repository_validates_labels_once_per_project(monkeypatch):
+    repo = JiraRepository(_Client(True, _Session()))
+    validated = []
+    monkeypatch.setattr(repo, "_validate_update", lambda key, fields: validated.append(key))
+    repo.add_labels(["PCI-1", "LVL2-7", "PCI-2", "LVL2-8"], "FY26Q1")
+    assert sorted(validated) == ["LVL2-7", "PCI-1"]
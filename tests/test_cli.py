@@ -0,0 +1,77 @@
+import json
+import logging
+import os
+import runpy
+import sys
+
+import pytest
+
+import adapter
+from adapter.http_stats import HttpStats
+from lsd.logging_utils import shutdown_logging
+from tests.test_services import build_sample_repo
+
+
+CLI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "jira-for-pci.py")
+
+
+class _FakeJira:
+    """Stands in for `JiraRepository`: `connect` returns the sample repository."""
+
+    @classmethod
+    def connect(cls, *args, **kwargs):
+        repo = build_sample_repo()
+        repo.metadata = lambda: None
+        repo.http, repo.writes = HttpStats(), 0
+        repo.link_field_ids = lambda: []
+        repo.find_pci_with_labels = lambda labels, squad: [
+            {"key": k, "fields": fields} for k, fields in repo.state.items()
+            if k.startswith("PCI-") and set(fields.get("labels") or ()) & set(labels)
+        ]
+        return repo
+
+
+@pytest.fixture
+def run_cli(tmp_path, monkeypatch, capsys):
+    """Run the script as `__main__` against the sample repository; returns (exit code, stdout)."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("JIRA_TOKEN", "token")
+    monkeypatch.setattr(adapter, "JiraRepository", _FakeJira)
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+
+    def run(*argv):
+        monkeypatch.setattr(sys, "argv", [CLI, *argv])
+        try:
+            runpy.run_path(CLI, run_name="__main__")
+            code = 0
+        except SystemExit as e:
+            code = e.code
+        return code, capsys.readouterr().out
+
+    yield run
+    shutdown_logging()
+    for h in root.handlers[:]:
+        if h not in handlers:
+            root.removeHandler(h)
+            h.close()
+
+
+def test_view(run_cli):
+    code, out = run_cli("26", "1", "Network")
+    assert code == 0
+    assert "LVL2-1" in out and "PCI-T2" in out
+
+
+def test_reconcile_ascii_and_ndjson(run_cli):
+    code, out = run_cli("26", "1", "Network", "--action", "reconcile")
+    assert code == 0 and "LVL2-1" in out
+    code, out = run_cli("26", "1", "Network", "--action", "reconcile", "--format", "ndjson")
+    assert code == 0
+    assert all(json.loads(line) for line in out.splitlines())
+
+
+def test_several_targets_reconciled(run_cli):
+    code, out = run_cli("26", "1,2", "Network", "--action", "reconcile")
+    assert code == 0
+    assert "== FY26 Q1 Network ==" in out and "== FY26 Q2 Network ==" in out
@@ -0,0 +1,53 @@
+import pytest
+from nutree import Tree
+
+from lsd.models import LVL2Feature, PCIEpic, PCITaskStory
+
+np = pytest.importorskip("numpy")
+
+from lsd.columnar import from_tree  # noqa: E402
+
+
+def _tree():
+    tree = Tree('LVL2')
+    f1 = tree.add(LVL2Feature(key="LVL2-1", project="LVL2", type="New Feature", title="f1", status="Open", prio="High"))
+    e1 = f1.add(PCIEpic(key="PCI-E1", project="PCI", type="Epic", title="e1", status="To Do", prio="High",
+                        components=["Network"], story_points=1))
+    e1.add(PCITaskStory(key="PCI-T1", project="PCI", type="Task", title="t1", status="To Do", prio="High",
+                        components=["Network", "Octavia"], story_points=3))
+    e1.add(PCITaskStory(key="PCI-T2", project="PCI", type="Story", title="t2", status="Done", prio="Low",
+                        components=["Network"], story_points=5))
+    f2 = tree.add(LVL2Feature(key="LVL2-2", project="LVL2", type="New Feature", title="f2", status="Open"))
+    f2.add(PCITaskStory(key="PCI-T3", project="PCI", type="Task", title="t3", status="To Do", story_points=2))
+    return tree
+
+
+def test_from_tree_structure():
+    col = from_tree(_tree())
+    assert col.keys == ["LVL2-1", "PCI-E1", "PCI-T1", "PCI-T2", "LVL2-2", "PCI-T3"]
+    assert col.parent.tolist() == [-1, 0, 1, 1, -1, 4]
+    assert col.depth.tolist() == [0, 1, 2, 2, 0, 1]
+    assert col.node(col.index_of("PCI-T2")).title == "t2"
+    assert col.children_of(1) == [2, 3]
+
+
+def test_group_sum_and_count():
+    col = from_tree(_tree())
+    assert col.group_sum("status") == {"To Do": 6, "Done": 5}
+    assert col.group_sum("prio") == {"High": 4, "Low": 5, "": 2}
+    assert col.group_sum("component") == {"Network": 9, "Octavia": 3}
+    assert col.group_count("type") == {"New Feature": 2, "Epic": 1, "Task": 2, "Story": 1}
+    open_rows = ~col.closed_mask()
+    assert col.group_sum("status", where=open_rows) == {"To Do": 6}
+
+
+def test_rollup_and_back_to_domain():
+    col = from_tree(_tree())
+    totals = col.rollup()
+    assert totals[col.index_of("LVL2-1")] == 9
+    assert totals[col.index_of("PCI-E1")] == 9
+    assert totals[col.index_of("LVL2-2")] == 2
+    open_totals = col.rollup(where=~col.closed_mask())
+    assert open_totals[col.index_of("LVL2-1")] == 4
+    rows = np.flatnonzero(col.mask("type", "Task", "Story") & (col.story_points > 2))
+    assert [d.key for d in col.nodes(rows)] == ["PCI-T1", "PCI-T2"]
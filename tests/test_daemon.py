@@ -0,0 +1,117 @@
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from lsd.daemon import DaemonClient, TreeDaemon, make_server, write_token
+from tests.test_services import build_sample_repo
+
+
+class CountingRepo:
+    def __init__(self):
+        self._inner = build_sample_repo()
+        self.searches = 0
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+    def find_lvl2_new_features(self, sprint, squad):
+        self.searches += 1
+        return self._inner.find_lvl2_new_features(sprint, squad)
+
+    @property
+    def state(self):
+        return self._inner.state
+
+
+@pytest.fixture()
+def running(tmp_path):
+    repo = CountingRepo()
+    daemon = TreeDaemon(repo)
+    token_file = str(tmp_path / "daemon.token")
+    server = make_server(daemon, port=0, token=write_token(token_file))
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    yield repo, daemon, DaemonClient(f"http://{host}:{port}", token_file=token_file)
+    server.shutdown()
+    server.server_close()
+
+
+def test_daemon_serves_cached_tree(running):
+    repo, daemon, client = running
+    first = client.view("26", "1", "Network")
+    assert "LVL2-1" in first and "PCI-T2" in first
+    assert client.view("26", "1", "Network") == first
+    assert repo.searches == 1
+    assert client.health()["trees"] == [["26", "1", "Network", False]]
+
+    lines = [json.loads(x) for x in client.view("26", "1", "Network", fmt="ndjson").splitlines()]
+    assert lines[0]["key"] == "LVL2-1"
+    assert repo.searches == 1
+
+    client.view("26", "1", "Network", refresh=True)
+    assert repo.searches == 2
+
+
+def test_daemon_actions_simulate_by_default(running):
+    repo, daemon, client = running
+    out = client.action("26", "1", "Network", "set-quarter")
+    assert sorted(out["result"]) == ["PCI-EPIC", "PCI-T1", "PCI-T2"]
+    assert {p["key"] for p in out["plan"]} == {"PCI-EPIC", "PCI-T1", "PCI-T2"}
+    assert "FY26Q1" not in (repo.state["PCI-T1"].get("labels") or [])
+
+    out = client.action("26", "1", "Network", "set-quarter", update=True)
+    assert "FY26Q1" in repo.state["PCI-T1"]["labels"]
+    # Writes invalidate the cached tree
+    assert daemon.cached_keys() == []
+
+
+def test_daemon_aggregate_and_errors(running):
+    repo, daemon, client = running
+    out = client.action("26", "1", "Network", "aggregate-points", pci_epic="all")
+    assert out["result"]["PCI-EPIC"] == 5
+    with pytest.raises(urllib.error.HTTPError) as exc:
+        client.action("26", "1", "Network", "nope")
+    assert exc.value.code == 400
+    assert client.refresh(squad="Network") == 1
+
+
+def _post(url, headers, body=b'{"year": "26", "quarter": "1", "squad": "Network", "action": "set-quarter", "update": true}'):
+    req = urllib.request.Request(url, data=body, headers=headers)
+    with pytest.raises(urllib.error.HTTPError) as exc:
+        urllib.request.urlopen(req, timeout=5)
+    return exc.value.code
+
+
+def test_daemon_refuses_cross_site_requests(running, tmp_path):
+    repo, daemon, client = running
+    url = client._url + "/action"
+    token = client._token
+    assert oct(os.stat(tmp_path / "daemon.token").st_mode & 0o777) == "0o600"
+    # No-preflight form/text POST from a web page
+    assert _post(url, {"Content-Type": "text/plain", "X-LSD-Token": token}) == 415
+    assert _post(url, {"Content-Type": "application/json"}) == 401
+    assert _post(url, {"Content-Type": "application/json", "X-LSD-Token": "guess"}) == 401
+    # DNS rebinding: the browser sends the attacker's host name
+    assert _post(url, {"Content-Type": "application/json", "X-LSD-Token": token, "Host": "evil.example:80"}) == 403
+    assert "FY26Q1" not in (repo.state["PCI-T1"].get("labels") or [])
+
+
+def test_daemon_rebuilds_trees_older_than_max_age(monkeypatch):
+    import lsd.daemon
+
+    repo = CountingRepo()
+    daemon = TreeDaemon(repo, max_age=60)
+    now = [1000.0]
+    monkeypatch.setattr(lsd.daemon.time, "monotonic", lambda: now[0])
+    daemon.tree("26", "1", "Network")
+    now[0] += 30
+    daemon.tree("26", "1", "Network")
+    assert repo.searches == 1
+    now[0] += 31
+    daemon.tree("26", "1", "Network")
+    assert repo.searches == 2
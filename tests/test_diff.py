@@ -0,0 +1,99 @@
+from nutree import Tree
+
+from lsd.diff import diff_trees
+from lsd.models import LVL2Feature, PCIEpic, PCITaskStory
+from lsd.snapshot import load_tree, save_tree
+
+
+def _tree():
+    tree = Tree('LVL2')
+    f1 = tree.add(LVL2Feature(key="LVL2-1", project="LVL2", type="New Feature", title="f1", status="Open", prio="High"))
+    e1 = f1.add(PCIEpic(key="PCI-E1", project="PCI", type="Epic", title="e1", status="To Do",
+                        components=["Network"], story_points=5))
+    e1.add(PCITaskStory(key="PCI-T1", project="PCI", type="Task", title="t1", status="To Do", story_points=3))
+    e1.add(PCITaskStory(key="PCI-T2", project="PCI", type="Task", title="t2", status="To Do", story_points=2))
+    f2 = tree.add(LVL2Feature(key="LVL2-2", project="LVL2", type="New Feature", title="f2", status="Open"))
+    f2.add(PCITaskStory(key="PCI-T3", project="PCI", type="Task", title="t3", status="To Do"))
+    return tree
+
+
+def _node(tree, key):
+    return next(n for n in tree if n.data.key == key)
+
+
+def test_snapshot_roundtrip(tmp_path):
+    tree = _tree()
+    path = str(tmp_path / "snap.json.gz")
+    assert save_tree(tree, path, meta={"sprint": "SD-FY26-Q1"}) == 6
+    loaded, meta = load_tree(path)
+    assert meta == {"sprint": "SD-FY26-Q1"}
+    assert [n.data for n in loaded] == [n.data for n in tree]
+    assert type(_node(loaded, "PCI-E1").data) is PCIEpic
+    assert diff_trees(tree, loaded) == []
+
+
+def test_diff_reuses_snapshot_hashes(tmp_path, monkeypatch):
+    import lsd.hashing
+
+    path = str(tmp_path / "snap.json")
+    save_tree(_tree(), path)
+    old, _ = load_tree(path)
+    new = _tree()
+    _node(new, "PCI-T3").data.status = "Done"
+    calls = []
+    digest = lsd.hashing.issue_digest
+    monkeypatch.setattr(lsd.hashing, "issue_digest", lambda issue: calls.append(issue.key) or digest(issue))
+    assert [(c.kind, c.key) for c in diff_trees(old, new)] == [("status", "PCI-T3")]
+    # Only the new tree was hashed
+    assert sorted(calls) == sorted(n.data.key for n in new)
+
+
+def test_diff_field_changes():
+    old, new = _tree(), _tree()
+    _node(new, "PCI-T1").data.status = "Done"
+    _node(new, "PCI-E1").data.prio = "Highest"
+    _node(new, "PCI-E1").data.story_points = 8
+    got = {(c.kind, c.key, c.old, c.new, c.delta) for c in diff_trees(old, new)}
+    assert got == {
+        ("status", "PCI-T1", "To Do", "Done", None),
+        ("prio", "PCI-E1", None, "Highest", None),
+        ("points", "PCI-E1", 5, 8, 3),
+    }
+
+
+def test_diff_added_removed_and_moved():
+    old, new = _tree(), _tree()
+    # New epic with a child, removed feature subtree, task moved between parents
+    e = _node(new, "LVL2-2").add(PCIEpic(key="PCI-E9", project="PCI", type="Epic", title="e9", status="To Do"))
+    e.add(PCITaskStory(key="PCI-T9", project="PCI", type="Task", title="t9", status="To Do"))
+    _node(new, "PCI-T2").move_to(_node(new, "LVL2-2"))
+    _node(new, "PCI-T3").remove()
+    changes = diff_trees(old, new)
+    got = {(c.kind, c.key) for c in changes}
+    assert got == {("added", "PCI-E9"), ("added", "PCI-T9"), ("removed", "PCI-T3"), ("moved", "PCI-T2")}
+    moved = next(c for c in changes if c.kind == "moved")
+    assert (moved.old, moved.new) == ("PCI-E1", "LVL2-2")
+
+
+def test_diff_detects_move_out_of_removed_subtree():
+    old, new = _tree(), _tree()
+    _node(new, "PCI-T1").move_to(_node(new, "LVL2-2"))
+    _node(new, "PCI-E1").remove()
+    got = sorted((c.kind, c.key) for c in diff_trees(old, new))
+    assert got == [("moved", "PCI-T1"), ("removed", "PCI-E1"), ("removed", "PCI-T2")]
+
+
+def test_diff_large_tree_single_change():
+    def big():
+        tree = Tree('LVL2')
+        for f in range(50):
+            feat = tree.add(LVL2Feature(key=f"LVL2-{f}", project="LVL2", type="New Feature", title="f", status="Open"))
+            for e in range(20):
+                epic = feat.add(PCIEpic(key=f"PCI-{f}-{e}", project="PCI", type="Epic", title="e", status="To Do"))
+                for t in range(10):
+                    epic.add(PCITaskStory(key=f"PCI-{f}-{e}-{t}", project="PCI", type="Task", title="t", status="To Do"))
+        return tree
+
+    old, new = big(), big()
+    _node(new, "PCI-7-3-4").data.story_points = 2
+    assert [(c.kind, c.key, c.delta) for c in diff_trees(old, new)] == [("points", "PCI-7-3-4", 2)]
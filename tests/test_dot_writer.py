@@ -0,0 +1,59 @@
+import os
+import subprocess
+
+from nutree import Tree
+
+from lsd.models import LVL2Feature, PCIEpic, PCITaskStory
+from lsd.presenter import iter_dot, write_dot_per_feature
+
+
+def _tree(n_tasks=3, epic_status="To Do"):
+    tree = Tree('LVL2')
+    f1 = tree.add(LVL2Feature(key="LVL2-1", project="LVL2", type="New Feature", title='say "hi"', status="Open"))
+    e1 = f1.add(PCIEpic(key="PCI-E1", project="PCI", type="Epic", title="e1", status=epic_status))
+    for i in range(n_tasks):
+        e1.add(PCITaskStory(key=f"PCI-T{i}", project="PCI", type="Task", title="t", status="To Do", story_points=i))
+    f2 = tree.add(LVL2Feature(key="LVL2-2", project="LVL2", type="New Feature", title="f2", status="Open"))
+    f2.add(PCITaskStory(key="PCI-X", project="PCI", type="Task", title="x", status="To Do"))
+    return tree
+
+
+def _edges(lines):
+    return [line.strip() for line in lines if "->" in line]
+
+
+def test_iter_dot_nodes_edges_and_escaping():
+    lines = list(iter_dot(_tree()))
+    assert lines[0] == 'digraph "LSD" {' and lines[-1] == "}"
+    assert sum(1 for line in lines if "[label=" in line) == 7
+    assert len(_edges(lines)) == 5
+    assert any('say \\"hi\\"' in line for line in lines)
+
+
+def test_iter_dot_handles_deep_trees_iteratively():
+    tree = Tree('LVL2')
+    node = tree.add(LVL2Feature(key="LVL2-1", project="LVL2", type="New Feature", title="f", status="Open"))
+    for i in range(3000):
+        node = node.add(PCIEpic(key=f"PCI-{i}", project="PCI", type="Epic", title="e", status="To Do"))
+    lines = list(iter_dot(tree))
+    assert len(_edges(lines)) == 3000
+
+
+def test_iter_dot_collapses_closed_and_leaf_heavy_subtrees():
+    lines = list(iter_dot(_tree(epic_status="Done"), collapse_closed=True))
+    assert not any("PCI-T0" in line for line in lines)
+    assert any("[+3 hidden]" in line for line in lines)
+
+    lines = list(iter_dot(_tree(n_tasks=10), max_leaves=4))
+    assert sum(1 for line in lines if "PCI-T" in line) == 4
+    assert any("+6 more\\n39 pts" in line for line in lines)
+
+
+def test_write_dot_per_feature_renders_in_parallel(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(subprocess, "run", lambda cmd, check: calls.append(cmd))
+    out = write_dot_per_feature(_tree(), str(tmp_path), fmt="svg", max_workers=2)
+    assert sorted(os.path.basename(p) for p in out) == ["LVL2-1.svg", "LVL2-2.svg"]
+    assert sorted(c[1] for c in calls) == ["-Tsvg", "-Tsvg"]
+    with open(tmp_path / "LVL2-2.dot") as fh:
+        assert "PCI-X" in fh.read()
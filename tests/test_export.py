@@ -0,0 +1,47 @@
+import pytest
+from nutree import Tree
+
+from lsd.export import iter_records, write_arrow
+from lsd.models import LVL2Epic, LVL2Feature, PCIEpic, PCITaskStory
+
+
+def _tree():
+    tree = Tree('LVL2')
+    f1 = tree.add(LVL2Feature(key="LVL2-1", project="LVL2", type="New Feature", title="f1", status="Open",
+                              prio="High", pu="UnitX"))
+    e1 = f1.add(PCIEpic(key="PCI-E1", project="PCI", type="Epic", title="e1", status="To Do",
+                        labels=["FY26Q1"], components=["Network"], story_points=8))
+    e1.add(PCITaskStory(key="PCI-T1", project="PCI", type="Task", title="t1", status="Done", story_points=3))
+    tree.add(LVL2Epic(key="LVL2-9", project="LVL2", type="Epic LPM", title="e", status="Open", blfnt="B1"))
+    return tree
+
+
+def test_iter_records_flattens_tree():
+    recs = list(iter_records(_tree()))
+    assert [(r["key"], r["parent_key"], r["level"]) for r in recs] == [
+        ("LVL2-1", None, 0), ("PCI-E1", "LVL2-1", 1), ("PCI-T1", "PCI-E1", 2), ("LVL2-9", None, 0),
+    ]
+    assert recs[0]["pu"] == "UnitX" and recs[0]["story_points"] is None and recs[0]["components"] is None
+    assert recs[1]["labels"] == ["FY26Q1"] and recs[1]["story_points"] == 8
+    assert recs[3]["blfnt"] == "B1"
+
+
+@pytest.mark.parametrize("name", ["tree.parquet", "tree.arrow"])
+def test_write_arrow_in_batches(tmp_path, name):
+    pa = pytest.importorskip("pyarrow")
+    path = str(tmp_path / "out" / name)
+    assert write_arrow(_tree(), path, batch_size=2) == 4
+    if name.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path)
+    else:
+        table = pa.ipc.open_file(path).read_all()
+    assert table.column("key").to_pylist() == ["LVL2-1", "PCI-E1", "PCI-T1", "LVL2-9"]
+    assert table.column("story_points").to_pylist() == [None, 8, 3, None]
+
+
+def test_write_arrow_rejects_unknown_format(tmp_path):
+    pytest.importorskip("pyarrow")
+    with pytest.raises(ValueError):
+        write_arrow(_tree(), str(tmp_path / "t.csv"), fmt="csv")
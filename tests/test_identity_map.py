@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from adapter import IdentityMapRepository
+from lsd.fields import read_field, update_field
+from lsd.services import find_orphans
+from lsd.tree_builder import build_lsd_tree
+from tests.test_services import build_sample_repo
+
+
+class CountingRepo:
+    def __init__(self, inner=None):
+        self._inner = inner or build_sample_repo()
+        self.calls = Counter()
+
+    @property
+    def state(self):
+        return self._inner.state
+
+    def __getattr__(self, name):
+        attr = getattr(self._inner, name)
+        if not callable(attr):
+            return attr
+
+        def counted(*args, **kwargs):
+            self.calls[name] += 1
+            return attr(*args, **kwargs)
+
+        return counted
+
+
+def test_issue_fetched_once_across_build_and_actions():
+    inner = CountingRepo()
+    inner.state["PCI-T1"]["labels"] = ["FY26Q1"]
+    inner.state["PCI-ORPH"]["labels"] = ["FY26Q1"]
+    repo = IdentityMapRepository(inner)
+    tree = build_lsd_tree(repo, "26", "1", "Network", skip_closed=False)
+    fetched = inner.calls["get_issue"]
+    # Reads of tree issues are served from the map, no get_fields round-trip
+    assert read_field(repo, "PCI-T2", "story_points") == 5
+    assert inner.calls["get_fields"] == 0
+    find_orphans(tree, "26", "1", "Network", repo)
+    find_orphans(tree, "26", "1", "Network", repo)
+    assert inner.calls["get_issue"] == fetched + 1  # PCI-ORPH, once
+    assert repo.hits == 2 and repo.misses == fetched + 1
+    assert "hits" in repo.summary()
+
+
+def test_update_invalidates_entries():
+    inner = CountingRepo()
+    repo = IdentityMapRepository(inner)
+    assert read_field(repo, "PCI-T1", "story_points") == 3
+    assert read_field(repo, "PCI-T1", "story_points") == 3
+    assert inner.calls["get_fields"] == 1
+    update_field(repo, "PCI-T1", "story_points", 8)
+    assert read_field(repo, "PCI-T1", "story_points") == 8
+    repo.get_issue("PCI-T2")
+    repo.add_labels(["PCI-T2"], "FY26Q1")
+    assert "FY26Q1" in repo.get_issue("PCI-T2").fields.labels
+    assert inner.calls["get_issue"] == 2
+
+
+def test_concurrent_lookups_fetch_once():
+    inner = build_sample_repo()
+    calls = Counter()
+    original = inner.get_issue
+
+    def slow_get_issue(key):
+        calls[key] += 1
+        time.sleep(0.02)
+        return original(key)
+
+    inner.get_issue = slow_get_issue
+    repo = IdentityMapRepository(inner)
+    threads = [threading.Thread(target=repo.get_issue, args=("PCI-T1",)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == {"PCI-T1": 1}
+    assert (repo.hits, repo.misses) == (7, 1)
+
+
+def test_failed_fetch_is_retried():
+    inner = build_sample_repo()
+    original = inner.get_issue
+    failures = [ConnectionError("reset")]
+
+    def flaky_get_issue(key):
+        if failures:
+            raise failures.pop()
+        return original(key)
+
+    inner.get_issue = flaky_get_issue
+    repo = IdentityMapRepository(inner)
+    with pytest.raises(ConnectionError):
+        repo.get_issue("PCI-T1")
+    assert repo._inflight == {}
+    assert repo.get_issue("PCI-T1").key == "PCI-T1"
+    assert repo.get_issue("PCI-T1") is repo.get_issue("PCI-T1")
+    assert (repo.hits, repo.misses) == (2, 1)
@@ -0,0 +1,39 @@
+import pytest
+
+from lsd.index import index_for, peek_index
+from lsd.tree_builder import build_lsd_tree
+from tests.test_ingest import _event, _issue, _setup
+from tests.test_services import build_sample_repo
+
+
+def test_select_intersects_indexes():
+    tree = build_lsd_tree(build_sample_repo(), "26", "1", "Network", skip_closed=False)
+    index = peek_index(tree)
+    assert index is not None and index is index_for(tree) and len(index) == 5
+    assert index.keys(project="PCI", type=("Task", "Story")) == ["PCI-T2", "PCI-T1", "PCI-DONE"]
+    assert index.keys(type="Task", open=True, parent_type="Epic") == ["PCI-T2"]
+    assert index.keys(type="Task", open=False) == ["PCI-DONE"]
+    assert index.keys(component="Network", prio="High") == ["PCI-EPIC"]
+    assert index.keys(prio="Urgent") == []
+    assert sorted(index.values("prio")) == ["High", "Low", "Medium"]
+    with pytest.raises(KeyError):
+        index.select(assignee="me")
+
+
+def test_index_follows_incremental_updates():
+    repo, tree, ing = _setup()
+    index = index_for(tree)
+    ing.apply(_event("jira:issue_updated", _issue("PCI-T1", prio="High")))
+    assert index.keys(prio="High") == ["PCI-EPIC", "PCI-T1"]
+    assert "PCI-T1" not in index.keys(prio="Low")
+    # Moved under the Epic: parent criteria are evaluated at query time
+    ing.apply(_event("jira:issue_updated", _issue("PCI-T1", prio="High"), link=("Epic Link", "PCI-EPIC")))
+    assert index.keys(type="Task", prio="High", parent_type="Epic") == ["PCI-T1"]
+    # Closed issues leave the tree and the index
+    ing.apply(_event("jira:issue_updated", _issue("PCI-T2", status="Done")))
+    assert index.keys(type="Task", open=True) == ["PCI-T1"]
+    # Added issues (and the subtree fetched for them) are indexed
+    repo.state["PCI-NEW"] = _issue("PCI-NEW")["fields"]
+    ing.apply(_event("jira:issue_created", _issue("PCI-NEW"), link=("Parent Link", "LVL2-1")))
+    assert index.keys(type="Task", open=True) == ["PCI-T1", "PCI-NEW"]
+    assert len(index) == len(list(tree))
@@ -0,0 +1,121 @@
+import json
+import threading
+
+from lsd.daemon import DaemonClient, TreeDaemon, make_server
+from lsd.ingest import TreeIngestor
+from lsd.tree_builder import build_lsd_tree, find_nodes
+from tests.test_services import build_sample_repo
+
+
+def _issue(key, itype="Task", status="To Do", comps=("Network",), prio="Low", **extra):
+    fields = {
+        "project": {"key": key.split("-")[0]},
+        "issuetype": {"name": itype},
+        "summary": f"{itype.lower()} {key}",
+        "status": {"name": status},
+        "priority": {"name": prio},
+        "labels": [],
+        "components": [{"name": c} for c in comps],
+        "customfield_10006": 1,
+        **extra,
+    }
+    return {"key": key, "fields": fields}
+
+
+def _event(kind, issue, link=None):
+    ev = {"webhookEvent": kind, "issue": issue}
+    if link is not None:
+        ev["changelog"] = {"items": [{"field": link[0], "from": None, "toString": link[1]}]}
+    return ev
+
+
+def _setup():
+    repo = build_sample_repo()
+    tree = build_lsd_tree(repo, "26", "1", "Network", skip_closed=False)
+    return repo, tree, TreeIngestor(tree, "Network", repo=repo)
+
+
+def _parent(tree, key):
+    return find_nodes(tree, key)[0].parent.data.key
+
+
+def test_update_in_place_keeps_object_identity():
+    _, tree, ing = _setup()
+    before = find_nodes(tree, "PCI-T2")[0].data
+    assert ing.apply(_event("jira:issue_updated", _issue("PCI-T2", prio="High"))) == ["updated PCI-T2"]
+    node = find_nodes(tree, "PCI-T2")[0]
+    assert node.data is before and node.data.prio == "High"
+
+
+def test_reparent_on_epic_link_change():
+    _, tree, ing = _setup()
+    assert _parent(tree, "PCI-T1") == "LVL2-1"
+    changes = ing.apply(_event("jira:issue_updated", _issue("PCI-T1"), link=("Epic Link", "PCI-EPIC")))
+    assert changes == ["updated PCI-T1", "moved PCI-T1"]
+    assert _parent(tree, "PCI-T1") == "PCI-EPIC"
+    # Link to an issue outside the tree: the node leaves the tree
+    ing.apply(_event("jira:issue_updated", _issue("PCI-T1"), link=("Epic Link", "PCI-99999")))
+    assert find_nodes(tree, "PCI-T1") == []
+
+
+def test_filters_reevaluated_and_delete():
+    _, tree, ing = _setup()
+    # Epic no longer Network: dropped with its subtree
+    assert ing.apply(_event("jira:issue_updated", _issue("PCI-EPIC", itype="Epic", comps=("Compute",)))) == [
+        "removed PCI-EPIC"
+    ]
+    assert find_nodes(tree, "PCI-T2") == []
+    ing.apply(_event("jira:issue_updated", _issue("PCI-T1", status="Done")))
+    assert find_nodes(tree, "PCI-T1") == []
+    assert ing.apply(_event("jira:issue_deleted", {"key": "LVL2-1"})) == ["removed LVL2-1"]
+    assert list(tree) == []
+
+
+def test_created_issue_attached_from_parent_field():
+    repo, tree, ing = _setup()
+    new = _issue("PCI-NEW", parent={"key": "PCI-EPIC"})
+    repo.state["PCI-NEW"] = new["fields"]
+    assert ing.apply(_event("jira:issue_created", new)) == ["added PCI-NEW"]
+    assert _parent(tree, "PCI-NEW") == "PCI-EPIC"
+    # Unrelated issue: ignored
+    assert ing.apply(_event("jira:issue_created", _issue("PCI-OTHER"))) == []
+
+
+def test_children_follow_the_builder_squad_rules():
+    repo, tree, ing = _setup()
+    # Non-squad task created under a tree Epic: a rebuild would not list it
+    other = _issue("PCI-CMP", comps=("Compute",), parent={"key": "PCI-EPIC"})
+    repo.state["PCI-CMP"] = other["fields"]
+    assert ing.apply(_event("jira:issue_created", other)) == []
+    # Task under the Epic moving to another squad leaves the tree
+    assert ing.apply(_event("jira:issue_updated", _issue("PCI-T2", comps=("Compute",)))) == ["removed PCI-T2"]
+    rebuilt = build_lsd_tree(repo, "26", "1", "Network", skip_closed=False)
+    assert sorted(n.data.key for n in tree) == sorted(n.data.key for n in rebuilt if n.data.key != "PCI-T2")
+
+
+def test_daemon_ingests_created_issues_through_custom_link_fields():
+    repo = build_sample_repo()
+    repo.link_field_ids = lambda: ["customfield_10100"]  # Epic Link on Server/DC
+    daemon = TreeDaemon(repo)
+    daemon.tree("26", "1", "Network")
+    new = _issue("PCI-NEW", customfield_10100="PCI-EPIC")
+    repo.state["PCI-NEW"] = new["fields"]
+    assert daemon.ingest(_event("jira:issue_created", new)) == {"changes": {"26/1/Network": ["added PCI-NEW"]}}
+
+
+def test_recorded_webhook_posted_to_local_daemon():
+    repo = build_sample_repo()
+    daemon = TreeDaemon(repo)
+    daemon.tree("26", "1", "Network")
+    server = make_server(daemon, port=0, token="secret")
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    try:
+        host, port = server.server_address[:2]
+        # Recorded payload, as Jira posts it
+        payload = json.loads(json.dumps(_event("jira:issue_updated", _issue("PCI-T2", status="In Progress"))))
+        body = DaemonClient(f"http://{host}:{port}", token="secret").webhook(payload)
+        assert body == {"changes": {"26/1/Network": ["updated PCI-T2"]}}
+        assert "In Progress" in daemon.view("26", "1", "Network")
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -17,7 +17,7 @@ class Repo:
     def find_lvl2_new_features(self, sprint: str, squad: str):
         return list(self.lvl2_roots)
 
-    def find_pci_children_by_parent_link(self, parent_key: str):
+    def find_pci_children_by_parent_link(self, parent_key: str, squad=None):
         return list(self.edges_parent.get(parent_key, []))
 
     def find_children_by_epic_link(self, epic_key: str, squad: str):
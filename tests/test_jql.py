@@ -0,0 +1,102 @@
+import re
+import threading
+import time
+import urllib.parse
+
+from adapter import JiraRepository
+from adapter.jql import JqlPlanner, Search, chunk_values, link_value
+
+
+class _Issue:
+    def __init__(self, key, parent):
+        self.key = key
+        self.raw = {"key": key, "fields": {"customfield_1": parent}}
+
+
+CHILDREN = {f"LVL2-{i}": [f"PCI-{i}a", f"PCI-{i}b"] for i in range(30)}
+
+
+class _Jira:
+    """search_issues double answering `"Parent Link" = K` and `in (...)` searches."""
+
+    def __init__(self):
+        self.jqls = []
+
+    def fields(self):
+        return [{"name": "Parent Link", "id": "customfield_1"}]
+
+    def priorities(self):
+        return []
+
+    def statuses(self):
+        return []
+
+    def search_issues(self, jql, fields=None, maxResults=None):
+        self.jqls.append((jql, fields))
+        time.sleep(0.01)
+        parents = re.findall(r"LVL2-\d+", jql.split(" AND ")[0])
+        return [_Issue(kid, {"data": {"key": p}}) for p in parents for kid in CHILDREN.get(p, [])]
+
+
+def _search(key):
+    return Search(("Project = PCI", "status != Closed"), "priority DESC", link='"Parent Link"', value=key)
+
+
+def test_same_shape_searches_merged_and_mapped_back():
+    jira = _Jira()
+    planner = JqlPlanner(jira.search_issues, lambda: {'"Parent Link"': "customfield_1"})
+    keys = ["LVL2-1", "LVL2-2", "LVL2-3", "LVL2-1"]
+    results = planner.run_many([_search(k) for k in keys])
+    assert [[i.key for i in r] for r in results] == [CHILDREN[k] for k in keys]
+    assert jira.jqls == [('"Parent Link" in (LVL2-1, LVL2-2, LVL2-3) AND Project = PCI AND status != Closed'
+                          ' ORDER BY priority DESC', "key,customfield_1")]
+    assert (planner.requests, planner.searches) == (1, 4)
+
+
+def test_unmergeable_searches_run_alone():
+    jira = _Jira()
+    planner = JqlPlanner(jira.search_issues)  # no link field id known
+    planner.run_many([_search("LVL2-1"), _search("LVL2-2")])
+    assert [j for j, _ in jira.jqls] == [_search("LVL2-1").jql(), _search("LVL2-2").jql()]
+    assert {f for _, f in jira.jqls} == {"key"}
+
+
+def test_chunks_respect_encoded_length():
+    search = _search(None)
+    values = [f"LVL2-{i}" for i in range(30)]
+    chunks = chunk_values(search, values, max_length=400)
+    assert len(chunks) > 1 and sum(chunks, []) == values
+    assert all(len(urllib.parse.quote(search.jql(c), safe="")) <= 400 for c in chunks)
+    assert chunk_values(search, values, max_values=7)[0] == values[:7]
+
+
+def test_concurrent_identical_searches_share_one_request():
+    jira = _Jira()
+    planner = JqlPlanner(jira.search_issues)
+    out = []
+    threads = [threading.Thread(target=lambda: out.append(planner.run(_search("LVL2-5")))) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(jira.jqls) == 1 and len(out) == 6
+    assert link_value({"key": "A"}) == link_value("A") == "A"
+
+
+def test_repository_batch_search_through_planner():
+    jira = _Jira()
+    repo = JiraRepository(jira)
+    keys = [f"LVL2-{i}" for i in range(30)]
+    found = repo.find_pci_children_by_parent_links(keys, "Network")
+    assert found == {k: CHILDREN[k] for k in keys}
+    assert len(jira.jqls) == 1 and "Openstack_Networking" in jira.jqls[0][0]
+    assert repo.find_pci_children_by_parent_link("LVL2-7") == CHILDREN["LVL2-7"]
+
+
+def test_label_search_filters_on_squad_component(monkeypatch):
+    from lsd import squads
+
+    monkeypatch.setitem(squads.SQUAD_REGISTRY, "Storage", squads.SquadSpec(name="Storage", component="Block_Storage"))
+    jira = _Jira()
+    JiraRepository(jira).find_pci_with_labels(["FY26Q1"], "Storage")
+    assert 'Component = "Block_Storage"' in jira.jqls[0][0]
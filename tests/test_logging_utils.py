@@ -0,0 +1,97 @@
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from lsd.logging_utils import BufferedFileHandler, SamplingFilter, _start_queue, setup_logging, shutdown_logging, use_direct_handlers
+
+
+@pytest.fixture
+def bare_root():
+    # pytest attaches its capture handlers for the test call: detach them there
+    root = logging.getLogger()
+    saved = []
+
+    def clear():
+        saved[:] = root.handlers
+        root.handlers = []
+        return root
+
+    level = root.level
+    yield clear
+    shutdown_logging()
+    root.handlers, root.level = saved, level
+
+
+def test_queued_logging_samples_and_aggregates(bare_root, tmp_path):
+    root = bare_root()
+    log_file = tmp_path / "logs.txt"
+    setup_logging(str(log_file), queued=True, sample={"JQL: %s": 10},
+                  aggregate=["(-) unchanged prio for %s %s"])
+    assert len(root.handlers) == 1
+    log = logging.getLogger("lsd.services")
+    for i in range(25):
+        log.debug("JQL: %s", f"key = PCI-{i}")
+        log.debug("(-) unchanged prio for %s %s", "Task", f"PCI-{i}")
+    log.info("(+) set prio %s for %s %s", "High", "Task", "PCI-1")
+    shutdown_logging()
+    assert root.handlers == []
+
+    lines = log_file.read_text().splitlines()
+    assert [line.split(": ", 1)[1] for line in lines if "JQL" in line and "summary" not in line] == [
+        "JQL: key = PCI-0", "JQL: key = PCI-10", "JQL: key = PCI-20",
+    ]
+    assert not any("unchanged prio for Task" in line for line in lines)
+    assert any("(+) set prio High for Task PCI-1" in line for line in lines)
+    assert any("log summary: 25 x '(-) unchanged prio for %s %s' (aggregated)" in line for line in lines)
+    assert any("log summary: 3/25 x 'JQL: %s' (sampled 1/10)" in line for line in lines)
+
+
+def test_sampling_filter_decides_each_record_once():
+    sampling = SamplingFilter(sample={"lsd.ingest": 2})
+    records = [logging.LogRecord("lsd.ingest", logging.INFO, __file__, 1, "event %s", (i,), None) for i in range(4)]
+    # Two handlers sharing the filter see the same decisions
+    kept = [sampling.filter(r) and sampling.filter(r) for r in records]
+    assert kept == [True, False, True, False]
+    assert sampling.summary() == ["2/4 x 'lsd.ingest' (sampled 1/2)"]
+
+
+def test_idle_queue_flushes_buffered_file(tmp_path):
+    log_file = tmp_path / "logs.txt"
+    handler = BufferedFileHandler(str(log_file), flush_interval=0.05)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    queue_handler, listener = _start_queue([handler])
+    log = logging.getLogger("lsd.tests.idle")
+    log.propagate = False
+    log.setLevel(logging.INFO)
+    log.addHandler(queue_handler)
+    try:
+        log.warning("first")  # WARNING+: flushed at once, starts the interval
+        log.info("last before idle")
+        deadline = time.monotonic() + 2
+        while "last before idle" not in log_file.read_text() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # Written while the queue is idle, without a later record or close()
+        assert log_file.read_text().splitlines() == ["first", "last before idle"]
+    finally:
+        log.removeHandler(queue_handler)
+        listener.stop()
+        handler.close()
+
+
+def _log_in_worker(i):
+    logging.getLogger("lsd.tree_builder").info("worker record %d", i)
+    return i
+
+
+def test_forked_workers_log_without_the_parent_listener(bare_root, tmp_path):
+    bare_root()
+    log_file = tmp_path / "logs.txt"
+    setup_logging(str(log_file), queued=True)
+    with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context("fork"), initializer=use_direct_handlers) as procs:
+        assert list(procs.map(_log_in_worker, range(3))) == [0, 1, 2]
+    shutdown_logging()
+    text = log_file.read_text()
+    assert all(f"worker record {i}" in text for i in range(3))
@@ -0,0 +1,116 @@
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+
+from adapter import JiraRepository, MetadataCache
+from lsd import fields
+
+
+class _Jira:
+    def __init__(self):
+        self.calls = Counter()
+
+    def fields(self):
+        self.calls["fields"] += 1
+        return [
+            {"id": "priority", "name": "Priority", "schema": {"type": "priority"}},
+            {"id": "labels", "name": "Labels", "schema": {"type": "array"}},
+            {"id": "components", "name": "Component/s", "schema": {"type": "array"}},
+            {"id": "customfield_20001", "name": "Story Points", "custom": True, "schema": {"type": "number"}},
+        ]
+
+    def priorities(self):
+        self.calls["priorities"] += 1
+        return [SimpleNamespace(name="High"), SimpleNamespace(name="Low")]
+
+    def statuses(self):
+        self.calls["statuses"] += 1
+        return [SimpleNamespace(name=n) for n in ("To Do", "Done", "Closed")]
+
+    def project_components(self, project):
+        self.calls["components"] += 1
+        return [SimpleNamespace(name="Network")]
+
+    def issue(self, key, fields=None):
+        self.calls["issue"] += 1
+        return SimpleNamespace(fields=SimpleNamespace(), update=lambda fields: self.calls.update(["update"]))
+
+
+class _Clock:
+    now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_metadata_fetched_once_per_ttl(tmp_path):
+    clock, jira = _Clock(), _Jira()
+    assert JiraRepository(jira, metadata_cache=MetadataCache(str(tmp_path), clock=clock)).metadata()
+    clock.now += 3600
+    # Another run within the TTL reads the file
+    meta = JiraRepository(jira, metadata_cache=MetadataCache(str(tmp_path), clock=clock)).metadata()
+    assert jira.calls["fields"] == 1 and meta.priorities == ["High", "Low"]
+    clock.now += 24 * 3600
+    JiraRepository(jira, metadata_cache=MetadataCache(str(tmp_path), clock=clock)).metadata()
+    assert jira.calls["fields"] == 2
+
+
+@pytest.mark.parametrize("payload, error", [
+    ({"priority": {"name": "Urgent"}}, "unknown priority"),
+    ({"customfield_10006": 3}, "unknown field customfield_10006"),
+    ({"customfield_20001": "three"}, "expects a number"),
+    ({"components": [{"name": "Storage"}]}, "unknown PCI components"),
+    ({"labels": ["FY26 Q1"]}, "invalid labels"),
+])
+def test_invalid_updates_never_sent(payload, error):
+    jira = _Jira()
+    repo = JiraRepository(jira)
+    with pytest.raises(ValueError, match=error):
+        repo.update_fields("PCI-1", payload)
+    assert jira.calls["issue"] == 0
+    repo.update_fields("PCI-1", {"priority": {"name": "High"}, "components": [{"name": "Network"}]})
+    assert jira.calls["update"] == 1
+
+
+def test_field_ids_resolved_from_metadata(monkeypatch):
+    monkeypatch.setattr(fields, "FIELD_REGISTRY", dict(fields.FIELD_REGISTRY))
+    meta = JiraRepository(_Jira()).metadata()
+    assert fields.resolve_field_ids(meta.field_ids) == ["story_points"]
+    assert fields.FIELD_REGISTRY["story_points"].jira_id == "customfield_20001"
+    assert fields.resolve_field_ids(meta.field_ids) == []
+
+
+def test_remapped_ids_are_read_and_projected(monkeypatch):
+    from adapter.jira_repo import pci_domain_fields
+    from lsd.mappers import issue_from_json, to_domain
+
+    # Restored after the test; resolve_field_ids updates the registry in place
+    monkeypatch.setitem(fields.FIELD_REGISTRY, "story_points", fields.FIELD_REGISTRY["story_points"])
+    fields.resolve_field_ids(JiraRepository(_Jira()).metadata().field_ids)
+    assert pci_domain_fields().endswith(",customfield_20001")
+    payload = {"key": "PCI-1", "fields": {"project": {"key": "PCI"}, "issuetype": {"name": "Task"},
+                                          "summary": "t", "status": {"name": "To Do"},
+                                          "customfield_10006": 1, "customfield_20001": 8}}
+    assert to_domain(issue_from_json(payload)).story_points == 8
+
+
+def test_field_ids_resolved_on_first_jira_call(tmp_path, monkeypatch):
+    monkeypatch.setitem(fields.FIELD_REGISTRY, "story_points", fields.FIELD_REGISTRY["story_points"])
+    jira, connects = _Jira(), []
+
+    def factory():
+        connects.append(1)
+        return jira
+
+    cache = MetadataCache(str(tmp_path))
+    repo = JiraRepository(factory=factory, metadata_cache=cache, resolve_fields=True)
+    assert connects == [] and fields.FIELD_REGISTRY["story_points"].jira_id == "customfield_10006"
+    repo.get_issue("PCI-1")
+    assert fields.FIELD_REGISTRY["story_points"].jira_id == "customfield_20001"
+    assert connects == [1] and jira.calls["fields"] == 1 and jira.calls["issue"] == 1
+
+    # A warm metadata cache is read without building the client
+    connects.clear()
+    assert JiraRepository(factory=factory, metadata_cache=cache).metadata() is not None
+    assert connects == []
@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from adapter import SimRepository
+from adapter.http_stats import HttpStats
+from lsd.metrics import RunMetrics
+from lsd.profiling import Profiler
+from lsd.tree_builder import build_lsd_tree
+from tests.test_services import build_sample_repo
+
+requests = pytest.importorskip("requests")
+
+
+class CannedAdapter(requests.adapters.BaseAdapter):
+    """Transport returning the queued (status, body) responses in order."""
+
+    def __init__(self, responses):
+        super().__init__()
+        self.responses = list(responses)
+
+    def send(self, request, **kwargs):
+        status, body = self.responses.pop(0)
+        response = requests.Response()
+        response.status_code = status
+        response._content = body
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+def test_http_stats_counts_requests_bytes_and_retry_wait():
+    session = requests.Session()
+    session.mount("https://", CannedAdapter([(429, b""), (200, b'{"key": "PCI-1"}'), (204, b"")]))
+    stats = HttpStats()
+    stats.install(session)
+    assert session.get("https://jira/rest/api/2/issue/PCI-1").status_code == 429
+    time.sleep(0.05)  # the client's backoff before retrying
+    session.get("https://jira/rest/api/2/issue/PCI-1")
+    session.put("https://jira/rest/api/2/issue/PCI-1", data='{"update": {}}')
+    assert stats.requests == {("GET", "429"): 1, ("GET", "200"): 1, ("PUT", "204"): 1}
+    assert stats.bytes_received["GET"] == 16 and stats.bytes_sent["PUT"] == 14
+    assert stats.throttled == {"429": 1}
+    assert stats.retry_wait >= 0.04
+
+
+class FakeJira:
+    def __init__(self):
+        self.http = HttpStats()
+        self.http.requests[("GET", "200")] = 7
+        self.writes = 2
+
+
+def test_textfile_carries_run_labels_and_sources(tmp_path):
+    profiler = Profiler(None)
+    metrics = RunMetrics(year="26", quarter="1", squad='Net"work')
+    sim = SimRepository(build_sample_repo())
+    with profiler.phase("build"):
+        tree = build_lsd_tree(sim, "26", "1", "Network", skip_closed=False)
+    sim.update_fields("PCI-T1", {"priority": {"name": "High"}})
+    sim.add_labels(["PCI-T1", "PCI-T2"], "FY26Q1")
+    metrics.track(profiler=profiler, jira=FakeJira(), sim=sim, search_cache=None)
+    metrics.observe_trees([tree])
+
+    path = tmp_path / "lsd.prom"
+    metrics.write_textfile(str(path))
+    text = path.read_text()
+    labels = 'year="26",quarter="1",squad="Net\\"work"'
+    assert f"lsd_run_success{{{labels}}} 0" in text
+    assert f'lsd_tree_issues{{{labels},type="Task"}} 3' in text
+    assert f'lsd_jira_requests{{{labels},code="200",method="GET"}} 7' in text
+    assert f'lsd_writes{{{labels},outcome="applied"}} 2' in text
+    assert f'lsd_writes{{{labels},outcome="skipped"}} 3' in text
+    assert f'lsd_run_duration_seconds{{{labels},phase="build"}}' in text
+    assert "# TYPE lsd_writes gauge" in text
+    assert list(tmp_path.iterdir()) == [path]
+
+    metrics.completed()
+    metrics.write_textfile(str(path))
+    assert f"lsd_run_success{{{labels}}} 1" in path.read_text()
@@ -0,0 +1,173 @@
+import json
+from collections import Counter
+
+import pytest
+
+from adapter.jira_repo import jql_lvl2_squad, jql_pci_feature_child
+from lsd import squads
+from lsd.squads import SquadSpec, get_squad, load_squads
+from lsd.tree_builder import build_lsd_tree, build_lsd_trees
+from tests.conftest import FakeIssue
+
+
+def _f(project, itype, comps=(), labels=(), status="To Do"):
+    return {
+        "project": {"key": project},
+        "issuetype": {"name": itype},
+        "summary": itype,
+        "status": {"name": status},
+        "priority": {"name": "Low"},
+        "labels": list(labels),
+        "components": [{"name": c} for c in comps],
+    }
+
+
+class SquadRepo:
+    """Search doubles honouring the squad scope like the JQL does."""
+
+    def __init__(self):
+        self.state = {
+            "LVL2-1": _f("LVL2", "New Feature"),
+            "LVL2-2": _f("LVL2", "New Feature"),
+            "PCI-E1": _f("PCI", "Epic", comps=["Network", "Compute"]),
+            "PCI-E2": _f("PCI", "Epic", comps=["Compute"]),
+            "PCI-T1": _f("PCI", "Task", comps=["Network"]),
+            "PCI-T2": _f("PCI", "Task", comps=["Compute"]),
+            "PCI-T3": _f("PCI", "Task", labels=["Openstack_Networking"]),
+            "PCI-T4": _f("PCI", "Task", comps=["Compute"], status="Done"),
+        }
+        self.roots = {
+            ("SD-FY26-Q1", "Network"): ["LVL2-1"],
+            ("SD-FY26-Q1", "Compute"): ["LVL2-1", "LVL2-2"],
+            ("SD-FY26-Q2", "Network"): ["LVL2-2"],
+            ("SD-FY26-Q2", "Compute"): ["LVL2-2"],
+        }
+        self.parent = {"LVL2-1": ["PCI-E1", "PCI-E2", "PCI-T3"], "LVL2-2": ["PCI-E1", "PCI-T2"]}
+        self.epic = {"PCI-E1": ["PCI-T1", "PCI-T2", "PCI-T4"], "PCI-E2": ["PCI-T2"]}
+        self.fetches = Counter()
+        self.searches = Counter()
+
+    def get_issue(self, key):
+        self.fetches[key] += 1
+        return FakeIssue(key, self.state[key])
+
+    def find_lvl2_new_features(self, sprint, squad):
+        self.searches[("roots", sprint, squad)] += 1
+        return list(self.roots.get((sprint, squad), []))
+
+    def _comps(self, key):
+        return {c["name"] for c in self.state[key]["components"]}
+
+    def find_pci_children_by_parent_link(self, parent_key, squad=None):
+        self.searches[("parent", parent_key)] += 1
+        spec = get_squad(squad) if squad else None
+        kids = self.parent.get(parent_key, [])
+        if spec is None:
+            return list(kids)
+        return [k for k in kids
+                if spec.component in self._comps(k) or set(spec.pci_labels) & set(self.state[k]["labels"])]
+
+    def find_children_by_epic_link(self, epic_key, squad):
+        self.searches[("epic", epic_key)] += 1
+        spec = get_squad(squad) if squad else None
+        return [k for k in self.epic.get(epic_key, []) if spec is None or spec.component in self._comps(k)]
+
+
+@pytest.fixture(autouse=True)
+def compute_squad(monkeypatch):
+    monkeypatch.setitem(squads.SQUAD_REGISTRY, "Compute", SquadSpec(name="Compute", component="Compute"))
+
+
+def _shape(tree):
+    return [(n.depth(), n.data.key) for n in tree]
+
+
+TARGETS = [("26", q, s) for q in ("1", "2") for s in ("Network", "Compute")]
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_shared_build_matches_single_builds(workers):
+    trees = build_lsd_trees(SquadRepo(), TARGETS + TARGETS[:1], skip_closed=False, max_workers=workers)
+    assert list(trees) == TARGETS
+    for (year, quarter, squad), tree in trees.items():
+        single = build_lsd_tree(SquadRepo(), year, quarter, squad, skip_closed=False)
+        assert _shape(tree) == _shape(single), (quarter, squad)
+
+
+def test_process_shards_match_in_process_builds():
+    # Roots sharded across worker processes (each with its own SquadRepo), merged in root order
+    trees = build_lsd_trees(SquadRepo(), TARGETS, skip_closed=False, processes=2, repo_factory=SquadRepo)
+    single_roots = []
+    tree = build_lsd_tree(SquadRepo(), "26", "1", "Compute", skip_closed=False, processes=2, repo_factory=SquadRepo,
+                          on_root=lambda node, is_last: single_roots.append((node.data.key, is_last)))
+    assert single_roots == [("LVL2-1", False), ("LVL2-2", True)]
+    assert _shape(tree) == _shape(build_lsd_tree(SquadRepo(), "26", "1", "Compute", skip_closed=False))
+    for target, built in build_lsd_trees(SquadRepo(), TARGETS, skip_closed=False).items():
+        assert _shape(trees[target]) == _shape(built), target
+    with pytest.raises(ValueError):
+        build_lsd_tree(SquadRepo(), "26", "1", "Compute", skip_closed=False, processes=2)
+
+
+def test_each_issue_and_search_once():
+    repo = SquadRepo()
+    trees = build_lsd_trees(repo, TARGETS, skip_closed=False)
+    assert set(repo.fetches.values()) == {1}
+    assert max(repo.searches.values()) == 1
+    assert len([k for k in repo.searches if k[0] == "roots"]) == 4
+    # Issues common to several trees share one domain object
+    e1 = [n.data for t in trees.values() for n in t if n.data.key == "PCI-E1"]
+    assert len(e1) == 5 and all(d is e1[0] for d in e1)
+
+
+def test_single_build_merges_child_searches_per_level():
+    class BatchRepo(SquadRepo):
+        def __init__(self):
+            super().__init__()
+            self.batches = []
+
+        def find_pci_children_by_parent_links(self, keys, squad=None):
+            self.batches.append(("parent", tuple(keys)))
+            return {k: self.find_pci_children_by_parent_link(k, squad) for k in keys}
+
+        def find_children_by_epic_links(self, keys, squad):
+            self.batches.append(("epic", tuple(keys)))
+            return {k: self.find_children_by_epic_link(k, squad) for k in keys}
+
+    repo = BatchRepo()
+    tree = build_lsd_tree(repo, "26", "1", "Compute", skip_closed=False)
+    assert repo.batches == [("parent", ("LVL2-1", "LVL2-2")), ("epic", ("PCI-E1", "PCI-E2"))]
+    assert _shape(tree) == _shape(build_lsd_tree(SquadRepo(), "26", "1", "Compute", skip_closed=False))
+
+
+def test_closed_issues_skipped_per_target():
+    trees = build_lsd_trees(SquadRepo(), [("26", "1", "Compute")], skip_closed=True)
+    keys = [n.data.key for n in trees[("26", "1", "Compute")]]
+    assert "PCI-T4" not in keys and "PCI-T2" in keys
+
+
+def test_registry_jql_and_loading(tmp_path):
+    network = get_squad("Network")
+    assert jql_lvl2_squad(network).startswith('(("OVH Product" in ("Public cloud Network - Floating IP (Neutron)"')
+    assert jql_lvl2_squad(network).endswith('("Contributor(s) Squad(s) (Manual)" = "PU.pCI/Network"))')
+    assert jql_pci_feature_child(network) == '(Component = "Network" OR labels = "Openstack_Networking")'
+    path = tmp_path / "squads.json"
+    path.write_text(json.dumps([{"name": "Storage", "lvl2_contributor": "PU.pCI/Storage"}]))
+    assert load_squads(str(path)) == ["Storage"]
+    storage = get_squad("Storage")
+    assert storage.component == "Storage"
+    assert jql_lvl2_squad(storage) == '(("Contributor(s) Squad(s) (Manual)" = "PU.pCI/Storage"))'
+    del squads.SQUAD_REGISTRY["Storage"]
+
+
+def test_shard_worker_takes_the_parent_field_ids(monkeypatch):
+    # Under spawn/forkserver the registry remapped in the parent is not inherited
+    from lsd import fields, tree_builder
+    from lsd.mappers import issue_from_json, to_domain
+
+    monkeypatch.setitem(fields.FIELD_REGISTRY, "story_points", fields.FIELD_REGISTRY["story_points"])
+    monkeypatch.setattr(tree_builder, "_shard_repo", None)
+    tree_builder._init_shard_worker(SquadRepo, (), {"story_points": "customfield_20001"})
+    payload = {"key": "PCI-1", "fields": {"project": {"key": "PCI"}, "issuetype": {"name": "Task"},
+                                          "summary": "t", "status": {"name": "To Do"}, "customfield_20001": 8}}
+    assert to_domain(issue_from_json(payload)).story_points == 8
+    assert isinstance(tree_builder._shard_repo, SquadRepo)
@@ -0,0 +1,41 @@
+import io
+import json
+
+from adapter import SimRepository
+from lsd.models import LVL2Feature, PCIEpic, PCITaskStory
+from lsd.presenter import NdjsonWriter
+from nutree import Tree
+
+
+def _lines(buf):
+    return [json.loads(line) for line in buf.getvalue().splitlines()]
+
+
+def test_ndjson_writer_emits_one_record_per_node():
+    buf = io.StringIO()
+    writer = NdjsonWriter(buf)
+    tree = Tree('LVL2')
+    feat = tree.add(LVL2Feature(key="LVL2-1", project="LVL2", type="New Feature", title="f", status="Open"))
+    writer.node(feat)
+    epic = feat.add(PCIEpic(key="PCI-E", project="PCI", type="Epic", title="e", status="To Do", story_points=3))
+    writer.node(epic)
+    recs = _lines(buf)
+    assert [(r["kind"], r["key"], r["parent_key"], r["level"]) for r in recs] == [
+        ("node", "LVL2-1", None, 0),
+        ("node", "PCI-E", "LVL2-1", 1),
+    ]
+    assert recs[1]["story_points"] == 3
+
+
+def test_ndjson_orphans_and_change_plan(repo):
+    buf = io.StringIO()
+    writer = NdjsonWriter(buf)
+    writer.orphan(PCITaskStory(key="PCI-O", project="PCI", type="Task", title="o", status="To Do"))
+    sim = SimRepository(repo, on_change=writer.change)
+    sim.update_fields("PCI-1", {"priority": {"name": "High"}})
+    sim.add_labels(["PCI-2"], "FY26Q1")
+    recs = _lines(buf)
+    assert recs[0]["kind"] == "orphan" and recs[0]["key"] == "PCI-O"
+    assert recs[1] == {"kind": "change", "key": "PCI-1", "fields": {"priority": {"name": "High"}}}
+    assert recs[2] == {"kind": "change", "key": "PCI-2", "fields": {"labels": {"add": "FY26Q1"}}}
+    assert repo.updates == []
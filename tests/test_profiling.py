@@ -0,0 +1,41 @@
+import os
+import tracemalloc
+
+import pytest
+
+from lsd.profiling import Profiler
+from lsd.tree_builder import build_lsd_tree
+from tests.test_services import build_sample_repo
+
+
+def test_phase_reports(tmp_path):
+    cpu = Profiler("cpu", out_dir=str(tmp_path))
+    with cpu.phase("build"):
+        build_lsd_tree(build_sample_repo(), "26", "1", "Network", skip_closed=False)
+    with pytest.raises(SystemExit), cpu.phase("action"):
+        raise SystemExit(1)
+    assert cpu.reports == [str(tmp_path / "profile-build.txt"), str(tmp_path / "profile-action.txt")]
+    assert "build_lsd_tree" in (tmp_path / "profile-build.txt").read_text()
+    assert os.path.exists(tmp_path / "profile-build.pstats")
+
+    tracing = tracemalloc.is_tracing()
+    try:
+        mem = Profiler("mem", out_dir=str(tmp_path))
+        with mem.phase("build"):
+            tree = build_lsd_tree(build_sample_repo(), "26", "1", "Network", skip_closed=False)
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+    assert len(tree) == 5
+    report = (tmp_path / "profile-build.txt").read_text()
+    assert "allocators (lsd.mappers)" in report and "lsd/mappers.py:" in report
+    assert "allocators (nutree)" in report
+
+
+def test_no_mode_is_a_no_op(tmp_path):
+    profiler = Profiler(None, out_dir=str(tmp_path / "out"))
+    with profiler.phase("build"):
+        pass
+    assert profiler.reports == [] and not os.path.exists(tmp_path / "out")
+    with pytest.raises(ValueError):
+        Profiler("io")
@@ -0,0 +1,108 @@
+import io
+import threading
+import time
+
+from lsd.presenter import ProgressiveAsciiPrinter, to_ascii
+from lsd.tree_builder import build_lsd_tree
+from tests.conftest import FakeIssue
+
+
+def _feature(summary):
+    return {
+        "project": {"key": "LVL2"},
+        "issuetype": {"name": "New Feature"},
+        "summary": summary,
+        "status": {"name": "Open"},
+        "priority": {"name": "Medium"},
+        "labels": [],
+    }
+
+
+def _task(summary):
+    return {
+        "project": {"key": "PCI"},
+        "issuetype": {"name": "Task"},
+        "summary": summary,
+        "status": {"name": "To Do"},
+        "priority": {"name": "Low"},
+        "labels": [],
+        "components": [{"name": "Network"}],
+    }
+
+
+class SlowFirstRepo:
+    """First root is slow to fetch so later roots could complete before it;
+    every fetch takes a little time so that a window spreads over threads."""
+
+    def __init__(self):
+        self.state = {"LVL2-1": _feature("slow"), "LVL2-2": _feature("fast"), "LVL2-3": _feature("fast too")}
+        for i in range(1, 4):
+            self.state[f"PCI-{i}"] = _task(f"t{i}")
+        self.threads = set()
+
+    def get_issue(self, key):
+        self.threads.add(threading.get_ident())
+        time.sleep(0.05 if key == "LVL2-1" else 0.01)
+        return FakeIssue(key, self.state[key])
+
+    def find_lvl2_new_features(self, sprint, squad):
+        return ["LVL2-1", "LVL2-2", "LVL2-3"]
+
+    def find_pci_children_by_parent_link(self, parent_key, squad=None):
+        return [f"PCI-{parent_key[-1]}"]
+
+    def find_children_by_epic_link(self, epic_key, squad):
+        return []
+
+
+def test_concurrent_build_keeps_root_order():
+    repo = SlowFirstRepo()
+    roots = []
+    tree = build_lsd_tree(repo, "26", "1", "Network", skip_closed=False,
+                          on_root=lambda n, last: roots.append((n.data.key, last)), max_workers=3)
+    assert roots == [("LVL2-1", False), ("LVL2-2", False), ("LVL2-3", True)]
+    assert [n.data.key for n in tree] == ["LVL2-1", "PCI-1", "LVL2-2", "PCI-2", "LVL2-3", "PCI-3"]
+    assert len(repo.threads) > 1
+
+
+def test_progressive_printer_matches_to_ascii():
+    """Le test vérifie que la sortie progressive est identique à to_ascii une fois l'arbre complet."""
+    buf = io.StringIO()
+    printer = ProgressiveAsciiPrinter(buf)
+    tree = build_lsd_tree(SlowFirstRepo(), "26", "1", "Network", skip_closed=False,
+                          on_root=printer, max_workers=2)
+    printer.finish(tree)
+    assert buf.getvalue() == to_ascii(tree) + "\n"
+
+
+def test_progressive_printer_empty_tree_prints_header():
+    class EmptyRepo(SlowFirstRepo):
+        def find_lvl2_new_features(self, sprint, squad):
+            return []
+
+    buf = io.StringIO()
+    printer = ProgressiveAsciiPrinter(buf)
+    tree = build_lsd_tree(EmptyRepo(), "26", "1", "Network", skip_closed=False, on_root=printer)
+    printer.finish(tree)
+    assert buf.getvalue() == to_ascii(tree) + "\n"
+
+
+def test_first_subtree_shown_before_other_roots_are_fetched():
+    events = []
+
+    class LoggingRepo(SlowFirstRepo):
+        def get_issue(self, key):
+            events.append(("get", key))
+            return super().get_issue(key)
+
+        def find_pci_children_by_parent_link(self, parent_key, squad=None):
+            events.append(("children", parent_key))
+            return super().find_pci_children_by_parent_link(parent_key, squad)
+
+    build_lsd_tree(LoggingRepo(), "26", "1", "Network", skip_closed=False,
+                   on_root=lambda n, last: events.append(("root", n.data.key)))
+    first = events.index(("root", "LVL2-1"))
+    assert ("get", "PCI-1") in events[:first]
+    assert not any(key != "LVL2-1" and not key.endswith("-1") for _, key in events[:first])
+    # The other roots are then expanded together
+    assert events[first + 1:].count(("root", "LVL2-2")) == 1
@@ -19,7 +19,7 @@ class Repo:
     def find_lvl2_new_features(self, sprint: str, squad: str):
         return list(self.lvl2_roots)
 
-    def find_pci_children_by_parent_link(self, parent_key: str):
+    def find_pci_children_by_parent_link(self, parent_key: str, squad=None):
         return list(self.edges_parent.get(parent_key, []))
 
     def find_children_by_epic_link(self, epic_key: str, squad: str):
@@ -44,6 +44,15 @@ class Repo:
         box.update(fields)
         self.updates.append((key, fields))
 
+    def add_labels(self, keys: list[str], label: str):
+        for key in keys:
+            box = self.state.setdefault(key, {})
+            labels = list(box.get("labels") or [])
+            if label not in labels:
+                box["labels"] = labels + [label]
+            self.updates.append((key, {"labels": box["labels"]}))
+        return list(keys)
+
 
 def _fields_lv12_feature(summary="feat"):
     return {
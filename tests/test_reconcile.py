@@ -0,0 +1,78 @@
+from nutree import Tree
+
+from lsd.models import LVL2Feature, PCITaskStory
+from lsd.reconcile import MISLABELED, MULTI_QUARTER, ORPHAN, KeyIndex, reconcile
+
+
+def _task(key, labels=(), status="To Do"):
+    return PCITaskStory(key=key, project="PCI", type="Task", title=key, status=status,
+                        labels=list(labels), components=["Network"])
+
+
+def _tree(feature, tasks):
+    tree = Tree("LVL2")
+    node = tree.add(LVL2Feature(key=feature, project="LVL2", type="New Feature", title="f", status="Open"))
+    for task in tasks:
+        node.add(task)
+    return tree
+
+
+def _payload(key, labels):
+    return {"key": key, "fields": {
+        "project": {"key": "PCI"}, "issuetype": {"name": "Task"}, "summary": key,
+        "status": {"name": "To Do"}, "priority": {"name": "Low"}, "labels": list(labels),
+        "components": [{"name": "Network"}],
+    }}
+
+
+class LabelRepo:
+    def __init__(self, labeled):
+        self.labeled = labeled
+        self.searches = []
+
+    def find_pci_with_labels(self, labels, squad):
+        self.searches.append((tuple(labels), squad))
+        return [_payload(k, ls) for k, ls in self.labeled.items() if set(ls) & set(labels)]
+
+    def get_issue(self, key):
+        raise AssertionError(f"unexpected fetch of {key}")
+
+
+def test_orphans_mislabeled_and_multi_quarter_from_one_search():
+    repo = LabelRepo({
+        "PCI-A": ["FY26Q1"],
+        "PCI-B": ["FY26Q2"],
+        "PCI-E": ["FY26Q1", "FY26Q2"],
+        "PCI-X": ["FY26Q2"],
+        "PCI-Y": ["FY26Q3"],  # no Q3 tree: neither orphan nor multi-quarter
+    })
+    trees = {
+        ("26", "1", "Network"): _tree("LVL2-1", [
+            _task("PCI-A", ["FY26Q1"]), _task("PCI-B", ["FY26Q1"]),  # stale snapshot label
+            _task("PCI-C"), _task("PCI-D", ["FY26Q2"], status="Done"),
+        ]),
+        ("26", "2", "Network"): _tree("LVL2-2", [
+            _task("PCI-E", ["FY26Q1", "FY26Q2"]), _task("PCI-F", ["FY26Q3"]),  # PCI-F not returned by Jira
+        ]),
+    }
+    result = reconcile(trees, repo)
+    assert repo.searches == [(("FY26Q1", "FY26Q2", "FY26Q3", "FY26Q4"), "Network")]
+    assert [(f.kind, f.key, f.label, f.labels) for f in result.findings] == [
+        (ORPHAN, "PCI-E", "FY26Q1", ()),
+        (MISLABELED, "PCI-B", "FY26Q1", ("FY26Q2",)),
+        (ORPHAN, "PCI-B", "FY26Q2", ()),
+        (ORPHAN, "PCI-X", "FY26Q2", ()),
+        (MISLABELED, "PCI-F", "FY26Q2", ("FY26Q3",)),
+        (MULTI_QUARTER, "PCI-E", None, ("FY26Q1", "FY26Q2")),
+    ]
+    assert result.issues["PCI-X"].components == ["Network"]
+    assert str(result.of_kind(MULTI_QUARTER)[0]) == "multi-quarter PCI-E: FY26Q1, FY26Q2"
+
+
+def test_key_index_bitmaps():
+    index = KeyIndex()
+    a = index.bitmap(["PCI-1", "PCI-2", "PCI-3"])
+    b = index.bitmap(["PCI-3", "PCI-4"])
+    assert index.keys(a & b) == ["PCI-3"]
+    assert index.keys(a & ~b) == ["PCI-1", "PCI-2"]
+    assert len(index) == 4
@@ -0,0 +1,76 @@
+import subprocess
+
+from nutree import Tree
+
+from lsd.hashing import annotate_hashes, subtree_hash
+from lsd.models import LVL2Feature, PCIEpic, PCITaskStory
+from lsd.presenter import RenderCache, write_dot_per_feature
+
+
+def _tree():
+    tree = Tree('LVL2')
+    f1 = tree.add(LVL2Feature(key="LVL2-1", project="LVL2", type="New Feature", title="f1", status="Open"))
+    e1 = f1.add(PCIEpic(key="PCI-E1", project="PCI", type="Epic", title="e1", status="To Do"))
+    e1.add(PCITaskStory(key="PCI-T1", project="PCI", type="Task", title="t1", status="To Do", story_points=3))
+    e1.add(PCITaskStory(key="PCI-T2", project="PCI", type="Task", title="t2", status="To Do"))
+    f2 = tree.add(LVL2Feature(key="LVL2-2", project="LVL2", type="New Feature", title="f2", status="Open"))
+    f2.add(PCITaskStory(key="PCI-T3", project="PCI", type="Task", title="t3", status="To Do"))
+    return tree
+
+
+def _node(tree, key):
+    return next(n for n in tree if n.data.key == key)
+
+
+def test_subtree_hashes_propagate_to_ancestors_only():
+    a, b = _tree(), _tree()
+    assert annotate_hashes(a) == annotate_hashes(b)
+    _node(b, "PCI-T1").data.status = "Done"
+    annotate_hashes(b)
+    for key in ("PCI-T1", "PCI-E1", "LVL2-1"):
+        assert subtree_hash(_node(a, key)) != subtree_hash(_node(b, key))
+    for key in ("PCI-T2", "LVL2-2", "PCI-T3"):
+        assert subtree_hash(_node(a, key)) == subtree_hash(_node(b, key))
+
+
+def test_write_dot_per_feature_skips_unchanged(tmp_path, monkeypatch):
+    rendered = []
+
+    def fake_run(cmd, check):
+        rendered.append(cmd[2])
+        open(cmd[-1], "w").close()
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    cache = RenderCache(str(tmp_path / "cache"))
+    out = str(tmp_path / "graphs")
+    write_dot_per_feature(_tree(), out, fmt="svg", cache=cache)
+    assert len(rendered) == 2
+
+    rendered.clear()
+    changed = _tree()
+    _node(changed, "PCI-T3").data.story_points = 8
+    write_dot_per_feature(changed, out, fmt="svg", cache=cache)
+    assert [p.rsplit("/", 1)[-1] for p in rendered] == ["LVL2-2.dot"]
+
+    rendered.clear()
+    write_dot_per_feature(changed, out, fmt="svg", cache=cache, max_leaves=1)
+    assert len(rendered) == 2
+
+
+
+def test_render_cache_keeps_one_index_per_namespace_and_prunes_unused(tmp_path):
+    cache = RenderCache(str(tmp_path))
+    cache.put("dot", "a", "h1")
+    cache.put("dot", "b", "h2")
+    cache.save("dot")
+    assert [p.name for p in tmp_path.iterdir()] == ["dot.json"]
+
+    reloaded = RenderCache(str(tmp_path))
+    assert reloaded.get("dot", "a") == "h1"
+    reloaded.save("dot")
+    assert RenderCache(str(tmp_path)).get("dot", "b") is None
+
+    memory = RenderCache(None)
+    memory.put("dot", "a", "h1")
+    memory.save("dot")
+    assert memory.get("dot", "a") == "h1"
@@ -0,0 +1,70 @@
+import pytest
+from nutree import Tree
+
+from lsd.models import LVL2Feature, PCIEpic, PCITaskStory
+from lsd.rollup import RollupRules, compute_rollup
+from lsd.services import aggregate_all_points
+
+
+def _task(key, sp, status="To Do"):
+    return PCITaskStory(key=key, project="PCI", type="Task", title=key, status=status, story_points=sp)
+
+
+def _epic(key, sp=0):
+    return PCIEpic(key=key, project="PCI", type="Epic", title=key, status="To Do", story_points=sp)
+
+
+def _tree():
+    tree = Tree('LVL2')
+    f1 = tree.add(LVL2Feature(key="LVL2-1", project="LVL2", type="New Feature", title="f1", status="Open"))
+    e1 = f1.add(_epic("PCI-E1", sp=8))
+    e1.add(_task("PCI-T1", 3))
+    e1.add(_task("PCI-T2", 5))
+    e1.add(_task("PCI-DONE", 2, status="Done"))
+    nested = e1.add(_epic("PCI-E3", sp=1))
+    nested.add(_task("PCI-T4", 4))
+    f1.add(_task("PCI-T3", 1))
+    f2 = tree.add(LVL2Feature(key="LVL2-2", project="LVL2", type="New Feature", title="f2", status="Open"))
+    e2 = f2.add(_epic("PCI-E2", sp=0))
+    e2.add(_task("PCI-T5", 13))
+    return tree
+
+
+def test_compute_rollup_default_rules_direct_children():
+    totals = compute_rollup(_tree())
+    assert totals["PCI-E1"] == 3 + 5 + 2 + 1
+    assert totals["PCI-E3"] == 4
+    assert totals["PCI-E2"] == 13
+    assert totals["LVL2-1"] == 11 + 1
+    assert totals["LVL2-2"] == 13
+
+
+def test_compute_rollup_nested_without_closed():
+    totals = compute_rollup(_tree(), RollupRules(include_closed=False, nested=True))
+    assert totals["PCI-E1"] == 3 + 5 + 4
+    assert totals["LVL2-1"] == 12 + 1
+
+
+def test_aggregate_all_points_writes_only_changed(repo):
+    """Le test vérifie que seuls les totaux modifiés sont écrits, puis aucun au second passage."""
+    tree = _tree()
+    rules = RollupRules(nested=True)
+    aggregate_all_points(tree, repo, rules=rules)
+    written = {k for k, _ in repo.updates}
+    # PCI-E1 (8 -> 14), PCI-E3 (1 -> 4), PCI-E2 (0 -> 13)
+    assert written == {"PCI-E1", "PCI-E3", "PCI-E2"}
+    assert repo.state["PCI-E2"]["customfield_10006"] == 13
+
+    repo.updates.clear()
+    for node in tree:
+        if isinstance(node.data, PCIEpic):
+            node.data.story_points = repo.state[node.data.key]["customfield_10006"]
+    aggregate_all_points(tree, repo, rules=rules)
+    assert repo.updates == []
+
+
+def test_aggregate_all_points_restricted_to_requested(repo):
+    aggregate_all_points(_tree(), repo, ["PCI-E2"])
+    assert [k for k, _ in repo.updates] == ["PCI-E2"]
+    with pytest.raises(KeyError):
+        aggregate_all_points(_tree(), repo, ["PCI-NOPE"])
@@ -0,0 +1,83 @@
+import os
+import threading
+
+from adapter import JiraRepository, SearchCache
+from adapter.jira_repo import TTL_LVL2_ROOTS
+from adapter.search_cache import FRESH, MISS
+
+
+class _Issue:
+    def __init__(self, key):
+        self.key = key
+        self.raw = {"key": key, "fields": {}}
+
+
+class _Jira:
+    def __init__(self):
+        self.keys = ["LVL2-1", "LVL2-2"]
+        self.searches = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def search_issues(self, jql, fields=None, maxResults=None):
+        self.release.wait(5)
+        self.searches += 1
+        return [_Issue(k) for k in self.keys]
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_results_shared_across_runs_until_ttl(tmp_path):
+    clock, jira = _Clock(), _Jira()
+    first = JiraRepository(jira, search_cache=SearchCache(str(tmp_path), clock=clock))
+    assert first.find_lvl2_new_features("SD-FY26-Q1", "Network") == ["LVL2-1", "LVL2-2"]
+    # A later run (new process) with a fresh cache object reads the disk entry
+    cache = SearchCache(str(tmp_path), clock=clock)
+    second = JiraRepository(jira, search_cache=cache)
+    clock.now += TTL_LVL2_ROOTS - 1
+    assert second.find_lvl2_new_features("SD-FY26-Q1", "Network") == ["LVL2-1", "LVL2-2"]
+    assert jira.searches == 1 and cache.hits == 1
+    clock.now += 2
+    jira.keys = ["LVL2-3"]
+    assert second.find_lvl2_new_features("SD-FY26-Q1", "Network") == ["LVL2-3"]
+    assert jira.searches == 2 and cache.misses == 1
+    # Children searches are not cached
+    second.find_children_by_epic_link("PCI-1", "Network")
+    second.find_children_by_epic_link("PCI-1", "Network")
+    assert jira.searches == 4
+
+
+def test_stale_entry_returned_while_refreshing(tmp_path):
+    clock, jira = _Clock(), _Jira()
+    cache = SearchCache(str(tmp_path), stale_while_revalidate=True, clock=clock)
+    repo = JiraRepository(jira, search_cache=cache)
+    repo.find_pci_keys_with_label_and_squad("FY26Q1", "Network")
+    clock.now += 3600
+    jira.keys = ["PCI-9"]
+    jira.release.clear()  # Jira is slow: the stale answer must not wait for it
+    assert repo.find_pci_keys_with_label_and_squad("FY26Q1", "Network") == ["LVL2-1", "LVL2-2"]
+    assert repo.find_pci_keys_with_label_and_squad("FY26Q1", "Network") == ["LVL2-1", "LVL2-2"]
+    jira.release.set()
+    cache.wait()
+    assert jira.searches == 2  # one refresh for both stale reads
+    assert repo.find_pci_keys_with_label_and_squad("FY26Q1", "Network") == ["PCI-9"]
+    assert (cache.hits, cache.stale, cache.misses) == (1, 2, 1)
+
+
+def test_lru_bound_normalization_and_invalidation(tmp_path):
+    cache = SearchCache(str(tmp_path), max_entries=2)
+    for i in range(3):
+        cache.put(f"project = P{i}", "key", [_Issue(f"P{i}-1")])
+    assert len(os.listdir(tmp_path)) == 2
+    state, issues = cache.lookup("project  =\n P2", "key", ttl=60)
+    assert state == FRESH and [i.key for i in issues] == ["P2-1"]
+    assert SearchCache(str(tmp_path)).lookup("project = P0", "key", ttl=60)[0] == MISS
+    cache.invalidate()
+    assert cache.lookup("project = P2", "key", ttl=60) == (MISS, None)
+    assert os.listdir(tmp_path) == []
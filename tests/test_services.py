@@ -27,7 +27,7 @@ class ServiceRepo:
     def find_lvl2_new_features(self, sprint: str, squad: str):
         return list(self.lvl2_roots)
 
-    def find_pci_children_by_parent_link(self, parent_key: str):
+    def find_pci_children_by_parent_link(self, parent_key: str, squad=None):
         return list(self.edges_parent.get(parent_key, []))
 
     def find_children_by_epic_link(self, epic_key: str, squad: str):
@@ -52,6 +52,14 @@ class ServiceRepo:
         box = self.state.setdefault(key, {})
         box.update(fields)
 
+    def add_labels(self, keys: list[str], label: str):
+        for key in keys:
+            box = self.state.setdefault(key, {})
+            labels = list(box.get("labels") or [])
+            if label not in labels:
+                box["labels"] = labels + [label]
+        return list(keys)
+
 
 def _fields_lv12_feature(summary="feat", pu=None):
     return {
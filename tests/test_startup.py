@@ -0,0 +1,70 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from adapter import JiraRepository
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = os.path.join(ROOT, "jira-for-pci.py")
+
+# Modules the CLI defers to the code paths that need them. Start-up time is
+# dominated by these (jira alone adds ~160 ms), so the test checks which
+# modules are loaded rather than a wall-clock budget, which is too noisy on
+# shared machines.
+HEAVY_MODULES = ["jira", "requests", "nutree", "numpy", "pyarrow", "graphviz"]
+DEFERRED_MODULES = HEAVY_MODULES + [
+    "logging.handlers", "cProfile", "tracemalloc", "multiprocessing",
+    "lsd.tree_builder", "lsd.services",
+]
+
+_PROBE = f"""
+import json, runpy, sys
+runpy.run_path({CLI!r}, run_name="cli")
+cli = [m for m in {DEFERRED_MODULES!r} if m in sys.modules]
+import adapter, lsd.daemon, lsd.presenter
+print(json.dumps({{"cli": cli, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def _probe():
+    out = subprocess.run([sys.executable, "-c", _PROBE], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+def test_cli_imports_stay_light():
+    run = _probe()
+    assert run["cli"] == []
+    # lsd.presenter needs nutree (via hashing); the CLI and thin client do not
+    assert run["loaded"] == ["nutree"]
+
+
+def test_help_does_not_need_jira():
+    out = subprocess.run([sys.executable, "-X", "importtime", CLI, "--help"], cwd=ROOT,
+                         capture_output=True, text=True, check=True)
+    assert "--no-server-info" in out.stdout
+    assert "| jira" not in out.stderr and "requests" not in out.stderr
+
+
+def test_client_is_built_on_first_use(monkeypatch):
+    jira = pytest.importorskip("jira")
+    built = []
+
+    class FakeJIRA:
+        def __init__(self, **kwargs):
+            built.append(kwargs)
+
+        def issue(self, key):
+            return key
+
+    monkeypatch.setattr(jira, "JIRA", FakeJIRA)
+    repo = JiraRepository.connect("https://jira.example", "tok", get_server_info=False)
+    assert built == []
+    assert repo.get_issue("PCI-1") == "PCI-1"
+    repo.get_issue("PCI-2")
+    assert built == [{"server": "https://jira.example", "token_auth": "tok", "get_server_info": False}]
+    with pytest.raises(ValueError):
+        JiraRepository()
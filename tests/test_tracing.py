@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from adapter import TracingRepository
+from lsd import services
+from lsd.tracing import span, start_tracing, stop_tracing
+from lsd.tree_builder import build_lsd_tree, build_lsd_trees
+from tests.test_services import build_sample_repo
+
+
+@pytest.fixture
+def tracer():
+    tracer = start_tracing()
+    yield tracer
+    stop_tracing()
+
+
+def test_spans_cover_repository_tree_and_services(tracer, tmp_path):
+    repo = TracingRepository(build_sample_repo())
+    tree = build_lsd_tree(repo, "26", "1", "Network", skip_closed=False)
+    services.propagate_priority(tree, repo)
+    with pytest.raises(KeyError), span("failing", key="PCI-1"):
+        raise KeyError("PCI-1")
+
+    by_name = {}
+    for event in tracer.events:
+        by_name.setdefault(event["name"], []).append(event)
+    roots = by_name["repo.find_lvl2_new_features"][0]["args"]
+    assert roots == {"sprint": "SD-FY26-Q1", "squad": "Network", "count": 1}
+    assert len(by_name["repo.get_issue"]) == 5
+    assert [lvl["args"]["depth"] for lvl in by_name["level"]] == [0, 1, 2]
+    assert by_name["build_lsd_tree"][0]["args"]["nodes"] == 5
+    assert by_name["propagate_priority"][0]["cat"] == "service"
+    assert by_name["failing"][0]["args"] == {"key": "PCI-1", "error": "KeyError"}
+    # Nested spans fall within their parent
+    build, level = by_name["build_lsd_tree"][0], by_name["level"][-1]
+    assert build["ts"] <= level["ts"] and level["ts"] + level["dur"] <= build["ts"] + build["dur"]
+
+    path = tmp_path / "trace.json"
+    assert stop_tracing(str(path)) == len(tracer.events)
+    events = json.loads(path.read_text())["traceEvents"]
+    assert events[0]["ph"] == "M" and events[0]["args"]["name"] == "MainThread"
+    assert len(events) == len(tracer.events) + 1
+
+
+def test_shared_build_records_levels(tracer):
+    build_lsd_trees(build_sample_repo(), [("26", "1", "Network")], skip_closed=False)
+    levels = [e["args"] for e in tracer.events if e["name"] == "level"]
+    assert [lvl["depth"] for lvl in levels] == [0, 1, 2]
+    assert levels[0]["frontier"] == 1
+
+
+def test_no_spans_when_off():
+    assert stop_tracing() == 0
+    with span("ignored") as s:
+        s.set(count=1)
+    assert stop_tracing() == 0
@@ -18,7 +18,7 @@ class RepoWithSearch:
     def find_lvl2_new_features(self, sprint: str, squad: str):
         return [k for k, v in self.state.items() if v.get("_root")]
 
-    def find_pci_children_by_parent_link(self, parent_key: str):
+    def find_pci_children_by_parent_link(self, parent_key: str, squad=None):
         return list(self.edges_parent.get(parent_key, []))
 
     def find_children_by_epic_link(self, epic_key: str, squad: str):
@@ -99,3 +99,23 @@ def test_build_tree_filters_network_and_closed():
     keys2 = [node.data.key for node in tree2]
     assert "PCI-TS2" not in keys2
 
+
+
+def test_build_tree_calls_on_node_as_attached():
+    state = {
+        "LVL2-1": {"_root": True, **_fields_lv12_feature()},
+        "PCI-EPIC-N": _fields_pci_epic(comps=["Network"]),
+        "PCI-TS1": _fields_pci_task(comps=["Network"], sp=5),
+    }
+    repo = RepoWithSearch(state, {"LVL2-1": ["PCI-EPIC-N"]}, {"PCI-EPIC-N": ["PCI-TS1"]})
+    seen = []
+    tree = build_lsd_tree(repo, "26", "1", "Network", skip_closed=False,
+                          on_node=lambda n: seen.append((n.data.key, len(tree_keys(n)))))
+    assert [k for k, _ in seen] == ["LVL2-1", "PCI-EPIC-N", "PCI-TS1"]
+    # Children are not attached yet when the callback fires
+    assert all(n == 0 for _, n in seen)
+    assert len(list(tree)) == 3
+
+
+def tree_keys(node):
+    return [c.data.key for c in node]
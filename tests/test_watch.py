@@ -0,0 +1,164 @@
+import copy
+import threading
+
+from lsd.tree_builder import build_lsd_tree, find_nodes
+from lsd.watch import TreeWatcher
+from tests.test_services import _fields_lv12_feature, _fields_pci_task, build_sample_repo
+
+
+class WatchRepo:
+    """Sample repo whose `updated` search returns the keys touched since the last call."""
+
+    def __init__(self):
+        self._inner = build_sample_repo()
+        self.touched: list[str] = []
+        self.histories: dict[str, list] = {}
+        self.windows: list[int] = []
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+    @property
+    def state(self):
+        return self._inner.state
+
+    def touch(self, key, **fields):
+        self.state.setdefault(key, {}).update(fields)
+        self.touched.append(key)
+
+    def find_updated_since(self, minutes, squad):
+        self.windows.append(minutes)
+        keys, self.touched = list(dict.fromkeys(self.touched)), []
+        return [{"key": k, "fields": copy.deepcopy(self.state[k]),
+                 "changelog": {"histories": self.histories.get(k, [])}} for k in keys]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _watcher():
+    repo = WatchRepo()
+    tree = build_lsd_tree(repo, "26", "1", "Network", skip_closed=False)
+    clock = Clock()
+    return repo, tree, clock, TreeWatcher(tree, repo, "26", "1", "Network", clock=clock)
+
+
+def test_poll_reports_only_changed_nodes():
+    repo, tree, clock, watcher = _watcher()
+    clock.now = 150
+    # Touched but unchanged issues produce no change
+    repo.touch("PCI-T1")
+    repo.touch("PCI-T2", customfield_10006=8, priority={"name": "High"})
+    changes, orphans = watcher.poll()
+    assert repo.windows == [4]  # ceil(150s) + 1 minute overlap
+    assert sorted((c.kind, c.key, c.old, c.new) for c in changes) == [
+        ("points", "PCI-T2", 5, 8),
+        ("prio", "PCI-T2", "Medium", "High"),
+    ]
+    assert orphans == []
+    assert find_nodes(tree, "PCI-T2")[0].data.story_points == 8
+
+
+def test_poll_moves_and_removes():
+    repo, tree, clock, watcher = _watcher()
+    repo.histories["PCI-T1"] = [
+        {"created": "2026-01-01", "items": [{"field": "Epic Link", "toString": "PCI-OLD"}]},
+        {"created": "2026-01-02", "items": [{"field": "Epic Link", "toString": "PCI-EPIC"}]},
+    ]
+    repo.touch("PCI-T1")
+    repo.touch("PCI-T2", status={"name": "Done"})
+    changes, _ = watcher.poll()
+    assert sorted(str(c) for c in changes) == [
+        "moved PCI-T1: LVL2-1 -> PCI-EPIC",
+        "removed PCI-T2 (parent PCI-EPIC)",
+    ]
+    assert watcher.poll() == ([], [])
+
+
+def test_poll_follows_lvl2_features_joining_and_leaving_the_sprint():
+    repo, tree, clock, watcher = _watcher()
+    repo.state["LVL2-2"] = _fields_lv12_feature("new feature")
+    repo.state["PCI-T9"] = _fields_pci_task(comps=["Network"])
+    repo._inner.edges_parent["LVL2-2"] = ["PCI-T9"]
+    repo._inner.lvl2_roots = ["LVL2-1", "LVL2-2"]
+    changes, _ = watcher.poll()
+    assert sorted(str(c) for c in changes) == ["added LVL2-2 (parent -)", "added PCI-T9 (parent LVL2-2)"]
+    assert [n.data.key for n in tree.children] == ["LVL2-1", "LVL2-2"]
+
+    repo._inner.lvl2_roots = ["LVL2-2"]
+    changes, _ = watcher.poll()
+    assert [str(c) for c in changes] == ["removed LVL2-1 (parent -)"]
+    assert find_nodes(tree, "PCI-T1") == []
+    assert watcher.poll() == ([], [])
+
+
+def test_orphans_are_incremental():
+    repo, tree, clock, watcher = _watcher()
+    repo.touch("PCI-ORPH", labels=["FY26Q1"])
+    repo.touch("PCI-T1", labels=["FY26Q1"])  # labeled but in the tree
+    # No label search / per-issue fetch: only the polled issues are checked
+    repo._inner.find_pci_keys_with_label_and_squad = None
+    repo._inner.get_issue = None
+    _, orphans = watcher.poll()
+    assert [o.key for o in orphans] == ["PCI-ORPH"]
+    repo.touch("PCI-ORPH", summary="renamed")
+    repo.state["PCI-NEW"] = _fields_pci_task(comps=["Network"])
+    repo.touch("PCI-NEW", labels=["FY26Q1"])
+    _, orphans = watcher.poll()
+    assert [o.key for o in orphans] == ["PCI-NEW"]
+
+
+def test_run_until_stopped():
+    repo, tree, clock, watcher = _watcher()
+    stop = threading.Event()
+    seen = []
+
+    def on_change(change):
+        seen.append(str(change))
+        stop.set()
+
+    repo.touch("PCI-T2", status={"name": "In Progress"})
+    watcher.run(0.01, on_change=on_change, stop=stop)
+    assert seen == ["status PCI-T2: status 'To Do' -> 'In Progress'"]
+
+
+class _Issue:
+    def __init__(self, key):
+        self.key = key
+        self.raw = {"key": key, "fields": {}}
+
+
+class _RootsJira:
+    """search_issues double answering the LVL2 root search from `roots`."""
+
+    def __init__(self, roots):
+        self.roots = roots
+
+    def search_issues(self, jql, fields=None, maxResults=None):
+        return [_Issue(k) for k in self.roots]
+
+
+def test_poll_sees_root_changes_despite_the_search_cache():
+    from adapter import JiraRepository, SearchCache
+
+    repo, tree, clock, _ = _watcher()
+    jira = _RootsJira(["LVL2-1"])
+    cached = JiraRepository(jira, search_cache=SearchCache(None, stale_while_revalidate=True))
+    assert cached.find_lvl2_new_features("SD-FY26-Q1", "Network") == ["LVL2-1"]  # the build primes the cache
+    repo.find_lvl2_new_features = cached.without_search_cache().find_lvl2_new_features
+    watcher = TreeWatcher(tree, repo, "26", "1", "Network", clock=clock)
+
+    repo.state["LVL2-2"] = _fields_lv12_feature("new feature")
+    jira.roots = ["LVL2-1", "LVL2-2"]
+    changes, _ = watcher.poll()
+    assert [str(c) for c in changes] == ["added LVL2-2 (parent -)"]
+    jira.roots = ["LVL2-2"]
+    changes, _ = watcher.poll()
+    assert [str(c) for c in changes] == ["removed LVL2-1 (parent -)"]
+    # The cached repository still answers from its entry
+    assert cached.find_lvl2_new_features("SD-FY26-Q1", "Network") == ["LVL2-1"]